@@ -1,14 +1,12 @@
-import json
 from statistics import mean
+from utils.db import JOBS_LOG, FEEDBACK_LOG, load_json
 
 def build_scorecard(contractor_id: str,
-                    jobs_path="logs/jobs.json",
-                    feedback_path="logs/feedback.json") -> dict:
+                    jobs_path=JOBS_LOG,
+                    feedback_path=FEEDBACK_LOG) -> dict:
     try:
-        with open(jobs_path) as jf:
-            jobs = json.load(jf)
-        with open(feedback_path) as ff:
-            feedback = json.load(ff)
+        jobs = load_json(jobs_path)
+        feedback = load_json(feedback_path)
 
         completed_jobs = [j for j in jobs if j.get("assigned_contractor_id") == contractor_id]
         contractor_feedback = [f for f in feedback if f.get("contractor_id") == contractor_id]
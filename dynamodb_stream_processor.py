@@ -1,54 +1,141 @@
 import boto3
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
-# Initialize DynamoDB and WebSocket client
-user_table = boto3.resource('dynamodb').Table('UserTable')  # Replace 'UserTable' with your actual table name
-websocket_client = boto3.client('apigatewaymanagementapi', endpoint_url="https://your-websocket-endpoint")  # Replace with your WebSocket endpoint
+# thread_id -> connection_id subscription index, maintained by
+# websocket_connection_manager.py on $connect / $disconnect / join
+CONNECTIONS_TABLE = os.environ.get("CONNECTIONS_TABLE", "ThreadConnections")
+WEBSOCKET_ENDPOINT = os.environ.get("WEBSOCKET_ENDPOINT", "https://your-websocket-endpoint")  # Replace with your WebSocket endpoint
+MAX_SEND_WORKERS = int(os.environ.get("MAX_SEND_WORKERS", "16"))
+
+# Initialize DynamoDB and WebSocket client. Every send worker needs its own
+# pooled connection (botocore keeps 10 by default), kept alive across
+# invocations of the warm container.
+client_config = Config(max_pool_connections=MAX_SEND_WORKERS, tcp_keepalive=True,
+                       retries={"mode": "adaptive", "max_attempts": 5})
+connections_table = boto3.resource('dynamodb', config=client_config).Table(CONNECTIONS_TABLE)
+websocket_client = boto3.client('apigatewaymanagementapi', endpoint_url=WEBSOCKET_ENDPOINT, config=client_config)
+send_pool = ThreadPoolExecutor(max_workers=MAX_SEND_WORKERS)
+
+# Each chat message is its own item, so the stream (StreamViewType NEW_IMAGE
+# or NEW_AND_OLD_IMAGES) carries every new message in a record's NewImage.
+
+def from_dynamodb(value):
+    """Decode one DynamoDB-JSON attribute value (kept local: this file deploys alone)."""
+    (kind, data), = value.items()
+    if kind in ("S", "B", "BOOL"):
+        return data
+    if kind == "N":
+        number = Decimal(data)
+        return int(number) if number == number.to_integral_value() else float(number)
+    if kind == "NULL":
+        return None
+    if kind == "L":
+        return [from_dynamodb(v) for v in data]
+    if kind == "M":
+        return {k: from_dynamodb(v) for k, v in data.items()}
+    if kind == "NS":
+        return [from_dynamodb({"N": n}) for n in data]
+    return list(data)
+
+def build_chat_frame(thread_id, messages):
+    """
+    Delta frame with a thread's new messages, oldest first. Positions (seq)
+    are message timestamps; base_seq is None because this Lambda keeps no
+    per-thread state between invocations, so clients merge by message id.
+    Same protocol as utils/chat_delta.py.
+    """
+    messages = sorted(messages, key=lambda m: str(m.get("timestamp") or ""))
+    seq = str(messages[-1].get("timestamp") or "") if messages else ""
+    return {"type": "chat_delta", "thread_id": thread_id, "base_seq": None, "seq": seq, "messages": messages}
+
+def get_connection_ids(thread_id):
+    """Connections subscribed to a thread: one paginated Query on the index table."""
+    kwargs = {
+        "KeyConditionExpression": Key("thread_id").eq(thread_id),
+        "ProjectionExpression": "connection_id"
+    }
+    connection_ids = []
+    while True:
+        response = connections_table.query(**kwargs)
+        connection_ids.extend(item["connection_id"] for item in response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return connection_ids
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def send_to_connection(thread_id, connection_id, data):
+    """Post one frame; a 410 Gone connection is dropped from the index."""
+    try:
+        websocket_client.post_to_connection(ConnectionId=connection_id, Data=data)
+        return True
+    except ClientError as e:
+        error = e.response.get("Error", {})
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        if error.get("Code") == "GoneException" or status == 410:
+            connections_table.delete_item(Key={"thread_id": thread_id, "connection_id": connection_id})
+            logging.info(f"Pruned stale connection_id {connection_id} from thread {thread_id}")
+        else:
+            logging.error(f"Failed to send notification to connection_id {connection_id}: {str(e)}")
+    except Exception as e:
+        logging.error(f"Failed to send notification to connection_id {connection_id}: {str(e)}")
+    return False
+
+def fan_out(thread_id, frame):
+    """Send a frame to every subscriber of the thread concurrently; returns the number delivered."""
+    data = json.dumps({**frame, "message": f"Thread {thread_id} has been updated."}, default=str)
+    connection_ids = get_connection_ids(thread_id)
+    results = list(send_pool.map(lambda cid: send_to_connection(thread_id, cid, data), connection_ids))
+    return sum(results)
+
+def group_by_thread(records):
+    """
+    Coalesce a stream batch per thread: the new or edited message items
+    (each record's NewImage) plus every sequence number involved. Removals
+    and items that aren't messages (no id or thread_id) are skipped.
+    """
+    threads = {}
+    for record in records:
+        if record['eventName'] not in ['INSERT', 'MODIFY']:
+            continue
+        new_image = record['dynamodb'].get('NewImage', {})
+        if 'id' not in new_image or 'thread_id' not in new_image:
+            continue
+        message = {k: from_dynamodb(v) for k, v in new_image.items()}
+        change = threads.setdefault(message['thread_id'], {"messages": [], "sequence_numbers": []})
+        change["messages"].append(message)
+        change["sequence_numbers"].append(record['dynamodb'].get('SequenceNumber'))
+    return threads
+
+def process_thread(thread_id, change):
+    """One delta with the batch's messages and one fan-out per thread."""
+    frame = build_chat_frame(thread_id, change["messages"])
+    delivered = fan_out(thread_id, frame)
+    logging.info(f"Thread {thread_id}: {len(change['sequence_numbers'])} record(s) -> seq {frame['seq']}, "
+                 f"sent to {delivered} connection(s)")
 
 def lambda_handler(event, context):
-    """AWS Lambda function to process DynamoDB Stream events."""
+    """
+    AWS Lambda function to process DynamoDB Stream events.
+
+    Requires ReportBatchItemFailures on the event source mapping: a thread
+    that fails reports its earliest sequence number, so the retry resumes
+    there instead of replaying the whole batch.
+    """
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    try:
-        # Process each record in the event
-        for record in event['Records']:
-            if record['eventName'] in ['INSERT', 'MODIFY']:
-                # Extract the new image from the DynamoDB Stream record
-                new_image = record['dynamodb']['NewImage']
-                thread_id = new_image.get('thread_id', {}).get('S', 'unknown')
-                chat_log = new_image.get('chat_log', {}).get('L', [])
-
-                # Log the processed record
-                logging.info(f"Processed record for thread_id: {thread_id}")
-                logging.info(f"Chat log: {json.dumps(chat_log)}")
-
-                # Query the User table to fetch users associated with the thread
-                response = user_table.scan(
-                    FilterExpression="contains(threads, :thread_id)",
-                    ExpressionAttributeValues={":thread_id": thread_id}
-                )
-                users = response.get('Items', [])
-
-                # Push notifications to WebSocket clients
-                for user in users:
-                    connection_id = user.get('connection_id')  # Ensure connection_id is stored in the User table
-                    if connection_id:
-                        try:
-                            websocket_client.post_to_connection(
-                                ConnectionId=connection_id,
-                                Data=json.dumps({
-                                    "type": "notification",
-                                    "message": f"Thread {thread_id} has been updated.",
-                                    "chat_log": chat_log
-                                })
-                            )
-                            logging.info(f"Notification sent to connection_id: {connection_id}")
-                        except Exception as e:
-                            logging.error(f"Failed to send notification to connection_id {connection_id}: {str(e)}")
-
-                # Add custom logic here to push updates to WebSocket server or other services
+    failures = []
+    for thread_id, change in group_by_thread(event.get('Records', [])).items():
+        try:
+            process_thread(thread_id, change)
+        except Exception as e:
+            logging.error(f"Error processing DynamoDB Stream records for thread_id {thread_id}: {str(e)}")
+            failures.append(change["sequence_numbers"][0])
 
-    except Exception as e:
-        logging.error(f"Error processing DynamoDB Stream event: {str(e)}")
-        raise e
\ No newline at end of file
+    # Lambda retries from the lowest failed sequence number in the shard
+    return {"batchItemFailures": [{"itemIdentifier": seq} for seq in failures if seq]}
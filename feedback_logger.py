@@ -1,4 +1,4 @@
-from utils.db import load_json, save_json
+from utils.db import save_feedback
 from datetime import datetime
 
 def log_feedback(job_id: str, rating: int, comment: str, actor: str) -> dict:
@@ -9,7 +9,5 @@ def log_feedback(job_id: str, rating: int, comment: str, actor: str) -> dict:
         "submitted_by": actor,
         "timestamp": datetime.now().isoformat()
     }
-    feedback_log = load_json("logs/feedback.json")
-    feedback_log.append(entry)
-    save_json("logs/feedback.json", feedback_log)
+    save_feedback(entry)
     return entry
\ No newline at end of file
@@ -1,10 +1,10 @@
 import json
 from utils.gpt_call import call_gpt_model
+from utils.db import FEEDBACK_LOG, load_json
 
-def analyze_feedback(path="logs/feedback.json") -> str:
+def analyze_feedback(path=FEEDBACK_LOG) -> str:
     try:
-        with open(path, "r") as f:
-            entries = json.load(f)
+        entries = load_json(path)
 
         system_prompt = """
 You are a property maintenance system assistant.
@@ -0,0 +1,49 @@
+# scripts/profile_imports.py
+"""
+Report per-module import cost, e.g.
+
+    python scripts/profile_imports.py streamlit_app superstructures.ss1_gate.streamlit_frontend.landlord_dashboard
+
+Exits non-zero if any module's import time exceeds the budget
+(--budget-ms, or IMPORT_BUDGET_MS), so it can gate CI.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.import_profiler import check_budget, profile_imports, summarize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module import cost of the app's entry points.")
+    parser.add_argument("modules", nargs="*", default=["streamlit_app"], help="modules to import (default: streamlit_app)")
+    parser.add_argument("--top", type=int, default=15, help="rows to show per table")
+    parser.add_argument("--budget-ms", type=float, help="import-time budget per module (IMPORT_BUDGET_MS)")
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    for module in args.modules:
+        try:
+            summary = summarize(profile_imports(module, cwd=ROOT), top=args.top)
+        except RuntimeError as e:
+            print(e)
+            over_budget = True
+            continue
+        within = check_budget(summary, args.budget_ms)
+        over_budget |= not within
+        print(f"\n{module}: {summary['total_ms']} ms across {summary['modules']} modules"
+              f"{'' if within else '  (OVER BUDGET)'}")
+        print("  slowest modules (cumulative ms)")
+        for name, ms in summary["slowest_modules"]:
+            print(f"    {ms:>9.1f}  {name}")
+        print("  slowest packages (self ms)")
+        for name, ms in summary["slowest_packages"]:
+            print(f"    {ms:>9.1f}  {name}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+# scripts/prune_empty_threads.py
+"""
+Scheduled maintenance: delete chat threads that only hold the default
+"New conversation started." message. Meant for cron / a scheduled task, e.g.
+
+    */30 * * * *  cd /app && python scripts/prune_empty_threads.py
+
+Interrupted runs resume from the checkpoint file on the next invocation.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.thread_maintenance import prune_empty_threads
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, help="parallel scan segments (PRUNE_SEGMENTS)")
+    parser.add_argument("--page-size", type=int, help="items per scan page (PRUNE_PAGE_SIZE)")
+    parser.add_argument("--deletes-per-second", type=float,
+                        help="write capacity the job may use (PRUNE_DELETES_PER_SECOND)")
+    parser.add_argument("--min-age", type=float, help="seconds a thread must be idle (PRUNE_MIN_AGE_SECONDS)")
+    parser.add_argument("--checkpoint", dest="checkpoint_path", help="checkpoint file (PRUNE_CHECKPOINT_PATH)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    stats = prune_empty_threads(**{k: v for k, v in vars(args).items() if v is not None})
+    print(json.dumps(stats))
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
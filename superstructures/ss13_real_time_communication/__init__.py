@@ -1,6 +1,4 @@
 import streamlit as st
-import asyncio, logging
-import websockets
 
 # Simulated WebSocket server for real-time chat
 async def chat_server(websocket, path):
@@ -8,9 +6,11 @@ async def chat_server(websocket, path):
         response = f"Server received: {message}"
         await websocket.send(response)
 
-# Start WebSocket server (for demonstration purposes)
-async def start_server():
-    server = await websockets.serve(chat_server, "localhost", 8765)
+# Start WebSocket server (for demonstration purposes). Not started on import:
+# run it explicitly, e.g. asyncio.run(start_server()).
+async def start_server(host="localhost", port=8765):
+    import websockets
+    server = await websockets.serve(chat_server, host, port)
     await server.wait_closed()
 
 # Real-time communication module
@@ -28,9 +28,3 @@ def handle_real_time_communication():
     st.write("📞 Initiate a video call:")
     if st.button("Start Video Call"):
         st.info("Video call feature is under development.")
-
-# Run WebSocket server in the background (for demonstration purposes)
-try:
-    asyncio.get_event_loop().run_until_complete(start_server())
-except RuntimeError:
-    logging.warning("WebSocket server is already running.")
\ No newline at end of file
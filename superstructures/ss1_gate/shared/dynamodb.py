@@ -1,29 +1,8 @@
 from datetime import datetime
-import boto3
 import os
-import streamlit as st
+from utils.aws_backend import get_table
 
-# === AWS Credentials from secrets.toml
-try:
-    aws_access_key = st.secrets["AWS_ACCESS_KEY"]
-    aws_secret_key = st.secrets["AWS_SECRET_ACCESS_KEY"]
-    aws_region     = st.secrets.get("AWS_REGION", "us-east-1")
-except KeyError as e:
-    st.error(f"Missing AWS credential in secrets: {e}")
-    st.stop()
-
-# === Initialize DynamoDB Resource
-try:
-    dynamodb = boto3.resource(
-        "dynamodb",
-        region_name=aws_region,
-        aws_access_key_id=aws_access_key,
-        aws_secret_access_key=aws_secret_key
-    )
-    table = dynamodb.Table("landten_users")
-except Exception as e:
-    st.error(f"Failed to initialize DynamoDB: {e}")
-    st.stop()
+USERS_TABLE = "landten_users"
 
 def save_user_profile(profile: dict):
     """
@@ -43,7 +22,7 @@ def save_user_profile(profile: dict):
 
     try:
         # Save the profile to the table
-        table.put_item(Item=profile)
+        get_table(USERS_TABLE).put_item(Item=profile)
     except Exception as e:
         # Log the error and re-raise
         print(f"Error saving user profile: {e}")
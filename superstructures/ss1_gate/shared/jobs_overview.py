@@ -0,0 +1,65 @@
+"""
+Jobs Overview table for the landlord dashboard.
+
+Jobs are joined to their incidents by mapping incident_id to the incident's
+`issue` (first incident wins for duplicate ids, as before). The dashboard
+only fetches one page of jobs, so the frame is rebuilt on every render
+rather than cached, and the display formatting is applied only to the rows
+of the page being shown. The join map and row formatting are plain Python;
+pandas is imported when a frame is built.
+"""
+import math
+
+JOB_FIELDS = ["job_id", "incident_id", "priority", "job_type", "price", "assigned_contractor_id",
+              "accepted", "status", "created_by", "timestamp"]
+
+
+def _missing(value):
+    # None, or the NaN pandas fills in for absent fields
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def incident_issues(incidents):
+    """incident_id -> issue, keeping the first incident for a repeated id."""
+    issues = {}
+    for incident in incidents:
+        incident_id = incident.get("incident_id")
+        if not _missing(incident_id) and incident_id not in issues:
+            issues[incident_id] = incident.get("issue")
+    return issues
+
+
+def format_overview_row(row):
+    """One joined job row with the table's column names and defaults."""
+    def value(field, default):
+        return default if _missing(row.get(field)) else row[field]
+
+    return {
+        "Job ID": row.get("job_id"),
+        "Incident": value("issue", "N/A"),
+        "Priority": value("priority", "N/A"),
+        "Type": value("job_type", "N/A"),
+        "Price": row.get("price"),
+        "Assigned To": value("assigned_contractor_id", "—"),
+        "Accepted": "Yes" if value("accepted", False) else "No",
+        "Status": row.get("status"),
+        "Created By": value("created_by", "N/A"),
+        "Timestamp": value("timestamp", "—"),
+    }
+
+
+def build_jobs_overview(jobs, incidents):
+    """Raw joined frame: one row per job, in job order, plus the incident's `issue`."""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(jobs, columns=JOB_FIELDS)
+    frame["issue"] = frame["incident_id"].map(incident_issues(incidents))
+    return frame
+
+
+def overview_page(frame, start, end):
+    """Display rows [start, end) of the joined frame."""
+    import pandas as pd
+
+    rows = [format_overview_row(row) for row in frame.iloc[start:end].to_dict("records")]
+    return pd.DataFrame.from_records(rows, columns=list(format_overview_row({})))
@@ -0,0 +1,51 @@
+import logging
+import streamlit as st
+from utils.aws_backend import get_setting
+from utils.chat_delta import ChatDeltaListener
+from utils.chat_log import ChatLog
+
+WS_JWT_ALGORITHM = "HS256"
+
+def _client_token(thread_id):
+    """JWT the WebSocket server expects as the first frame; None if PyJWT isn't available."""
+    try:
+        import jwt
+    except ImportError:
+        logging.warning("PyJWT not installed; live chat updates are disabled.")
+        return None
+    # role lets landlords follow any thread (see websocket_connection_manager.authorize)
+    payload = {"thread_id": thread_id, "email": st.session_state.get("email"), "role": st.session_state.get("role")}
+    return jwt.encode(payload, get_setting("WS_JWT_SECRET", "your_jwt_secret_key"), algorithm=WS_JWT_ALGORITHM)
+
+def sync_live_chat(url):
+    """
+    Keep one listener per session on the selected thread and merge what it
+    received since the last rerun into st.session_state.chat_log (ChatLog
+    de-duplicates by id, so messages this session already added are no-ops).
+    Call it before the chat log is rendered.
+    """
+    thread_id = st.session_state.get("selected_thread")
+    listener = st.session_state.get("chat_listener")
+    if listener is not None and listener.thread_id != thread_id:
+        listener.stop()
+        listener = None
+    if listener is None and thread_id:
+        token = _client_token(thread_id)
+        if token is None:
+            return
+        listener = ChatDeltaListener(url, thread_id, st.session_state.get("chat_log", []), token=token).start()
+    st.session_state["chat_listener"] = listener
+    if listener is None:
+        return
+
+    messages, notifications = listener.drain()
+    for text in notifications:
+        st.toast(text)
+    if messages:
+        chat_log = st.session_state.get("chat_log")
+        if not isinstance(chat_log, ChatLog):
+            chat_log = st.session_state["chat_log"] = ChatLog(chat_log or [])
+        before = len(chat_log)
+        chat_log.extend(messages)
+        if len(chat_log) > before:
+            st.toast(f"{len(chat_log) - before} new message(s) in this thread")
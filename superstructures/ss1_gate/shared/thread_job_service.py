@@ -1,8 +1,9 @@
 import logging
 from datetime import datetime
 from uuid import uuid4
+from utils.thread_maintenance import start_background_prune
 from superstructures.ss5_summonengine.summon_engine import (
-    get_all_threads_from_dynamodb,
+    list_all_threads,
     delete_all_threads_from_dynamodb,
     save_message_to_dynamodb,
     upload_thread_to_s3
@@ -28,7 +29,7 @@ def generate_dummy_threads():
         }
         try:
             for msg in dummy_data["chat_log"]:
-                save_message_to_dynamodb(thread_id, msg)
+                save_message_to_dynamodb(thread_id, msg, rerun=False)
             upload_thread_to_s3(thread_id, dummy_data["chat_log"])
             dummy_threads.append(thread_id)
         except Exception as e:
@@ -37,18 +38,15 @@ def generate_dummy_threads():
 
 def fetch_and_display_threads():
     """Fetch and display threads from the database."""
-    threads = get_all_threads_from_dynamodb()
-    unique = {t['thread_id']: t for t in threads if 'thread_id' in t}
-    sorted_threads = sorted(unique.values(), key=lambda x: x.get('timestamp', ''), reverse=True)
-    return ["Select a Thread"] + [t['thread_id'] for t in sorted_threads]
+    return ["Select a Thread"] + [t['thread_id'] for t in list_all_threads()]
 
 def delete_all_threads():
     """Delete all threads from the database."""
     delete_all_threads_from_dynamodb()
 
 def prune_empty_threads():
-    """Prune threads that only contain default messages."""
-    threads = get_all_threads_from_dynamodb()
-    for thread in threads:
-        if len(thread.get("chat_log", [])) <= 1:
-            delete_all_threads_from_dynamodb()
\ No newline at end of file
+    """
+    Start pruning threads that only contain default messages in the
+    background (normally run on a schedule). False if a pass is already running.
+    """
+    return start_background_prune() is not None
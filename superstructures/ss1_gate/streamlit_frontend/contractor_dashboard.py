@@ -1,9 +1,6 @@
 # contractor_dashboard.py
 
 import streamlit as st
-import asyncio
-import websockets
-import threading
 import subprocess
 import json
 import logging
@@ -12,13 +9,18 @@ from datetime import datetime
 from uuid import uuid4
 from urllib.parse import quote
 from streamlit.components.v1 import html
+from superstructures.ss1_gate.shared.live_chat import sync_live_chat
+from utils.chat_log import ChatLog
 
 # -- Core Modules --
 from superstructures.ss1_gate.streamlit_frontend.ss1_gate_app import run_login
 from superstructures.ss2_pulse.ss2_pulse_app import run_router
-from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core, prune_empty_threads
+from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core
+from superstructures.ss1_gate.shared.thread_job_service import prune_empty_threads
 from superstructures.ss5_summonengine.summon_engine import (
-    get_all_threads_from_dynamodb,
+    flush_session_snapshots,
+    list_threads_for_user,
+    get_thread_messages,
     delete_all_threads_from_dynamodb,
     upload_thread_to_s3,
     save_message_to_dynamodb
@@ -26,7 +28,7 @@ from superstructures.ss5_summonengine.summon_engine import (
 from superstructures.ss3_trichatcore.chat_renderer import render_chat_thread
 from utils.db import get_chat_thread
 from superstructures.ss6_actionrelay.feedback_logger import submit_feedback
-from utils.db import get_feedback_by_job
+from utils.db import get_feedback_by_job, get_jobs_by_contractor
 
 # -- Config
 CLIENT_ID = st.secrets.get("COGNITO_CLIENT_ID")
@@ -34,15 +36,6 @@ COGNITO_DOMAIN = "https://us-east-1liycxnadt.auth.us-east-1.amazoncognito.com"
 REDIRECT_URI = "https://landtenmvp20.streamlit.app/"
 WEBSOCKET_SERVER_URL = "ws://localhost:8765"
 
-def get_jobs_by_contractor(contractor_id):
-    log_path = "logs/jobs.json"
-    if not os.path.exists(log_path):
-        logging.warning(f"Missing job log file: {log_path}")
-        return []
-    with open(log_path, "r") as f:
-        jobs = json.load(f)
-    return [job for job in jobs if job.get("assigned_contractor_id") == contractor_id]
-
 def run_contractor_dashboard():
     html("<style>body { font-family: 'SF Pro Display', sans-serif; }</style>")
 
@@ -53,16 +46,6 @@ def run_contractor_dashboard():
         except Exception as e:
             logging.error("WebSocket server failed to start: " + str(e))
 
-    def start_websocket_client():
-        async def listen():
-            async with websockets.connect(WEBSOCKET_SERVER_URL) as websocket:
-                while True:
-                    message = await websocket.recv()
-                    notification = json.loads(message)
-                    if notification.get("type") == "notification":
-                        st.toast(notification.get("message"))
-        threading.Thread(target=lambda: asyncio.run(listen()), daemon=True).start()
-
     def generate_dummy_threads():
         dummy_threads = []
         for i in range(5):
@@ -82,7 +65,7 @@ def run_contractor_dashboard():
             }
             try:
                 for msg in dummy_data["chat_log"]:
-                    save_message_to_dynamodb(thread_id, msg)
+                    save_message_to_dynamodb(thread_id, msg, rerun=False)
                 upload_thread_to_s3(thread_id, dummy_data["chat_log"])
                 dummy_threads.append(thread_id)
             except Exception as e:
@@ -91,10 +74,8 @@ def run_contractor_dashboard():
         return dummy_threads
 
     def fetch_and_display_threads():
-        threads = get_all_threads_from_dynamodb()
-        unique = {t['thread_id']: t for t in threads if 'thread_id' in t}
-        sorted_threads = sorted(unique.values(), key=lambda x: x.get('timestamp', ''), reverse=True)
-        return ["Select a Thread"] + [t['thread_id'] for t in sorted_threads]
+        threads, _ = list_threads_for_user(st.session_state.get("email", ""))
+        return ["Select a Thread"] + [t['thread_id'] for t in threads]
 
     # -- Debug Log Collector
     if "debug_logs" not in st.session_state:
@@ -108,6 +89,7 @@ def run_contractor_dashboard():
         st.title(f"🔧 **{st.session_state.get('email', 'Unknown')}**")
         if st.button("Logout"):
             try:
+                flush_session_snapshots()  # session end: push this session's pending thread snapshots to S3
                 st.session_state.clear()
                 logout_url = f"{COGNITO_DOMAIN}/logout?client_id={CLIENT_ID}&logout_uri={REDIRECT_URI}"
                 log_debug("success", "Logged out successfully.")
@@ -122,11 +104,7 @@ def run_contractor_dashboard():
         if selected != "Select a Thread":
             if st.session_state.get('selected_thread') != selected:
                 st.session_state['selected_thread'] = selected
-                chat_log = sorted(
-                    [t for t in get_all_threads_from_dynamodb() if t['thread_id'] == selected],
-                    key=lambda x: x['timestamp']
-                )
-                st.session_state['chat_log'] = list({t['id']: t for t in chat_log}.values())
+                st.session_state['chat_log'] = ChatLog(get_thread_messages(selected))
 
         with st.expander("🛠️ Thread Tools", expanded=False):
             if st.button("🧹 Delete All Threads"):
@@ -136,8 +114,10 @@ def run_contractor_dashboard():
                 st.rerun()
 
             if st.button("❎ Delete Empty Threads"):
-                prune_empty_threads()
-                log_debug("success", "Empty threads pruned.")
+                if prune_empty_threads():
+                    log_debug("success", "Empty-thread prune started in the background.")
+                else:
+                    log_debug("warning", "An empty-thread prune is already running.")
 
             if st.button("🎯 Generate Dummy Threads"):
                 threads = generate_dummy_threads()
@@ -163,6 +143,7 @@ def run_contractor_dashboard():
     persona = st.session_state.get("persona", "contractor").capitalize()
     log_debug("success", f"Welcome, {st.session_state.get('user_email', 'Guest')}! You are logged in as a **{persona}**.")
 
+    sync_live_chat(WEBSOCKET_SERVER_URL)
     if st.session_state.get("selected_thread"):
         with st.expander("📜 Messages", expanded=False):
             st.subheader(f"📂 Thread: {st.session_state['selected_thread']}")
@@ -260,5 +241,4 @@ def run_contractor_dashboard():
 
     # -- WebSocket Activation
     start_websocket_server()
-    start_websocket_client()
 
@@ -1,31 +1,27 @@
 # landlord_dashboard.py
 
 import streamlit as st
-import asyncio
-import websockets
-import threading
 import subprocess
 import json
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4
 from urllib.parse import quote
 from streamlit.components.v1 import html
-# List all Jobs Overview (Table View
-from utils.dev_tools import list_json_objects, load_json_from_s3
-import pandas as pd
+from superstructures.ss1_gate.shared.live_chat import sync_live_chat
+from utils.chat_log import ChatLog
 import math
-from superstructures.ss7_intelprint.report_engine import generate_pdf_report
 # from ss5_summonengine.chat_summarizer import summarize_chat_thread
 # from superstructures.ss6_actionrelay.job_manager import create_job
 
 # -- Core Modules --
 from superstructures.ss1_gate.streamlit_frontend.ss1_gate_app import run_login
 from superstructures.ss2_pulse.ss2_pulse_app import run_router
-from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core, prune_empty_threads
+from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core
 from superstructures.ss5_summonengine.summon_engine import (
-    get_all_threads_from_dynamodb,
+    flush_session_snapshots,
+    get_thread_messages,
     save_message_to_dynamodb
 )
 
@@ -38,8 +34,10 @@ from superstructures.ss1_gate.shared.thread_job_service import (
 )
 
 from utils.trust_score import compute_contractor_trust_scores
-from utils.db import load_all_feedback
-from superstructures.ss7_intelprint.report_engine import generate_pdf_report
+from utils.db import load_all_feedback, get_all_incidents
+from utils.db import job_filters
+# Jobs and incidents are read from their S3 objects, the copy shared by every app instance
+from utils.dev_tools import count_json_objects, list_json_page, load_json_objects
 
 # -- Config
 CLIENT_ID = st.secrets.get("COGNITO_CLIENT_ID")
@@ -48,11 +46,7 @@ REDIRECT_URI = "https://landtenmvp20.streamlit.app/"
 WEBSOCKET_SERVER_URL = "ws://localhost:8765"
 
 def load_incidents():
-    log_path = "logs/incidents.json"
-    if not os.path.exists(log_path):
-        return []
-    with open(log_path, "r") as f:
-        return json.load(f)
+    return get_all_incidents()
 
 def export_dialog(incident_id):
     st.write(f"Generate export for Incident ID: `{incident_id}`")
@@ -75,21 +69,12 @@ def run_landlord_dashboard():
     def start_websocket_server():
         subprocess.Popen(["python", "websocket_server.py"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-    def start_websocket_client():
-        async def listen():
-            async with websockets.connect(WEBSOCKET_SERVER_URL) as websocket:
-                while True:
-                    message = await websocket.recv()
-                    notification = json.loads(message)
-                    if notification.get("type") == "notification":
-                        st.toast(notification.get("message"))
-        threading.Thread(target=lambda: asyncio.run(listen()), daemon=True).start()
-
     # -- Sidebar
     with st.sidebar:
         st.title(f"🏠 Welcome **{st.session_state.get('email', 'Unknown')}**")
         if st.button("Logout"):
             try:
+                flush_session_snapshots()  # session end: push this session's pending thread snapshots to S3
                 st.session_state.clear()
                 logout_url = f"{COGNITO_DOMAIN}/logout?client_id={CLIENT_ID}&logout_uri={REDIRECT_URI}"
                 log_debug("success", "Logged out successfully.")
@@ -104,11 +89,7 @@ def run_landlord_dashboard():
         if selected != "Select a Thread":
             if st.session_state.get('selected_thread') != selected:
                 st.session_state['selected_thread'] = selected
-                chat_log = sorted(
-                    [t for t in get_all_threads_from_dynamodb() if t['thread_id'] == selected],
-                    key=lambda x: x['timestamp']
-                )
-                st.session_state['chat_log'] = list({t['id']: t for t in chat_log}.values())
+                st.session_state['chat_log'] = ChatLog(get_thread_messages(selected))
 
         with st.expander("🛠️ Thread Tools", expanded=False):
             if st.button("🧹 Delete All Threads"):
@@ -118,8 +99,10 @@ def run_landlord_dashboard():
                 st.rerun()
 
             if st.button("❎ Delete Empty Threads"):
-                prune_empty_threads()
-                log_debug("success", "Empty threads pruned.")
+                if prune_empty_threads():
+                    log_debug("success", "Empty-thread prune started in the background.")
+                else:
+                    log_debug("warning", "An empty-thread prune is already running.")
 
             if st.button("🎯 Generate Dummy Threads"):
                 threads = generate_dummy_threads()
@@ -130,6 +113,7 @@ def run_landlord_dashboard():
     persona = st.session_state.get("persona", "landlord").capitalize()
     log_debug("success", f"Welcome, {st.session_state.get('user_email', 'Guest')}! You are logged in as a **{persona}**.")
 
+    sync_live_chat(WEBSOCKET_SERVER_URL)
     if st.session_state.get("selected_thread"):
         with st.expander("📜 Messages", expanded=False):
             st.subheader(f"📂 Thread: {st.session_state['selected_thread']}")
@@ -143,45 +127,34 @@ def run_landlord_dashboard():
     # -- Chat Core
     run_chat_core()
 
-    import pandas as pd
-    # Fetch jobs + incidents from S3
-    job_keys = list_json_objects("jobs/")
-    incident_keys = list_json_objects("incidents/")
-
-    jobs = [load_json_from_s3(k) for k in job_keys]
-    incidents = [load_json_from_s3(k) for k in incident_keys]
-
     st.subheader("📇 Details")
     with st.expander("🏗️ Jobs Overview (Paginated)", expanded=True):
         try:
+            # Filters are pushed down to the job store; only one page is read
+            f1, f2, f3, f4 = st.columns(4)
+            status = f1.selectbox("Status", ["All", "pending", "created", "assigned", "accepted", "rejected", "completed"])
+            priority = f2.selectbox("Priority", ["All", "High", "Medium", "Low"])
+            contractor = f3.text_input("Contractor")
+            dates = f4.date_input("Created between", value=())
+            since = dates[0].isoformat() if len(dates) > 0 else None
+            until = (dates[1] + timedelta(days=1)).isoformat() if len(dates) > 1 else None
+            filters = job_filters(
+                status=None if status == "All" else status,
+                priority=None if priority == "All" else priority,
+                contractor=contractor.strip() or None,
+                since=since,
+                until=until,
+            )
 
-
-            # Merge jobs with incidents
-            merged = []
-            for job in jobs:
-                match = next((inc for inc in incidents if inc.get("incident_id") == job.get("incident_id")), {})
-                merged.append({
-                    "Job ID": job.get("job_id"),
-                    "Incident": match.get("issue", "N/A"),
-                    "Priority": job.get("priority", "N/A"),
-                    "Type": job.get("job_type", "N/A"),
-                    "Price": job.get("price"),
-                    "Assigned To": job.get("assigned_contractor_id", "—"),
-                    "Accepted": "Yes" if job.get("accepted") else "No",
-                    "Status": job.get("status"),
-                    "Created By": job.get("created_by", "N/A"),
-                    "Timestamp": job.get("timestamp", "—")
-                })
-
-            # Setup DataFrame
-            df = pd.DataFrame(merged)
             page_size = 10
-            total_jobs = len(df)
-            total_pages = (total_jobs - 1) // page_size + 1
+            total_jobs = count_json_objects("jobs/", filters)
+            total_pages = max(1, (total_jobs - 1) // page_size + 1)
 
-            # Session-state page tracker
-            if "job_page" not in st.session_state:
+            # Session-state page tracker (back to the first page when filters change)
+            if st.session_state.get("job_filters") != filters:
+                st.session_state.job_filters = filters
                 st.session_state.job_page = 0
+            st.session_state.job_page = min(st.session_state.get("job_page", 0), total_pages - 1)
 
             # Pagination controls
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -197,15 +170,21 @@ def run_landlord_dashboard():
                     unsafe_allow_html=True
                 )
 
-            # Slice current page
-            start_idx = st.session_state.job_page * page_size
-            end_idx = start_idx + page_size
-            st.dataframe(df.iloc[start_idx:end_idx], use_container_width=True)
+            # Fetch just the current page and the incidents it references
+            jobs, _ = list_json_page("jobs/", filters, page_size=page_size,
+                                     cursor=st.session_state.job_page * page_size)
+            incident_ids = {job.get("incident_id") for job in jobs}
+            incidents = [i for i in load_json_objects("incidents/") if i.get("incident_id") in incident_ids]
+            # pandas is only loaded once the overview is shown
+            from superstructures.ss1_gate.shared.jobs_overview import build_jobs_overview, overview_page
+            df = build_jobs_overview(jobs, incidents)
+            st.dataframe(overview_page(df, 0, len(df)), use_container_width=True)
 
         except Exception as e:
-            st.error(f"Failed to load or display jobs from S3: {e}")
-        
-    if not jobs:
+            st.error(f"Failed to load or display jobs: {e}")
+            total_jobs = 0
+
+    if not total_jobs:
         log_debug("info", "No jobs found.")
 
     # -- Contractor Trust Scores
@@ -215,14 +194,12 @@ def run_landlord_dashboard():
         for cid, score in scores.items():
             st.markdown(f"**{cid}**: ⭐ {score}/5")
 
-    st.success("🔗 All data fetched from S3 successfully.")
-
     PER_PAGE = 5
-    max_value = max(1, math.ceil(len(incidents)/PER_PAGE))
-    st.header(f"📋 Live Incident Listing : {len(incidents)}")
+    total_incidents = count_json_objects("incidents/")
+    max_value = max(1, math.ceil(total_incidents/PER_PAGE))
+    st.header(f"📋 Live Incident Listing : {total_incidents}")
     page = st.number_input("Incident Page", min_value=1, max_value=max_value, value=1)
-    start, end = (page - 1) * PER_PAGE, page * PER_PAGE
-    paginated = incidents[start:end]
+    paginated, _ = list_json_page("incidents/", page_size=PER_PAGE, cursor=(page - 1) * PER_PAGE)
 
     if not paginated:
         log_debug("info", "No incidents to display.")
@@ -280,7 +257,6 @@ def run_landlord_dashboard():
 
 
 
-
     # -- Tenant Feedback History
     feedback_entries = load_all_feedback()
 
@@ -326,7 +302,6 @@ def run_landlord_dashboard():
 
     # -- WebSocket Activation
     start_websocket_server()
-    start_websocket_client()
 
     # === Debug Log Collector
     if "debug_logs" not in st.session_state:
@@ -1,9 +1,6 @@
 # streamlit_app.py
 
 import streamlit as st
-import asyncio
-import websockets
-import threading
 import subprocess
 import json
 import logging
@@ -12,16 +9,22 @@ from datetime import datetime
 from uuid import uuid4
 from urllib.parse import quote
 from streamlit.components.v1 import html
+from superstructures.ss1_gate.shared.live_chat import sync_live_chat
+from utils.chat_log import ChatLog
 from utils.db import save_feedback, get_chat_thread, get_all_jobs, get_feedback_by_job
+from utils.db import get_incidents_by_user
 from superstructures.ss3_trichatcore.chat_renderer import render_chat_thread
 from superstructures.ss6_actionrelay.feedback_logger import submit_feedback
 
 # -- Core Modules --
 from superstructures.ss1_gate.streamlit_frontend.ss1_gate_app import run_login
 from superstructures.ss2_pulse.ss2_pulse_app import run_router
-from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core, prune_empty_threads
+from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core
+from superstructures.ss1_gate.shared.thread_job_service import prune_empty_threads
 from superstructures.ss5_summonengine.summon_engine import (
-    get_all_threads_from_dynamodb,
+    flush_session_snapshots,
+    list_threads_for_user,
+    get_thread_messages,
     delete_all_threads_from_dynamodb,
     upload_thread_to_s3,
     save_message_to_dynamodb
@@ -33,14 +36,6 @@ COGNITO_DOMAIN = "https://us-east-1liycxnadt.auth.us-east-1.amazoncognito.com"
 REDIRECT_URI = "https://landtenmvp20.streamlit.app/"
 WEBSOCKET_SERVER_URL = "ws://localhost:8765"
 
-def get_incidents_by_user(user_id):
-    log_path = "logs/incidents.json"
-    if not os.path.exists(log_path):
-        return []
-    with open(log_path, "r") as f:
-        incidents = json.load(f)
-    return [inc for inc in incidents if inc.get("tenant_id") == user_id]
-
 def run_tenant_dashboard():
     # -- Brand Overlay
     html("<style>body { font-family: 'SF Pro Display', sans-serif; }</style>")
@@ -50,16 +45,6 @@ def run_tenant_dashboard():
     def start_websocket_server():
         subprocess.Popen(["python", "websocket_server.py"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-    def start_websocket_client():
-        async def listen():
-            async with websockets.connect(WEBSOCKET_SERVER_URL) as websocket:
-                while True:
-                    message = await websocket.recv()
-                    notification = json.loads(message)
-                    if notification.get("type") == "notification":
-                        st.toast(notification.get("message"))
-        threading.Thread(target=lambda: asyncio.run(listen()), daemon=True).start()
-
     # -- Thread Builders
     def generate_dummy_threads():
         dummy_threads = []
@@ -80,7 +65,7 @@ def run_tenant_dashboard():
             }
             try:
                 for msg in dummy_data["chat_log"]:
-                    save_message_to_dynamodb(thread_id, msg)
+                    save_message_to_dynamodb(thread_id, msg, rerun=False)
                 upload_thread_to_s3(thread_id, dummy_data["chat_log"])
                 dummy_threads.append(thread_id)
             except Exception as e:
@@ -89,11 +74,8 @@ def run_tenant_dashboard():
         return dummy_threads
 
     def fetch_and_display_threads():
-        threads = get_all_threads_from_dynamodb()
-        unique = {t['thread_id']: t for t in threads if 'thread_id' in t}
-        sorted_threads = sorted(unique.values(), key=lambda x: x.get('timestamp', ''), reverse=True)
-        return ["Select a Thread"] + [t['thread_id'] for t in sorted_threads]
-
+        threads, _ = list_threads_for_user(st.session_state.get("email", ""))
+        return ["Select a Thread"] + [t['thread_id'] for t in threads]
 
     # -- Layout: Title + Chat
     persona = st.session_state.get("persona", "tenant").capitalize()
@@ -105,6 +87,7 @@ def run_tenant_dashboard():
         with st.sidebar:
             if st.button("Logout"):
                 try:
+                    flush_session_snapshots()  # session end: push this session's pending thread snapshots to S3
                     st.session_state.clear()
                     logout_url = f"{COGNITO_DOMAIN}/logout?client_id={CLIENT_ID}&logout_uri={REDIRECT_URI}"
                     log_debug("success", "Logged out successfully.")
@@ -119,11 +102,7 @@ def run_tenant_dashboard():
             if selected != "Select a Thread":
                 if st.session_state.get('selected_thread') != selected:
                     st.session_state['selected_thread'] = selected
-                    chat_log = sorted(
-                        [t for t in get_all_threads_from_dynamodb() if t['thread_id'] == selected],
-                        key=lambda x: x['timestamp']
-                    )
-                    st.session_state['chat_log'] = list({t['id']: t for t in chat_log}.values())
+                    st.session_state['chat_log'] = ChatLog(get_thread_messages(selected))
 
             with st.expander("🛠️ Thread Tools", expanded=False):
                 if st.button("🧹 Delete All Threads"):
@@ -133,8 +112,10 @@ def run_tenant_dashboard():
                     st.rerun()
 
                 if st.button("❎ Delete Empty Threads"):
-                    prune_empty_threads()
-                    log_debug("success", "Empty threads have been deleted successfully.")
+                    if prune_empty_threads():
+                        log_debug("success", "Empty-thread prune started in the background.")
+                    else:
+                        log_debug("warning", "An empty-thread prune is already running.")
 
                 if st.button("🎯 Generate Dummy Threads"):
                     threads = generate_dummy_threads()
@@ -157,6 +138,7 @@ def run_tenant_dashboard():
 
         st.title(f"🛡️ {persona} Dashboard")
 
+        sync_live_chat(WEBSOCKET_SERVER_URL)
         if st.session_state.get("selected_thread"):
             with st.expander("📜 Messages", expanded=False):
                 st.subheader(f"📂 Thread: {st.session_state['selected_thread']}")
@@ -256,9 +238,8 @@ def run_tenant_dashboard():
     </style>
     """)
 
-    # -- Start Real-time Server/Client
+    # -- Start Real-time Server
     start_websocket_server()
-    start_websocket_client()
 
 # === Debug Log Collector
 if "debug_logs" not in st.session_state:
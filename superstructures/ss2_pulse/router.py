@@ -1,21 +1,11 @@
 import streamlit as st
 
 # Chat-first architecture modules (TriChatLite)
-from superstructures.ss3_trichatcore.tri_chat_core import run_chat_core
-from superstructures.ss4_agenttoggle.agent_toggle_ui import run_agent_toggle
 from superstructures.ss5_summonengine.summon_engine import run_summon_engine
 from superstructures.ss6_actionrelay.actionrelay import run_action_relay
 
-# Optional: admin view
-from superstructures.tracker import show_tracker
-
-# Feature-specific modules
-from superstructures.ss9_maintenance_requests import handle_maintenance_requests
-from superstructures.ss10_task_assignment import assign_tasks_to_contractors
-from superstructures.ss11_performance_dashboard import show_performance_dashboard
-from superstructures.ss12_ai_suggestions import show_ai_suggestions
-from superstructures.ss13_real_time_communication import handle_real_time_communication
-from superstructures.ss14_interactive_extensions import show_interactive_extensions
+# Feature-specific modules (pandas, matplotlib, Google APIs, websockets) are
+# imported in the branch that shows them, so a persona only pays for its own.
 
 def route_user(persona: str):
 
@@ -33,6 +23,7 @@ def route_user(persona: str):
         st.info("💡 Tip: Use the chat to ask questions or report issues directly.")
 
         if st.session_state.get("action") == "submit_request":
+            from superstructures.ss9_maintenance_requests import handle_maintenance_requests
             handle_maintenance_requests()
 
         try:
@@ -59,18 +50,23 @@ def route_user(persona: str):
         st.info("💡 Tip: Use the dashboard to assign tasks and monitor property performance.")
 
         if st.session_state.get("action") == "assign_tasks":
+            from superstructures.ss10_task_assignment import assign_tasks_to_contractors
             assign_tasks_to_contractors()
 
         if st.session_state.get("action") == "view_performance":
+            from superstructures.ss11_performance_dashboard import show_performance_dashboard
             show_performance_dashboard()
 
         if st.session_state.get("action") == "ai_suggested_actions":
+            from superstructures.ss12_ai_suggestions import show_ai_suggestions
             show_ai_suggestions()
 
         if st.session_state.get("action") == "real_time_communication":
+            from superstructures.ss13_real_time_communication import handle_real_time_communication
             handle_real_time_communication()
 
         if st.session_state.get("action") == "interactive_extensions":
+            from superstructures.ss14_interactive_extensions import show_interactive_extensions
             show_interactive_extensions()
 
         try:
@@ -108,6 +104,7 @@ def route_user(persona: str):
     elif persona == "admin":
         st.title("Admin Dashboard")
         st.subheader("🔍 Monitor Platform Activities")
+        from superstructures.tracker import show_tracker
         show_tracker()
         st.info("💡 Tip: Use the tracker to view system logs and user activities.")
 
@@ -2,20 +2,20 @@
 import streamlit as st, json, os
 from datetime import datetime
 from uuid import uuid4
-from streamlit_elements import elements
 import logging
 import traceback
 import streamlit.components.v1 as components
-import boto3
-from botocore.exceptions import ClientError
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 
-from superstructures.ss5_summonengine.summon_engine import run_summon_engine, save_message_to_dynamodb, upload_thread_to_s3, get_all_threads_from_dynamodb
+from superstructures.ss5_summonengine.summon_engine import run_summon_engine, get_thread_messages, remember_session_thread
 from superstructures.ss7_mediastream import run_media_interface
 from superstructures.ss8_canvascard.canvascard import create_canvas_card
-from utils.chat_log_writer import load_chat_log, append_chat_log
+from utils.chat_log_writer import load_chat_log
+from utils.chat_log import ChatLog
+from utils.message_fragments import RENDER_WINDOW, render_message_fragment, visible_window
+from utils.message_pipeline import commit_message
 
 def initialize_session_state():
     if "persona" not in st.session_state:
@@ -32,24 +32,20 @@ def initialize_session_state():
             "email": st.session_state.get("email", "unknown"),
             "thread_id": st.session_state["thread_id"]
         }
+        st.session_state.chat_log = ChatLog([initial_message])
         try:
-            save_message_to_dynamodb(st.session_state["thread_id"], initial_message)
+            remember_session_thread(st.session_state["thread_id"])
+            commit_message(st.session_state["thread_id"], initial_message, st.session_state.chat_log)
         except Exception as e:
             logging.error(f"Failed to save initial message to DynamoDB: {e}")
             logging.error(traceback.format_exc())
-        st.session_state.chat_log = [initial_message]
     if "chat_log" not in st.session_state:
         try:
-            st.session_state['chat_log'] = list({
-                t['id']: t for t in sorted(
-                    [t for t in get_all_threads_from_dynamodb() if t['thread_id'] == st.session_state["selected_thread"]],
-                    key=lambda x: x['timestamp']
-                )
-            }.values())
+            st.session_state['chat_log'] = ChatLog(get_thread_messages(st.session_state["selected_thread"]))
         except Exception as e:
             logging.error(f"Failed to load chat log: {e}")
             logging.error(traceback.format_exc())
-            st.session_state.chat_log = []
+            st.session_state.chat_log = ChatLog()
     if "last_action" not in st.session_state:
         st.session_state.last_action = None
     if "show_upload" not in st.session_state:
@@ -60,35 +56,22 @@ def initialize_session_state():
         st.session_state["thread_media"] = {}  # Map thread_id to associated media
 
 def render_chat_log(chat_log):
-    """Render the chat log in a consistent and unique order."""
-    # Remove duplicates and sort messages by timestamp
-    unique_chat_log = {msg["id"]: msg for msg in sorted(chat_log, key=lambda x: x["timestamp"])}.values()
+    """Render the last RENDER_WINDOW messages (more on demand) from cached fragments."""
+    # Session chat logs are already de-duplicated and in timestamp order
+    unique_chat_log = chat_log if isinstance(chat_log, ChatLog) else ChatLog(chat_log)
 
-    st.markdown(f"### 💬 Conversation {st.session_state["current_thread"]}")
+    thread_key = st.session_state.get("current_thread")
+    st.markdown(f"### 💬 Conversation {thread_key}")
 
-    chat_html = ""
-    for msg in unique_chat_log:
-        role = msg.get("role", "").capitalize()
-        content = msg.get("message", "")
-        word_count = len(content.split()) if isinstance(content, str) else 0
-        use_canvas = word_count > 100 or any(
-            kw in content.lower() for kw in ["summary", "inference", "incident", "description", "transcription"]
-        ) if isinstance(content, str) else False
+    windows = st.session_state.setdefault("render_window", {})
+    window = windows.get(thread_key, RENDER_WINDOW)
+    hidden, visible = visible_window(unique_chat_log, window)
+    if hidden and st.button(f"⬆️ Load earlier messages ({hidden} hidden)", key=f"load_earlier_{thread_key}"):
+        window += RENDER_WINDOW
+        windows[thread_key] = window
+        hidden, visible = visible_window(unique_chat_log, window)
 
-        if use_canvas:
-            chat_html += f"""
-                <div style='background-color:#2b2b2b; padding:12px; margin:12px 0; border-left:4px solid #00c9a7;
-                            border-radius:8px; color:#eee;'>
-                    <strong>{role} - Summary:</strong><br>{content}
-                </div>
-            """
-        else:
-            chat_html += f"""
-                <div style='background-color:#1e1e1e; padding:10px; margin:8px 0;
-                            border-radius:10px; color:#eee;'>
-                    <strong>{role}:</strong><br>{content}
-                </div>
-            """
+    chat_html = "".join(render_message_fragment(msg)[0] for msg in visible)
 
     # Full scrollable div with consistent styling
     scrollable_box = f"""
@@ -108,25 +91,18 @@ def render_chat_log(chat_log):
     </script>
 """, height=0)
 
-def prune_empty_threads():
-    """Delete threads that only contain the default 'New conversation started.' message."""
-    dynamodb = boto3.resource('dynamodb',
-                          aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-                          aws_secret_access_key=st.secrets["AWS_SECRET_ACCESS_KEY"],
-                          region_name=st.secrets["AWS_REGION"])
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
+def commit_chat_message(thread_id, message):
+    """Add a message to the session log and commit it once; mirror and S3 snapshot follow asynchronously."""
+    message.setdefault("thread_id", thread_id)
+    message.setdefault("email", st.session_state.get("email", "unknown"))
+    st.session_state.chat_log.append(message)
+    remember_session_thread(thread_id)
     try:
-        response = table.scan()
-        with table.batch_writer() as batch:
-            for item in response.get("Items", []):
-                if item.get("message") == "New conversation started.":
-                    batch.delete_item(Key={
-                        "email": item["email"],
-                        "id": item["id"]
-                    })
-        st.success("Empty threads have been deleted successfully.")
-    except ClientError as e:
-        st.error(f"DynamoDB Error in prune_empty_threads: {e.response['Error']['Message']}")
+        if not commit_message(thread_id, message, st.session_state.chat_log):
+            st.error("Message could not be saved.")
+    except Exception as e:
+        logging.error(f"Failed to commit message to thread {thread_id}: {e}")
+        logging.error(traceback.format_exc())
 
 def run_chat_core():
     initialize_session_state()
@@ -150,9 +126,7 @@ def run_chat_core():
                     st.session_state["thread_media"][thread_id] = []
                 st.session_state["thread_media"][thread_id].append(media_msg)
                 if media_msg not in st.session_state.chat_log:
-                    st.session_state.chat_log.append(media_msg)
-                    append_chat_log(thread_id, media_msg)
-                    upload_thread_to_s3(thread_id, st.session_state.chat_log)  # Ensure thread is saved to S3
+                    commit_chat_message(thread_id, media_msg)
                 st.session_state["thread_media"].pop(thread_id, None)  # Clear media after upload
                 st.session_state.show_upload = False  # Ensure upload panel is closed
                 st.session_state.last_action = "media_upload"
@@ -165,9 +139,7 @@ def run_chat_core():
                     st.session_state["thread_media"][thread_id] = []
                 st.session_state["thread_media"][thread_id].append(media_msg)
                 if media_msg not in st.session_state.chat_log:
-                    st.session_state.chat_log.append(media_msg)
-                    append_chat_log(thread_id, media_msg)
-                    upload_thread_to_s3(thread_id, st.session_state.chat_log)  # Ensure thread is saved to S3
+                    commit_chat_message(thread_id, media_msg)
                 st.session_state["thread_media"].pop(thread_id, None)  # Clear media after capture
                 st.session_state.show_capture = False  # Ensure capture panel is closed
                 st.session_state.last_action = "media_capture"
@@ -206,13 +178,7 @@ def run_chat_core():
             "email": st.session_state.get("email", "unknown")
         }
         if user_msg not in st.session_state.chat_log:
-            st.session_state.chat_log.append(user_msg)
-            try:
-                append_chat_log(thread_id, user_msg)
-                save_message_to_dynamodb(thread_id, user_msg)
-            except Exception as e:
-                logging.error(f"Failed to save user message to DynamoDB: {e}")
-                logging.error(traceback.format_exc())
+            commit_chat_message(thread_id, user_msg)
             st.session_state.last_action = "text_input"
 
         try:
@@ -237,8 +203,7 @@ def run_chat_core():
                 "email": st.session_state.get("email", "unknown")
             }
             if agent_msg not in st.session_state.chat_log:
-                st.session_state.chat_log.append(agent_msg)
-                append_chat_log(thread_id, agent_msg)
+                commit_chat_message(thread_id, agent_msg)
 
     # Inject agent proposals dynamically
     if st.button("📅 Inject Proposal"):
@@ -250,9 +215,4 @@ def run_chat_core():
             "thread_id": thread_id,
             "email": st.session_state.get("email", "unknown")
         }
-        st.session_state.chat_log.append(proposal)
-        append_chat_log(thread_id, proposal)
-        upload_thread_to_s3(thread_id, st.session_state.chat_log)
-
-    # Prune empty threads at the end of the session
-    prune_empty_threads()
+        commit_chat_message(thread_id, proposal)
@@ -1,3 +1,4 @@
+import json
 from typing import List, Dict, Any
 from utils.gpt_call import call_gpt_model
 from utils.logger import log_agent_event
@@ -60,4 +61,44 @@ def process_agent_tag(chat_data: List[Dict[str, str]]) -> Dict[str, Any]:
     except Exception as e:
         # Optional logging stub — replace with actual logger if needed
         print(f"❌ GPT call failed: {e}")
-        return {"job_type": "", "description": "", "priority": "", "price": None}
\ No newline at end of file
+        return {"job_type": "", "description": "", "priority": "", "price": None}
+
+def generate_action_message(context: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+    """
+    Asks GPT for a short chat message announcing a job lifecycle event
+    (created/assigned/accepted) and the follow-up actions to offer.
+    `timeout` bounds the GPT request, in seconds.
+    """
+    start = time.time()
+
+    system_prompt = (
+        "You are the coordinator in a tenant-landlord-contractor chat.\n\n"
+        "Write one short message (max 30 words) telling the participants about the job update below, "
+        "and suggest the next actions as button labels.\n\n"
+        "Output only a JSON dictionary with keys:\n"
+        "message, actions"
+    )
+
+    prompt_payload = f"{system_prompt}\n\nJOB UPDATE:\n{json.dumps(context, default=str)}"
+
+    response = call_gpt_model(prompt_payload, timeout=timeout)
+    try:
+        result = json.loads(response)
+    except (TypeError, ValueError):
+        result = None
+    if not isinstance(result, dict):
+        # Not JSON, or JSON that isn't an object (a list, a bare string)
+        result = {"message": str(response), "actions": []}
+
+    log_agent_event({
+        "source": "agent_handler.generate_action_message",
+        "incident_id": context.get("incident_id"),
+        "job_id": context.get("job_id"),
+        "latency_ms": int((time.time() - start) * 1000),
+        "response_summary": {"message": result.get("message")},
+        "actions_proposed": result.get("actions", []),
+        "actions_executed": [],
+        "autonomy": False
+    })
+
+    return {"message": result.get("message", ""), "actions": result.get("actions", [])}
@@ -5,8 +5,13 @@ from datetime import datetime
 from uuid import uuid4
 from utils.gpt_call import call_gpt_agent, call_whisper, call_gpt_vision
 from utils.incident_writer import save_incident_from_media
-import boto3
-from botocore.exceptions import ClientError
+from utils.aws_backend import ClientError, get_setting, get_table, get_s3_client
+from utils.message_pipeline import validate_message, commit_message, get_message_pipeline
+from utils.thread_snapshots import flush_thread_snapshots, mark_thread_dirty, read_thread_snapshot
+from utils.presign_cache import presign_url, presign_urls
+from utils.cache import cached, invalidate
+from utils.dynamo_scan import ParallelScan, parallel_scan
+from utils.thread_queries import all_threads, page_threads, projection_kwargs, read_thread_messages, user_threads
 import logging
 
 # Configure logging
@@ -17,75 +22,44 @@ MEDIA_PATHS = {
     "image": "captured_image.jpg"
 }
 
-LOG_PATH = "logs/chat_thread_main.json"
-
-# Initialize AWS clients
-s3_client = boto3.client('s3',
-                         aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-                         aws_secret_access_key=st.secrets["AWS_SECRET_ACCESS_KEY"],
-                         region_name=st.secrets["AWS_REGION"])
-
-dynamodb = boto3.resource('dynamodb',
-                          aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-                          aws_secret_access_key=st.secrets["AWS_SECRET_ACCESS_KEY"],
-                          region_name=st.secrets["AWS_REGION"])
+S3_BUCKET = get_setting("S3_BUCKET")
 
 def validate_message_schema(message):
-    required_fields = ["id", "timestamp", "role", "message", "thread_id", "email"]
-    missing_fields = [field for field in required_fields if field not in message]
-    if missing_fields:
-        raise ValueError(f"Message is missing required fields: {missing_fields}")
-
-def save_message_to_dynamodb(thread_id, message):
+    validate_message(message)
+
+def save_message_to_dynamodb(thread_id, message, chat_log=None, rerun=True):
+    """
+    Commit one message through the message pipeline (a single DynamoDB write;
+    the mirror and S3 snapshot follow in the background when `chat_log` is
+    given), then rerun the script so the new message renders. Pass
+    rerun=False when saving several messages in a row.
+    """
     try:
         validate_message_schema(message)
-        table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
-        # st.warning(f"Saving message to DynamoDB for thread_id: {thread_id}, message: {message}")
-        table.put_item(Item=message)
     except ValueError as ve:
         logging.error(f"Schema validation error: {ve} message to DynamoDB for thread_id: {thread_id}, message: {message}")
         st.error(f"Schema validation error: {ve} message to DynamoDB for thread_id: {thread_id}, message: {message}")
         return False
-    except ClientError as e:
-        logging.error(f"DynamoDB Error in save_message_to_dynamodb: {e.response['Error']['Message']}")
-        st.error(f"DynamoDB Error in save_message_to_dynamodb: {e.response['Error']['Message']}")
+    remember_session_thread(thread_id)
+    if not commit_message(thread_id, message, chat_log):
+        st.error(f"DynamoDB Error in save_message_to_dynamodb: message for thread_id {thread_id} was not saved")
         return False
-    st.rerun()
-    st.success(f"Saved message to DynamoDB for thread_id: {thread_id}, message: {message}")
+    if rerun:
+        st.rerun()
     return True
 
-def append_chat_log(thread_id, message):
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
-    try:
-        # If the message contains media, store only the media_key
-        if "media" in message:
-            media_key = message.pop("media")
-            message["media_key"] = media_key
-
-        logging.debug(f"Appending message to chat_log for thread_id: {thread_id}, message: {message}")
-        try:
-            table.update_item(
-                Key={'thread_id': thread_id},
-                UpdateExpression="SET chat_log = list_append(if_not_exists(chat_log, :empty_list), :message)",
-                ExpressionAttributeValues={
-                    ':message': [message],
-                    ':empty_list': []
-                }
-            )
-            st.success(f"Chat log updated for thread_id: {thread_id}")
-        except ClientError as e:
-            logging.error(f"Error appending to chat_log: {e.response['Error']['Message']}")
-            st.error(f"Error appending to chat_log: {e.response['Error']['Message']}")
-    except ClientError as e:
-        logging.error(f"DynamoDB Error in append_chat_log: {e.response['Error']['Message']}")
-        st.error(f"DynamoDB Error in append_chat_log: {e.response['Error']['Message']}")
-        return False
-    return True
+def commit_chat_message(thread_id, message, chat_log):
+    """Append a message to `chat_log` and commit it once; mirror and S3 snapshot follow asynchronously."""
+    message.setdefault("thread_id", thread_id)
+    message.setdefault("email", st.session_state.get("email", "unknown"))
+    chat_log.append(message)
+    remember_session_thread(thread_id)
+    return commit_message(thread_id, message, chat_log)
 
 def save_incident_from_media(chat_log, persona, thread_id):
     incident = {
         "id": f"incident_{uuid4()}",
-        "full_chat": chat_log,
+        "full_chat": list(chat_log),
         "summary": chat_log[-1]["message"],
         "keywords": [],
         "persona": persona,
@@ -96,31 +70,25 @@ def save_incident_from_media(chat_log, persona, thread_id):
     }
 
     # Save incident to DynamoDB
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
+    table = get_table()
     try:
         table.put_item(Item=incident)
+        invalidate("threads")
     except ClientError as e:
         st.error(f"DynamoDB Error in save_incident_from_media: {e.response['Error']['Message']}")
         print(f"DynamoDB Error: {e.response['Error']['Message']}")
         return False
     return True
 
-def get_chat_log(thread_id):
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
-    try:
-        response = table.get_item(Key={'thread_id': thread_id})
-        chat_log = response.get("Item", {}).get("chat_log", [])
-        for message in chat_log:
-            if "media_key" in message:  # Check if media_key exists
-                message["media"] = s3_client.generate_presigned_url(
-                    "get_object",
-                    Params={"Bucket": st.secrets["S3_BUCKET"], "Key": message["media_key"]},
-                    ExpiresIn=3600  # URL valid for 1 hour
-                )
-        return chat_log
-    except ClientError as e:
-        st.error(f"DynamoDB Error in get_chat_log: {e.response['Error']['Message']}")
-        return []
+def attach_media_urls(messages):
+    """Set `media` to a presigned URL for every message with a media_key, signing each key at most once per hour."""
+    keys = [m["media_key"] for m in messages if m.get("media_key")]
+    if keys:
+        urls = presign_urls(S3_BUCKET, keys)
+        for message in messages:
+            if message.get("media_key"):
+                message["media"] = urls[message["media_key"]]
+    return messages
 
 def get_thread_id():
     if "thread_id" not in st.session_state:
@@ -146,7 +114,7 @@ def enforce_word_limit(user_input, max_words):
 
 def run_chat_core():
     thread_id = get_thread_id()
-    chat_log = get_chat_log(thread_id)
+    chat_log = get_thread_messages(thread_id)
     persona = st.session_state.get("persona", "tenant")
 
     # Display chat messages
@@ -160,16 +128,8 @@ def run_chat_core():
     if st.session_state.get("show_upload", False):
         uploaded_file = st.file_uploader("Upload a file", type=["jpg", "png", "wav"])
         if uploaded_file:
-            media_url = upload_media_to_s3(uploaded_file, thread_id)
-            if media_url:
-                media_msg = {
-                    "id": str(uuid4()),
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "role": persona,
-                    "message": f"[Media uploaded]({media_url})"
-                }
-                append_chat_log(thread_id, media_msg)
-                upload_thread_to_s3(thread_id, get_chat_log(thread_id))
+            # upload_media_to_s3 commits the media message itself
+            if upload_media_to_s3(uploaded_file, thread_id, chat_log):
                 st.session_state.last_action = "media_upload"
 
     if st.session_state.get("show_capture", False):
@@ -179,16 +139,15 @@ def run_chat_core():
     with st.form("chat_form", clear_on_submit=True):
         user_input = st.text_input("Type a message...")
         submitted = st.form_submit_button("Send")
-    if submitted and user_input.strip():   
-        append_chat_log(thread_id, {"message": user_input, "role": "agent"})
+    if submitted and user_input.strip():
         user_msg = {
             "id": str(uuid4()),
             "timestamp": datetime.utcnow().isoformat(),
             "role": persona,
             "message": user_input.strip()
         }
-        append_chat_log(thread_id, user_msg)
-        upload_thread_to_s3(thread_id, get_chat_log(thread_id))
+        if not commit_chat_message(thread_id, user_msg, chat_log):
+            st.error("Message could not be saved.")
         st.session_state.last_action = "text_input"
         try:
             agent_reply = run_summon_engine(
@@ -207,95 +166,140 @@ def run_chat_core():
                 "role": "agent",
                 "message": agent_reply
             }
-            append_chat_log(thread_id, agent_msg)
-            upload_thread_to_s3(thread_id, get_chat_log(thread_id))
+            if not commit_chat_message(thread_id, agent_msg, chat_log):
+                st.error("Failed to save agent message.")
             st.session_state.last_action = "text_input"
             st.session_state.chat_log.append(agent_msg)
 
+@cached(ttl=30, tags=("threads",))
 def get_all_threads_from_dynamodb():
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
+    """
+    Every item in the chat table, read with a parallel segmented scan. Only
+    for admin tools; use get_thread_messages / list_threads_for_user on hot paths.
+    """
     try:
         logging.debug("Fetching all threads from DynamoDB")
-        response = table.scan()
-        logging.debug(f"Fetched threads: {response.get('Items', [])}")
-        return response.get("Items", [])
+        items = list(parallel_scan(get_table()))
+        logging.debug(f"Fetched {len(items)} items")
+        return items
     except ClientError as e:
         logging.error(f"DynamoDB Error in get_all_threads_from_dynamodb: {e.response['Error']['Message']}")
         st.error(f"DynamoDB Error in get_all_threads_from_dynamodb: {e.response['Error']['Message']}")
         return []
 
-def delete_all_threads_from_dynamodb():
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
+def get_thread_messages(thread_id, projection=None):
+    """All messages of one thread in timestamp order; see utils/thread_queries.py."""
+    try:
+        return attach_media_urls(read_thread_messages(thread_id, projection=projection))
+    except ClientError as e:
+        logging.error(f"DynamoDB Error in get_thread_messages: {e.response['Error']['Message']}")
+        st.error(f"DynamoDB Error in get_thread_messages: {e.response['Error']['Message']}")
+        return []
+
+@cached(ttl=30, tags=("threads",))
+def _user_threads(email):
+    return user_threads(email)
+
+def list_threads_for_user(email, limit=None, start_key=None):
+    """
+    Threads the user has posted in, newest activity first, as
+    {"thread_id", "timestamp"} dicts.
+
+    Returns (threads, next_key): `limit` distinct threads per page, starting
+    at position `start_key` (None for the first page); next_key is None on
+    the last page. The user's projected items are read once and cached, so
+    paging doesn't re-query them.
+    """
+    try:
+        return page_threads(_user_threads(email), limit, start_key)
+    except ClientError as e:
+        logging.error(f"DynamoDB Error in list_threads_for_user: {e.response['Error']['Message']}")
+        st.error(f"DynamoDB Error in list_threads_for_user: {e.response['Error']['Message']}")
+        return [], None
+
+@cached(ttl=30, tags=("threads",))
+def list_all_threads():
+    """
+    Every thread id with its latest timestamp, newest first, for the landlord
+    view. Still a scan, but parallel and projected down to two attributes.
+    """
     try:
-        response = table.scan()
+        return all_threads()
+    except ClientError as e:
+        logging.error(f"DynamoDB Error in list_all_threads: {e.response['Error']['Message']}")
+        st.error(f"DynamoDB Error in list_all_threads: {e.response['Error']['Message']}")
+        return []
+
+def delete_all_threads_from_dynamodb():
+    table = get_table()
+
+    def delete_page(page):
+        # One batch writer per page, so the segments delete in parallel
         with table.batch_writer() as batch:
-            for item in response.get("Items", []):
+            for item in page.items:
                 # Use both Partition Key (email) and Sort Key (id) for deletion
                 batch.delete_item(Key={
                     "email": item["email"],
                     "id": item["id"]
                 })
-    except ClientError as e:
-        st.error(f"DynamoDB Error in delete_all_threads_from_dynamodb: {e.response['Error']['Message']}")
-
 
-def upload_thread_to_s3(thread_id, chat_log):
     try:
-        file_key = f"threads/{thread_id}.json"
-
-        # Upload the object
-        s3_client.put_object(
-            Bucket=st.secrets["S3_BUCKET"],
-            Key=file_key,
-            Body=json.dumps(chat_log, indent=2),
-            ContentType="application/json"
-        )
-
-        # Generate a pre-signed URL valid for 5 minutes (300 seconds)
-        presigned_url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": st.secrets["S3_BUCKET"], "Key": file_key},
-            ExpiresIn=300,
-            HttpMethod="GET"
-        )
-
-        st.success(f"Thread uploaded to S3. To view click [here]({presigned_url})")
-        return presigned_url
-
+        ParallelScan(table, **projection_kwargs(["email", "id"])).for_each_page(delete_page)
     except ClientError as e:
-        logging.error(f"S3 Upload Error: {e.response['Error']['Message']}")
-        st.error(f"S3 Upload Error: {e.response['Error']['Message']}")
-        return None
+        st.error(f"DynamoDB Error in delete_all_threads_from_dynamodb: {e.response['Error']['Message']}")
+    finally:
+        # Also after a partial delete
+        invalidate("threads")
 
 
-def upload_media_to_s3(file, thread_id):
+def upload_thread_to_s3(thread_id, chat_log):
+    """
+    Schedule threads/{thread_id}.json for upload. Snapshots are debounced per
+    thread and skipped when unchanged; see utils/thread_snapshots.py.
+    """
+    remember_session_thread(thread_id)
+    mark_thread_dirty(thread_id, chat_log)
+
+def remember_session_thread(thread_id):
+    """Note a thread this session wrote to, so logout flushes only its snapshots."""
+    st.session_state.setdefault("snapshot_threads", set()).add(thread_id)
+
+def flush_session_snapshots(timeout=5.0):
+    """
+    Session end: push the pending snapshots of this session's threads to S3.
+    Waits (up to `timeout`) for queued commits to mark their threads dirty
+    first; other sessions' threads keep their debounce interval.
+    """
+    get_message_pipeline().flush(timeout)
+    return sum(flush_thread_snapshots(thread_id) for thread_id in st.session_state.get("snapshot_threads", ()))
+
+
+def upload_media_to_s3(file, thread_id, chat_log=None):
     try:
         file_key = f"media/{thread_id}/{file.name}"
         st.success(f"Uploading media to S3 for thread_id: {thread_id}, file_key: {file_key}")
-        s3_client.upload_fileobj(file, st.secrets["S3_BUCKET"], file_key)
+        get_s3_client().upload_fileobj(file, S3_BUCKET, file_key)
 
-        # Generate a presigned URL for the uploaded media
-        presigned_url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": st.secrets["S3_BUCKET"], "Key": file_key},
-            ExpiresIn=3600  # URL valid for 1 hour
-        )
+        # Presigned URL for the uploaded media (cached, valid for 1 hour)
+        presigned_url = presign_url(S3_BUCKET, file_key)
 
         logging.debug(f"Media uploaded to S3 at URL: {presigned_url}")
 
-        # Create a user message with the presigned URL
+        # Store only the media_key; readers attach a fresh presigned URL (attach_media_urls)
         user_msg = {
             "id": str(uuid4()),
             "timestamp": datetime.utcnow().isoformat(),
             "role": st.session_state.get("persona", "unknown"),
-            "media": presigned_url,
+            "message": f"[Media uploaded]({presigned_url})",
+            "media_key": file_key,
             "thread_id": thread_id,
             "email": st.session_state.get("email", "unknown")
         }
 
-        # Append the message to the chat log and upload the thread to S3
-        append_chat_log(thread_id, user_msg)
-        upload_thread_to_s3(thread_id, get_chat_log(thread_id))
+        # One commit; the mirror and S3 snapshot follow in the background
+        if not commit_chat_message(thread_id, user_msg, chat_log if chat_log is not None else get_thread_messages(thread_id)):
+            st.error("Failed to save media message.")
+            return None
 
         # Display success message with the presigned URL
         st.success(f"Media uploaded successfully! Access it [here]({presigned_url})")
@@ -311,15 +315,18 @@ def upload_media_to_s3(file, thread_id):
 def get_thread_from_s3(thread_id):
     try:
         logging.debug(f"Fetching thread from S3 for thread_id: {thread_id}")
-        file_key = f"threads/{thread_id}.json"
-        response = s3_client.get_object(Bucket=st.secrets["S3_BUCKET"], Key=file_key)
-        thread_data = json.loads(response['Body'].read().decode('utf-8'))
+        # Snapshots may be gzip-encoded; see utils/thread_snapshots.py
+        thread_data = read_thread_snapshot(thread_id)
         logging.debug(f"Fetched thread data: {thread_data}")
         return thread_data
     except ClientError as e:
         logging.error(f"S3 Fetch Error: {e.response['Error']['Message']}")
         st.error(f"S3 Fetch Error: {e.response['Error']['Message']}")
         return []
+    except (OSError, ValueError) as e:
+        logging.error(f"Unreadable S3 snapshot for thread_id {thread_id}: {e}")
+        st.error(f"S3 Fetch Error: unreadable snapshot for thread {thread_id}")
+        return []
 
 def run_summon_engine(chat_log, user_input, persona, thread_id):
     """Refactored to use symbolic state transitions."""
@@ -383,13 +390,10 @@ def run_summon_engine(chat_log, user_input, persona, thread_id):
             "thread_id": thread_id,
             "email": st.session_state.get("email", "unknown")
         }
-        chat_log.append(agent_msg)
-
-        with open(LOG_PATH, "w") as f:
-            json.dump(chat_log, f, indent=2)
 
-        # Save message to DynamoDB
-        save_message_to_dynamodb(thread_id, agent_msg)
+        # One write to DynamoDB; the local mirror and S3 snapshot follow in the background
+        if not commit_chat_message(thread_id, agent_msg, chat_log):
+            st.error("Failed to save agent message.")
 
         # Trigger Incident Detection
         try:
@@ -397,8 +401,6 @@ def run_summon_engine(chat_log, user_input, persona, thread_id):
         except Exception as e:
             st.warning(f"Incident detection failed: {e}")
 
-        # Upload thread to S3
-        upload_thread_to_s3(thread_id, chat_log)
         st.session_state['agent_state'] = "completed"
 
         st.success("💡 Agent updated with media context.")
@@ -408,7 +410,7 @@ def run_summon_engine(chat_log, user_input, persona, thread_id):
     st.success(f"Final state: {states[st.session_state['agent_state']]}")
 
 def update_thread_timestamp_in_dynamodb(thread_id):
-    table = dynamodb.Table(st.secrets["DYNAMODB_TABLE"])
+    table = get_table()
     try:
         table.update_item(
             Key={"thread_id": thread_id},
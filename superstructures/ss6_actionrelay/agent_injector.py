@@ -0,0 +1,145 @@
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Callable, Optional
+from utils.db import append_chat_message
+from utils.logger import log_info
+
+
+def _default_generate(context: dict, timeout: Optional[float] = None) -> dict:
+    # Imported lazily: the GPT client reads st.secrets at import time
+    from superstructures.ss5_summonengine.agent_handler import generate_action_message
+    return generate_action_message(context, timeout=timeout)
+
+
+class AgentInjector:
+    """
+    Background queue for GPT action messages on job lifecycle events.
+
+    Lifecycle calls `enqueue()` a context and return straight away; a small
+    pool of worker threads calls GPT (each attempt bounded by `timeout`,
+    retried with backoff) and appends the reply to the incident's chat
+    thread. The default generator passes `timeout` to the OpenAI client, so
+    a hung request is abandoned rather than left holding a pool thread. When the queue is full the event is dropped and logged rather
+    than blocking the job mutation.
+    """
+
+    def __init__(self, generate: Optional[Callable] = None, append: Optional[Callable] = None,
+                 workers: int = 4, timeout: float = 20.0, retries: int = 2,
+                 backoff: float = 1.0, max_pending: int = 200):
+        self.generate = generate or functools.partial(_default_generate, timeout=timeout)
+        self.append = append or append_chat_message
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize=max_pending)
+        # Separate pool for the GPT calls so a hung request can be timed out;
+        # sized so a retry never queues behind the attempt it replaces.
+        self._calls = ThreadPoolExecutor(max_workers=workers * (retries + 1), thread_name_prefix="agent-gpt")
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "injected": 0, "failed": 0, "dropped": 0}
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"agent-injector-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def enqueue(self, context: dict) -> bool:
+        """Queue a lifecycle event; returns False if it was dropped."""
+        self._start()
+        try:
+            self._queue.put_nowait(dict(context))
+        except queue.Full:
+            self._count("dropped")
+            logging.warning(f"[Agent Injector] Queue full, dropped {context.get('status')} for {context.get('job_id')}")
+            return False
+        self._count("enqueued")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been processed (or `timeout` passes)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            context = self._queue.get()
+            try:
+                self._inject(context)
+            except Exception as e:
+                self._count("failed")
+                log_info(f"GPT Injection skipped: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _call_gpt(self, context: dict) -> dict:
+        for attempt in range(self.retries + 1):
+            future = self._calls.submit(self.generate, context)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeout:
+                # cancel() can't stop a call already running; the client timeout ends it
+                future.cancel()
+                error = TimeoutError(f"GPT call timed out after {self.timeout}s")
+            except Exception as e:
+                error = e
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        raise error
+
+    def _inject(self, context: dict) -> None:
+        agent_response = self._call_gpt(context)
+        chat_message = {
+            "sender": "agent",
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": agent_response["message"],
+            "actions": agent_response.get("actions", []),
+            "job_id": context.get("job_id"),
+        }
+        self.append(context["incident_id"], chat_message)
+        self._count("injected")
+        log_info(f"[Agent Injected] Job {context.get('status', '').capitalize()} → {chat_message['message']}")
+
+
+_injector: Optional[AgentInjector] = None
+_injector_lock = threading.Lock()
+
+
+def get_agent_injector() -> AgentInjector:
+    global _injector
+    with _injector_lock:
+        if _injector is None:
+            _injector = AgentInjector()
+        return _injector
+
+
+def set_agent_injector(injector: AgentInjector) -> None:
+    global _injector
+    with _injector_lock:
+        _injector = injector
+
+
+def inject_agent_message(context: dict) -> bool:
+    """Queue a GPT action message for a job lifecycle event without waiting for it."""
+    return get_agent_injector().enqueue(context)
@@ -1,8 +1,5 @@
-import json
-import os
 from datetime import datetime
-
-FEEDBACK_PATH = "logs/feedback.json"
+from utils.db import FEEDBACK_LOG as FEEDBACK_PATH, get_feedback_by_job, save_feedback
 
 def submit_feedback(feedback: dict):
     required = {"job_id", "submitted_by", "role", "rating", "notes"}
@@ -12,11 +9,7 @@ def submit_feedback(feedback: dict):
     feedback["timestamp"] = datetime.utcnow().isoformat()
 
     # Prevent duplicate submission by same user-role-job combo
-    if os.path.exists(FEEDBACK_PATH):
-        with open(FEEDBACK_PATH, "r") as f:
-            existing = json.load(f)
-    else:
-        existing = []
+    existing = get_feedback_by_job(feedback["job_id"])
 
     if any(
         f["job_id"] == feedback["job_id"] and
@@ -26,7 +19,4 @@ def submit_feedback(feedback: dict):
     ):
         raise ValueError("Feedback already submitted for this job by this user")
 
-    existing.append(feedback)
-
-    with open(FEEDBACK_PATH, "w") as f:
-        json.dump(existing, f, indent=2)
\ No newline at end of file
+    save_feedback(feedback)
\ No newline at end of file
@@ -1,10 +1,7 @@
-import os
-import json
 import uuid
 from datetime import datetime
-from utils.schema import incident_schema, IncidentSchema
-
-LOG_FILE = "logs/incidents.json"
+from utils.schema import IncidentSchema
+from utils.db import INCIDENTS_LOG as LOG_FILE, save_incident, get_all_incidents as _get_all_incidents, get_record_store
 
 def create_incident(data: dict) -> dict:
     # Validate required fields
@@ -37,31 +34,13 @@ def create_incident(data: dict) -> dict:
         created_by=created_by
     )
 
-    # Ensure log file exists
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    if not os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w") as f:
-            json.dump([], f)
-
     # Append incident to log file
-    with open(LOG_FILE, "r+") as f:
-        incidents = json.load(f)
-        incidents.append(incident)
-        f.seek(0)
-        json.dump(incidents, f, indent=4)
+    save_incident(incident)
 
     return incident
 
 def get_all_incidents() -> list:
-    if not os.path.exists(LOG_FILE):
-        return []
-
-    with open(LOG_FILE, "r") as f:
-        return json.load(f)
+    return _get_all_incidents()
 
 def get_incident_by_id(incident_id: str) -> dict:
-    incidents = get_all_incidents()
-    for incident in incidents:
-        if incident["incident_id"] == incident_id:
-            return incident
-    return None
\ No newline at end of file
+    return get_record_store("incidents").get(incident_id)
\ No newline at end of file
@@ -1,14 +1,30 @@
-import os
-import json
 import uuid
 from datetime import datetime
 from utils.schema import JobSchema
-from ss5_summonengine.agent_handler import generate_action_message
-from utils.db import append_chat_message, load_json, save_json
-from utils.logger import log_info
+from utils.db import JOBS_LOG, get_record_store
+from utils.cache import invalidate
+from superstructures.ss6_actionrelay.agent_injector import inject_agent_message
 from auto_assigner import suggest_best_contractor
 
-LOG_FILE = "logs/jobs.json"
+LOG_FILE = JOBS_LOG
+
+def _jobs():
+    # All job reads/writes go through the locked, append-only jobs store
+    return get_record_store("jobs")
+
+def _update_job(job_id: str, check, updates: dict) -> dict:
+    """Locked read-check-patch of a single job; `check` raises to abort."""
+    store = _jobs()
+    with store.locked():
+        job = store.get(job_id)
+        if not job:
+            raise ValueError(f"Job with ID {job_id} not found.")
+        if check:
+            check(job)
+        store.patch(job_id, updates)
+    invalidate("jobs")
+    job.update(updates)
+    return job
 
 def create_job(data: dict) -> dict:
     # Validate required fields
@@ -37,199 +53,103 @@ def create_job(data: dict) -> dict:
         created_by=created_by
     )
 
-    # Ensure log file exists
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    if not os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w") as f:
-            json.dump([], f)
-
     # Append job to log file
-    with open(LOG_FILE, "r+") as f:
-        jobs = json.load(f)
-        jobs.append(job)
-        f.seek(0)
-        json.dump(jobs, f, indent=4)
-
-    # Generate GPT action message
-    agent_response = generate_action_message(data)
-
-    # Format as chat message block
-    chat_message = {
-        "sender": "agent",
-        "timestamp": datetime.utcnow().isoformat(),
-        "message": agent_response["message"],
-        "actions": agent_response.get("actions", [])
-    }
-
-    # Append to chat log
-    thread_file = f"logs/chat_thread_{data['incident_id']}.json"
-
-    if os.path.exists(thread_file):
-        with open(thread_file, "r") as f:
-            thread = json.load(f)
-    else:
-        thread = []
-
-    thread.append(chat_message)
-
-    with open(thread_file, "w") as f:
-        json.dump(thread, f, indent=2)
-
-    # After job is written to JSON log
-    context = {
-        "job_id": job.job_id,
-        "incident_id": job.incident_id,
+    _jobs().append(job)
+    invalidate("jobs")
+
+    # GPT action message is generated in the background and lands in the chat later
+    inject_agent_message({
+        "job_id": job["job_id"],
+        "incident_id": job["incident_id"],
+        "job_type": job["job_type"],
+        "priority": job["priority"],
+        "description": job["description"],
         "status": "created",
-        "actor": st.session_state.get("user_id", "unknown")
-    }
-
-    try:
-        agent_msg = generate_action_message(context)
-        append_chat_message(context["incident_id"], agent_msg)
-        log_info(f"[Agent Injected] Job Created → {agent_msg['message']}")
-    except Exception as e:
-        log_info(f"GPT Injection skipped: {e}")
+        "actor": created_by
+    })
 
     return job
 
 def assign_job(job_id: str, contractor_email: str = None) -> dict:
-    # Load jobs
-    if not os.path.exists(LOG_FILE):
-        raise ValueError("No jobs found.")
-
-    with open(LOG_FILE, "r+") as f:
-        jobs = json.load(f)
-        job = next((j for j in jobs if j["job_id"] == job_id), None)
+    if not contractor_email:
+        # GPT suggestion runs before taking the lock
+        job = _jobs().get(job_id)
         if not job:
             raise ValueError(f"Job with ID {job_id} not found.")
+        # This list can later be dynamic based on status
+        all_contractors = ["alex@fixitco.com", "sam@hvacpro.com"]
+        contractor_email = suggest_best_contractor(job, all_contractors)
 
-        if not contractor_email:
-            # This list can later be dynamic based on status
-            all_contractors = ["alex@fixitco.com", "sam@hvacpro.com"]
-            contractor_email = suggest_best_contractor(job, all_contractors)
-
-        if not contractor_email:
-            raise ValueError("No contractor could be auto-assigned.")
+    if not contractor_email:
+        raise ValueError("No contractor could be auto-assigned.")
 
-        job["assigned_contractor_id"] = contractor_email
-        f.seek(0)
-        json.dump(jobs, f, indent=4)
+    job = _update_job(job_id, None, {"assigned_contractor_id": contractor_email})
 
-        # After contractor_id written
-        context = {
-            "job_id": job_id,
-            "incident_id": job["incident_id"],
-            "status": "assigned",
-            "actor": contractor_email
-        }
+    # After contractor_id written
+    inject_agent_message({
+        "job_id": job_id,
+        "incident_id": job["incident_id"],
+        "status": "assigned",
+        "actor": contractor_email
+    })
 
-        try:
-            agent_msg = generate_action_message(context)
-            append_chat_message(context["incident_id"], agent_msg)
-            log_info(f"[Agent Injected] Job Assigned → {agent_msg['message']}")
-        except Exception as e:
-            log_info(f"GPT Injection skipped: {e}")
+    return job
 
-        return job
+def _check_pending_decision(contractor_id: str):
+    def check(job):
+        if job["accepted"] is not None:
+            raise ValueError("Decision already made")
+        if job["assigned_contractor_id"] != contractor_id:
+            raise ValueError("Contractor ID does not match the assigned contractor.")
+    return check
 
 def accept_job(job_id: str, contractor_id: str) -> dict:
-    # Load jobs
-    if not os.path.exists(LOG_FILE):
-        raise ValueError("No jobs found.")
-
-    with open(LOG_FILE, "r+") as f:
-        jobs = json.load(f)
-        for job in jobs:
-            if job["job_id"] == job_id:
-                if job["accepted"] is not None:
-                    raise ValueError("Decision already made")
-                if job["assigned_contractor_id"] != contractor_id:
-                    raise ValueError("Contractor ID does not match the assigned contractor.")
-                job["accepted"] = True
-                job["status"] = "accepted"
-                job["timestamp"] = datetime.utcnow().isoformat()
-                f.seek(0)
-                json.dump(jobs, f, indent=4)
-
-                # After status update to "accepted"
-                context = {
-                    "job_id": job_id,
-                    "incident_id": job["incident_id"],
-                    "status": "accepted",
-                    "actor": contractor_id
-                }
-
-                try:
-                    agent_msg = generate_action_message(context)
-                    append_chat_message(context["incident_id"], agent_msg)
-                    log_info(f"[Agent Injected] Job Accepted → {agent_msg['message']}")
-                except Exception as e:
-                    log_info(f"GPT Injection skipped: {e}")
-
-                return job
-
-    raise ValueError(f"Job with ID {job_id} not found.")
+    job = _update_job(job_id, _check_pending_decision(contractor_id), {
+        "accepted": True,
+        "status": "accepted",
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+    # After status update to "accepted"
+    inject_agent_message({
+        "job_id": job_id,
+        "incident_id": job["incident_id"],
+        "status": "accepted",
+        "actor": contractor_id
+    })
+
+    return job
 
 def reject_job(job_id: str, contractor_id: str) -> dict:
-    # Load jobs
-    if not os.path.exists(LOG_FILE):
-        raise ValueError("No jobs found.")
-
-    with open(LOG_FILE, "r+") as f:
-        jobs = json.load(f)
-        for job in jobs:
-            if job["job_id"] == job_id:
-                if job["accepted"] is not None:
-                    raise ValueError("Decision already made")
-                if job["assigned_contractor_id"] != contractor_id:
-                    raise ValueError("Contractor ID does not match the assigned contractor.")
-                job["accepted"] = False
-                job["status"] = "rejected"
-                job["timestamp"] = datetime.utcnow().isoformat()
-                f.seek(0)
-                json.dump(jobs, f, indent=4)
-                return job
-
-    raise ValueError(f"Job with ID {job_id} not found.")
+    return _update_job(job_id, _check_pending_decision(contractor_id), {
+        "accepted": False,
+        "status": "rejected",
+        "timestamp": datetime.utcnow().isoformat()
+    })
 
 def get_jobs_for_contractor(contractor_id: str) -> list:
-    # Load jobs
-    if not os.path.exists(LOG_FILE):
-        return []
-
-    with open(LOG_FILE, "r") as f:
-        jobs = json.load(f)
-        return [
-            job for job in jobs
-            if job.get("assigned_contractor_id") == contractor_id and job.get("status") in ["pending", "assigned", "accepted"]
-        ]
+    return [
+        job for job in _jobs().find("assigned_contractor_id", contractor_id)
+        if job.get("status") in ["pending", "assigned", "accepted"]
+    ]
 
 def propose_schedule(job_id: str, contractor_id: str, schedule: str) -> dict:
-    # Load jobs
-    if not os.path.exists(LOG_FILE):
-        raise ValueError("No jobs found.")
-
-    with open(LOG_FILE, "r+") as f:
-        jobs = json.load(f)
-        for job in jobs:
-            if job["job_id"] == job_id:
-                if job["assigned_contractor_id"] != contractor_id:
-                    raise ValueError("Contractor ID does not match the assigned contractor.")
-                job["proposed_schedule"] = schedule
-                job["timestamp"] = datetime.utcnow().isoformat()
-                f.seek(0)
-                json.dump(jobs, f, indent=4)
-                return job
-
-    raise ValueError(f"Job with ID {job_id} not found.")
+    def check(job):
+        if job["assigned_contractor_id"] != contractor_id:
+            raise ValueError("Contractor ID does not match the assigned contractor.")
+
+    return _update_job(job_id, check, {
+        "proposed_schedule": schedule,
+        "timestamp": datetime.utcnow().isoformat()
+    })
 
 def complete_job(job_id: str, feedback: dict) -> bool:
-    jobs = load_json("logs/jobs.json")
-    job = next((j for j in jobs if j["job_id"] == job_id), None)
-    if not job:
+    try:
+        _update_job(job_id, None, {
+            "status": "completed",
+            "completed_at": datetime.now().isoformat(),
+            "feedback": feedback
+        })
+    except ValueError:
         raise ValueError("Job not found.")
-    job["status"] = "completed"
-    job["completed_at"] = datetime.now().isoformat()
-    job["feedback"] = feedback
-    save_json("logs/jobs.json", jobs)
     return True
\ No newline at end of file
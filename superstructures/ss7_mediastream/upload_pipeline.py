@@ -1,24 +1,19 @@
 # upload_pipeline.py
-import streamlit as st, boto3, os, json, base64
+import streamlit as st, os, json, base64
 from datetime import datetime
 from uuid import uuid4
 from dotenv import load_dotenv
 from utils.gpt_call import call_whisper, call_gpt_vision
 from utils.incident_writer import save_incident_from_media
+from utils.aws_backend import get_s3_client
+from utils.presign_cache import presign_url
 
 load_dotenv()
-AWS_ACCESS_KEY_ID = st.secrets["AWS_ACCESS_KEY"]
-AWS_SECRET_ACCESS_KEY = st.secrets["AWS_SECRET_ACCESS_KEY"]
 AWS_S3_BUCKET = "landtena"
 
-s3 = boto3.client("s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-)
-
 def upload_file(file_bytes, filename, content_type):
     try:
-        s3.put_object(Bucket=AWS_S3_BUCKET, Key=filename, Body=file_bytes, ContentType=content_type)
+        get_s3_client().put_object(Bucket=AWS_S3_BUCKET, Key=filename, Body=file_bytes, ContentType=content_type)
         return True
     except Exception as e:
         st.error(f"Upload error: {e}")
@@ -50,12 +45,7 @@ def handle_uploaded_media():
                 #b64_img = base64.b64encode(file_bytes).decode("utf-8")
                 #file_display = f"<img src='data:{content_type};base64,{b64_img}' width='300'/>"
                 file_display = f"<div>Refer the image in this link for now. Need to find a way to show the image here eventually</div>"
-                presigned_url = s3.generate_presigned_url(
-                    "get_object",
-                    Params={"Bucket": st.secrets["S3_BUCKET"], "Key": filename},
-                    ExpiresIn=3600,
-                    HttpMethod="GET"
-                )
+                presigned_url = presign_url(st.secrets["S3_BUCKET"], filename)
 
         save_incident_from_media(filename, result, content_type)
 
@@ -1,21 +1,19 @@
 import streamlit as st
-import boto3
 import os
 import io
 from datetime import datetime
 from dotenv import load_dotenv
+from utils.aws_backend import get_s3_client
 
 load_dotenv()
 
 # --- AWS CONFIG ---
 AWS_BUCKET = os.getenv("AWS_S3_BUCKET_NAME", "LandTena")
-AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 
 # --- Upload Logic ---
 def upload_to_s3_bytes(byte_data, filename, content_type):
     try:
-        s3 = boto3.client("s3", region_name=AWS_REGION)
-        s3.put_object(
+        get_s3_client().put_object(
             Bucket=AWS_BUCKET,
             Key=filename,
             Body=byte_data,
@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from superstructures.ss6_actionrelay import agent_injector
+from superstructures.ss6_actionrelay.agent_injector import AgentInjector
+
+class TestAgentInjector(unittest.TestCase):
+
+    def setUp(self):
+        self.appended = []
+        self.append = lambda incident_id, msg: self.appended.append((incident_id, msg))
+
+    def test_enqueue_returns_before_gpt_finishes(self):
+        release = threading.Event()
+
+        def slow_generate(context):
+            release.wait(5)
+            return {"message": f"Job {context['status']}", "actions": ["Accept Job"]}
+
+        injector = AgentInjector(generate=slow_generate, append=self.append, workers=2)
+        start = time.monotonic()
+        self.assertTrue(injector.enqueue({"job_id": "j1", "incident_id": "i1", "status": "created"}))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(self.appended, [])
+        release.set()
+        self.assertTrue(injector.flush(timeout=5))
+        self.assertEqual(self.appended[0][0], "i1")
+        self.assertEqual(self.appended[0][1]["message"], "Job created")
+        self.assertEqual(self.appended[0][1]["actions"], ["Accept Job"])
+
+    def test_retries_after_failure_and_timeout(self):
+        calls = []
+
+        def flaky_generate(context):
+            calls.append(context)
+            if len(calls) == 1:
+                raise RuntimeError("rate limited")
+            if len(calls) == 2:
+                time.sleep(0.5)
+            return {"message": "ok"}
+
+        injector = AgentInjector(generate=flaky_generate, append=self.append,
+                                 workers=1, timeout=0.1, retries=2, backoff=0)
+        injector.enqueue({"job_id": "j1", "incident_id": "i1", "status": "assigned"})
+        self.assertTrue(injector.flush(timeout=5))
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(injector.stats["injected"], 1)
+
+    def test_gives_up_after_retries(self):
+        def failing_generate(context):
+            raise RuntimeError("down")
+
+        injector = AgentInjector(generate=failing_generate, append=self.append,
+                                 workers=1, retries=1, backoff=0)
+        injector.enqueue({"job_id": "j1", "incident_id": "i1", "status": "accepted"})
+        self.assertTrue(injector.flush(timeout=5))
+        self.assertEqual(self.appended, [])
+        self.assertEqual(injector.stats["failed"], 1)
+
+    def test_default_generator_gets_the_request_timeout(self):
+        seen = []
+        with mock.patch.object(agent_injector, "_default_generate",
+                               lambda context, timeout=None: seen.append(timeout) or {"message": "ok"}):
+            injector = AgentInjector(append=self.append, workers=1, timeout=3.5)
+        injector.enqueue({"job_id": "j1", "incident_id": "i1", "status": "created"})
+        self.assertTrue(injector.flush(timeout=5))
+        self.assertEqual(seen, [3.5])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import utils.aws_backend as aws_backend
+
+class TestClientRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+        self._create = aws_backend._create
+
+        def create(kind, service_name, **kwargs):
+            self.created.append((kind, service_name, kwargs.get("endpoint_url")))
+            return object()
+
+        aws_backend._create = create
+        aws_backend._clients.clear()
+        aws_backend.set_aws_backend()
+
+    def tearDown(self):
+        aws_backend._create = self._create
+        aws_backend._clients.clear()
+        aws_backend.set_aws_backend()
+
+    @unittest.skipIf(aws_backend.fake_backend_enabled(), "real-client registry only")
+    def test_one_client_per_service_and_endpoint_across_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: aws_backend.get_aws_client("dynamodbstreams"), range(32)))
+        self.assertEqual(len({id(c) for c in clients}), 1)
+        other = aws_backend.get_aws_client("apigatewaymanagementapi", endpoint_url="https://ws.example")
+        self.assertIsNot(other, clients[0])
+        self.assertEqual(len(self.created), 2)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            s3_clients = set(map(id, pool.map(lambda _: aws_backend.get_s3_client(), range(16))))
+        self.assertEqual(len(s3_clients), 1)
+
+    def test_injected_clients_take_precedence(self):
+        client = object()
+        aws_backend.set_aws_client("dynamodbstreams", client)
+        self.assertIs(aws_backend.get_aws_client("dynamodbstreams"), client)
+        aws_backend.set_aws_client("dynamodbstreams", None)
+        self.assertEqual(aws_backend._clients, {})
+
+if __name__ == "__main__":
+    unittest.main()
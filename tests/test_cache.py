@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+import utils.db as db
+from utils.cache import TTLCache, cached, get_cache, invalidate
+from utils.record_index import IndexedRecordStore
+from utils.record_store import JsonlRecordStore
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(max_entries=2, clock=lambda: self.now)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set(("k",), 1, ttl=10, tags=("jobs",))
+        self.assertEqual(self.cache.get(("k",)), (True, 1))
+        self.now = 10
+        self.assertEqual(self.cache.get(("k",)), (False, None))
+
+    def test_invalidate_by_tag_and_lru_bound(self):
+        self.cache.set(("a",), 1, ttl=10, tags=("jobs",))
+        self.cache.set(("b",), 2, ttl=10, tags=("feedback",))
+        self.assertEqual(self.cache.invalidate("jobs"), 1)
+        self.assertFalse(self.cache.get(("a",))[0])
+        self.cache.set(("c",), 3, ttl=10, tags=())
+        self.cache.set(("d",), 4, ttl=10, tags=())
+        self.assertFalse(self.cache.get(("b",))[0])
+
+    def test_set_after_invalidate_race_is_dropped(self):
+        generation = self.cache.generation(("jobs",))
+        self.cache.invalidate("jobs")
+        self.assertFalse(self.cache.set(("k",), "stale", ttl=10, tags=("jobs",), generation=generation))
+
+    def test_generations_are_pruned_with_their_entries(self):
+        cache = TTLCache(max_entries=4, clock=lambda: self.now)
+        for i in range(20):
+            cache.set((i,), i, ttl=10, tags=(f"chat:{i}",))
+            cache.invalidate(f"chat:{i}")
+        self.assertLessEqual(len(cache._generations), cache.max_entries)
+
+    def test_pruned_tag_still_drops_a_racing_set(self):
+        cache = TTLCache(max_entries=1, clock=lambda: self.now)
+        generation = cache.generation(("chat:1",))
+        cache.invalidate("chat:1")
+        cache.invalidate("chat:2")  # more counters than entries: both pruned
+        self.assertEqual(cache._generations, {})
+        self.assertFalse(cache.set(("k",), "stale", ttl=10, tags=("chat:1",), generation=generation))
+        generation = cache.generation(("chat:1",))
+        self.assertTrue(cache.set(("k",), "fresh", ttl=10, tags=("chat:1",), generation=generation))
+
+class TestCachedReads(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original = db.get_record_store("jobs")
+        db.set_record_store("jobs", IndexedRecordStore(
+            JsonlRecordStore(os.path.join(self.tmp_dir, "jobs.json"), key="job_id"), ["status"]))
+
+    def tearDown(self):
+        db.set_record_store("jobs", self.original)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hits_return_copies_and_unhashable_args_work(self):
+        @cached(ttl=60, tags=("test",))
+        def load(filters):
+            self.calls.append(filters)
+            return [{"n": len(self.calls)}]
+
+        first = load({"status": "pending"})
+        first[0]["n"] = 99
+        first.append({"n": 100})
+        self.assertEqual(load({"status": "pending"}), [{"n": 1}])
+        load({"status": "done"})
+        self.assertEqual(len(self.calls), 2)
+        invalidate("test")
+        load({"status": "pending"})
+        self.assertEqual(len(self.calls), 3)
+
+    def test_copies_are_shallow_below_rows_and_optional(self):
+        nested = {"tags": ["a"]}
+
+        @cached(ttl=60, tags=("test",))
+        def page():
+            return [{"nested": nested}], "cursor"
+
+        rows, cursor = page()
+        rows[0]["extra"] = 1
+        self.assertEqual(page(), ([{"nested": nested}], "cursor"))
+        self.assertIs(page()[0][0]["nested"], nested)
+
+        @cached(ttl=60, tags=("test",), copy_result=False)
+        def shared():
+            return [{"n": 1}]
+
+        self.assertIs(shared(), shared())
+        invalidate("test")
+
+    def test_job_writes_invalidate_cached_listings(self):
+        job = {"job_id": "j1", "incident_id": "i1", "job_type": "plumbing", "price": 10.0,
+               "priority": "High", "description": "Leak", "status": "pending", "timestamp": "2025-01-01"}
+        db.save_job(job)
+        self.assertEqual(db.count_jobs({"status": "pending"}), 1)
+        hits = get_cache().stats["hits"]
+        self.assertEqual(db.count_jobs({"status": "pending"}), 1)
+        self.assertEqual(get_cache().stats["hits"], hits + 1)
+        db.patch_job("j1", {"status": "accepted"})
+        self.assertEqual(db.count_jobs({"status": "pending"}), 0)
+        self.assertEqual(db.get_all_jobs()[0]["status"], "accepted")
+
+if __name__ == '__main__':
+    unittest.main()
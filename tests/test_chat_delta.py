@@ -0,0 +1,81 @@
+import unittest
+from utils.chat_delta import (ChatDeltaListener, ChatDeltaReceiver, build_delta, build_snapshot, from_dynamodb,
+                              stream_messages)
+
+def _message(i, thread_id="t1"):
+    return {"id": f"m{i}", "thread_id": thread_id, "timestamp": f"2025-01-01T00:00:{i:02d}", "message": f"msg {i}"}
+
+def _insert(message):
+    """A stream record for a message item written by commit_message (one put_item per message)."""
+    image = {k: {"S": v} for k, v in message.items()}
+    return {"eventName": "INSERT", "dynamodb": {"NewImage": image}}
+
+class TestChatDelta(unittest.TestCase):
+
+    def test_message_inserts_become_one_ordered_delta_per_thread(self):
+        records = [_insert(_message(2)), _insert(_message(9, "t2")), _insert(_message(1)),
+                   {"eventName": "REMOVE", "dynamodb": {"OldImage": {}}},
+                   {"eventName": "MODIFY", "dynamodb": {"NewImage": {"thread_id": {"S": "t1"}}}}]
+        threads = stream_messages(records)
+        self.assertEqual(threads, {"t1": [_message(1), _message(2)], "t2": [_message(9, "t2")]})
+        frame = build_delta("t1", threads["t1"], base_seq=_message(0)["timestamp"])
+        self.assertEqual(frame["type"], "chat_delta")
+        self.assertEqual((frame["base_seq"], frame["seq"]), (_message(0)["timestamp"], _message(2)["timestamp"]))
+        self.assertEqual(frame["messages"], [_message(1), _message(2)])
+
+    def test_snapshot_holds_messages_after_since(self):
+        log = [_message(i) for i in range(4)]
+        frame = build_snapshot("t1", reversed(log), since=log[1]["timestamp"])
+        self.assertEqual(frame["messages"], log[2:])
+        self.assertEqual(frame["seq"], log[3]["timestamp"])
+
+    def test_receiver_seeded_from_session_log_applies_stream_deltas(self):
+        log = [_message(i) for i in range(4)]
+        receiver = ChatDeltaReceiver("t1", log[:2])
+        frame = build_delta("t1", stream_messages([_insert(log[2])])["t1"], base_seq=log[1]["timestamp"])
+        self.assertEqual(receiver.apply(frame), ([log[2]], None))
+        self.assertEqual(list(receiver.chat_log), log[:3])
+        # Replays and stateless senders (no base_seq) merge by id
+        self.assertEqual(receiver.apply(frame), ([], None))
+        self.assertEqual(receiver.apply(build_delta("t1", log[2:])), ([log[3]], None))
+        self.assertEqual(receiver.seq, log[3]["timestamp"])
+
+    def test_receiver_requests_resync_on_gap_and_recovers(self):
+        log = [_message(i) for i in range(4)]
+        receiver = ChatDeltaReceiver("t1", log[:1])
+        # The frame carrying message 1 and 2 was lost
+        changed, resync = receiver.apply(build_delta("t1", log[3:], base_seq=log[2]["timestamp"]))
+        self.assertEqual(changed, [])
+        self.assertEqual(resync, {"type": "resync", "thread_id": "t1", "since": log[0]["timestamp"]})
+        changed, _ = receiver.apply(build_snapshot("t1", log, since=resync["since"]))
+        self.assertEqual(changed, log[1:])
+        self.assertEqual(list(receiver.chat_log), log)
+
+    def test_from_dynamodb_decodes_stream_image(self):
+        value = {"L": [{"M": {"id": {"S": "1"}, "n": {"N": "2"}, "ok": {"BOOL": True}, "x": {"NULL": True}}}]}
+        self.assertEqual(from_dynamodb(value), [{"id": "1", "n": 2, "ok": True, "x": None}])
+
+class TestChatDeltaListener(unittest.TestCase):
+
+    def test_applied_frames_are_handed_to_the_ui_once(self):
+        log = [_message(i) for i in range(4)]
+        listener = ChatDeltaListener("ws://unused", "t1", log[:2])
+        self.assertIsNone(listener.handle(build_delta("t1", log[2:3], base_seq=log[1]["timestamp"])))
+        self.assertIsNone(listener.handle(build_delta("t1", log[2:3], base_seq=log[1]["timestamp"])))  # replay
+        self.assertIsNone(listener.handle(build_delta("other", log)))
+        self.assertIsNone(listener.handle({"type": "notification", "message": "Job accepted"}))
+        self.assertEqual(listener.drain(), ([log[2]], ["Job accepted"]))
+        self.assertEqual(listener.drain(), ([], []))
+
+    def test_gap_returns_resync_and_snapshot_is_delivered(self):
+        log = [_message(i) for i in range(4)]
+        listener = ChatDeltaListener("ws://unused", "t1", log[:1])
+        resync = listener.handle(build_delta("t1", log[3:], base_seq=log[2]["timestamp"]))
+        self.assertEqual(resync, {"type": "resync", "thread_id": "t1", "since": log[0]["timestamp"]})
+        self.assertEqual(listener.drain(), ([], []))
+        listener.handle(build_snapshot("t1", log, since=resync["since"]))
+        self.assertEqual(listener.drain()[0], log[1:])
+        self.assertEqual(list(listener.receiver.chat_log), log)
+
+if __name__ == "__main__":
+    unittest.main()
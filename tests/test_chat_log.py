@@ -0,0 +1,41 @@
+import json
+import unittest
+from utils.chat_log import ChatLog
+
+def _msg(message_id, timestamp, text="hi"):
+    return {"id": message_id, "timestamp": timestamp, "role": "tenant", "message": text}
+
+class TestChatLog(unittest.TestCase):
+
+    def test_orders_by_timestamp_and_dedupes_by_id(self):
+        log = ChatLog([_msg("b", "2024-01-02"), _msg("a", "2024-01-01"), _msg("b", "2024-01-02")])
+        log.append(_msg("c", "2024-01-03"))
+        log.append(_msg("late", "2024-01-01T12:00"))
+        self.assertEqual([m["id"] for m in log], ["a", "late", "b", "c"])
+        self.assertEqual(len(log), 4)
+
+    def test_membership_and_update_by_id(self):
+        log = ChatLog([_msg("a", "2024-01-01", "first")])
+        self.assertIn(_msg("a", "2024-01-01", "edited"), log)
+        self.assertIn("a", log)
+        self.assertNotIn(_msg("z", "2024-01-01"), log)
+        log.append(_msg("a", "2024-01-01", "edited"))
+        self.assertEqual(log.get("a")["message"], "edited")
+        self.assertEqual(len(log), 1)
+
+    def test_behaves_like_a_list(self):
+        log = ChatLog([_msg(str(i), f"2024-01-0{i + 1}") for i in range(5)])
+        self.assertEqual([m["id"] for m in log[-2:]], ["3", "4"])
+        self.assertEqual(log[0]["id"], "0")
+        self.assertEqual(next(reversed(log))["id"], "4")
+        self.assertEqual(json.loads(json.dumps(list(log)))[1]["id"], "1")
+        self.assertFalse(ChatLog())
+
+    def test_messages_without_id_or_timestamp_are_kept_in_append_order(self):
+        log = ChatLog([_msg("a", "2024-01-01")])
+        log.append({"role": "agent", "message": "no id"})
+        log.append({"role": "agent", "message": "no id either"})
+        self.assertEqual([m["message"] for m in log], ["hi", "no id", "no id either"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import hmac
+import importlib
+import json
+import os
+import sys
+import time
+import types
+import unittest
+from unittest import mock
+from utils.fake_aws import Attr, FakeDynamoDB, Key
+
+def _import_manager():
+    """Import the Lambda module; without boto3 installed, its tables are built from stand-ins."""
+    try:
+        import boto3  # noqa: F401
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    except ImportError:
+        boto3 = types.ModuleType("boto3")
+        boto3.resource = lambda *args, **kwargs: FakeDynamoDB()
+        conditions = types.ModuleType("boto3.dynamodb.conditions")
+        conditions.Key = Key
+        conditions.Attr = Attr
+        # Only for this import: the rest of the suite must still see boto3 as missing
+        with mock.patch.dict(sys.modules, {
+            "boto3": boto3, "boto3.dynamodb": types.ModuleType("boto3.dynamodb"),
+            "boto3.dynamodb.conditions": conditions,
+        }):
+            return importlib.import_module("websocket_connection_manager")
+    return importlib.import_module("websocket_connection_manager")
+
+manager = _import_manager()
+
+def _token(claims, secret=None, alg="HS256"):
+    """An HS256 JWT, as PyJWT encodes it."""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    signing_input = f"{encode({'alg': alg, 'typ': 'JWT'})}.{encode(claims)}"
+    signature = hmac.new((secret or manager.WS_JWT_SECRET).encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+def _event(route, connection_id="c1", params=None, body=None):
+    event = {"requestContext": {"routeKey": route, "connectionId": connection_id}}
+    if params is not None:
+        event["queryStringParameters"] = params
+    if body is not None:
+        event["body"] = json.dumps(body)
+    return event
+
+class TestConnectionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (manager.connections_table, manager.chat_table)
+        manager.connections_table = FakeDynamoDB().create_table(
+            "ThreadConnections", ("thread_id", "connection_id"), {manager.CONNECTION_INDEX: ("connection_id",)})
+        # Small pages: the participant lookup has to follow LastEvaluatedKey
+        manager.chat_table = FakeDynamoDB(page_size=2).create_table(
+            "Chat", ("email", "id"), {manager.CHAT_THREAD_INDEX: ("thread_id", "timestamp")})
+        for i, email in enumerate(["other@x.com"] * 3 + ["tenant@x.com"]):
+            manager.chat_table.put_item(Item={"email": email, "id": f"m{i}", "thread_id": "t1",
+                                              "timestamp": f"2025-01-01T00:00:0{i}", "message": "hi"})
+
+    def tearDown(self):
+        manager.connections_table, manager.chat_table = self.saved
+
+    def subscriptions(self):
+        return sorted((i["thread_id"], i["connection_id"]) for i in manager.connections_table.scan()["Items"])
+
+    def test_connect_subscribes_a_participant(self):
+        token = _token({"email": "tenant@x.com", "thread_id": "t1"})
+        response = manager.lambda_handler(_event("$connect", params={"thread_id": "t1", "token": token}), None)
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(self.subscriptions(), [("t1", "c1")])
+
+    def test_connect_without_thread_subscribes_nothing(self):
+        self.assertEqual(manager.lambda_handler(_event("$connect"), None)["statusCode"], 200)
+        self.assertEqual(self.subscriptions(), [])
+
+    def test_join_then_disconnect(self):
+        manager.chat_table.put_item(Item={"email": "tenant@x.com", "id": "m9", "thread_id": "t2",
+                                          "timestamp": "2025-01-02T00:00:00", "message": "hi"})
+        for thread_id in ("t1", "t2"):
+            body = {"thread_id": thread_id, "token": _token({"email": "tenant@x.com"})}
+            self.assertEqual(manager.lambda_handler(_event("join", body=body), None)["statusCode"], 200)
+        manager.lambda_handler(_event("join", connection_id="c2", body={
+            "thread_id": "t1", "token": _token({"email": "boss@x.com", "role": "landlord"})}), None)
+        self.assertEqual(self.subscriptions(), [("t1", "c1"), ("t1", "c2"), ("t2", "c1")])
+
+        self.assertEqual(manager.lambda_handler(_event("$disconnect"), None)["statusCode"], 200)
+        self.assertEqual(self.subscriptions(), [("t1", "c2")])
+
+    def test_join_rejected_for_non_participants_and_bad_tokens(self):
+        cases = [
+            (None, 401),
+            (_token({"email": "tenant@x.com"}, secret="wrong"), 401),
+            (_token({"email": "tenant@x.com", "exp": time.time() - 1}), 401),
+            (_token({"email": "tenant@x.com"}, alg="none"), 401),
+            (_token({"email": "stranger@x.com"}), 403),
+            (_token({"email": "tenant@x.com", "thread_id": "t9"}), 403),
+        ]
+        for token, status in cases:
+            response = manager.lambda_handler(_event("join", body={"thread_id": "t1", "token": token}), None)
+            self.assertEqual(response["statusCode"], status)
+        response = manager.lambda_handler(_event("$connect", params={"thread_id": "t1"}), None)
+        self.assertEqual(response["statusCode"], 401)
+        self.assertEqual(self.subscriptions(), [])
+
+    def test_join_requires_thread_id(self):
+        response = manager.lambda_handler(_event("join", body={"token": _token({"email": "tenant@x.com"})}), None)
+        self.assertEqual(response["statusCode"], 400)
+
+if __name__ == "__main__":
+    unittest.main()
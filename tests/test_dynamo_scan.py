@@ -0,0 +1,72 @@
+import unittest
+from utils.aws_backend import ClientError
+from utils.dynamo_scan import AdaptiveBackoff, ParallelScan, parallel_scan
+from utils.fake_aws import FakeDynamoDB
+
+class ThrottlingTable:
+    """Wraps a fake table and throttles the first `failures` scan calls."""
+
+    def __init__(self, table, failures, code="ProvisionedThroughputExceededException"):
+        self.table = table
+        self.name = table.name
+        self.failures = failures
+        self.code = code
+
+    def scan(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ClientError({"Error": {"Code": self.code, "Message": "slow down"}}, "Scan")
+        return self.table.scan(**kwargs)
+
+class TestParallelScan(unittest.TestCase):
+
+    def setUp(self):
+        self.table = FakeDynamoDB(page_size=7).create_table("chat", ("email", "id"))
+        for i in range(100):
+            self.table.put_item(Item={"email": f"u{i % 3}@x.com", "id": str(i), "n": i})
+        self.sleeps = []
+        self.backoff = AdaptiveBackoff(sleep=self.sleeps.append)
+
+    def test_reads_every_item_across_segments_and_pages(self):
+        scan = ParallelScan(self.table, segments=4, backoff=self.backoff)
+        self.assertEqual(sorted(item["n"] for item in scan), list(range(100)))
+        self.assertEqual(scan.stats["items"], 100)
+        self.assertGreater(scan.stats["pages"], 4)
+
+    def test_projection_and_filter_pass_through(self):
+        items = list(parallel_scan(self.table, segments=3, ProjectionExpression="id"))
+        self.assertEqual(len(items), 100)
+        self.assertEqual(set(items[0]), {"id"})
+
+    def test_for_each_page_resumes_segments(self):
+        pages = []
+        first = ParallelScan(self.table, segments=2, page_size=10, backoff=self.backoff)
+        first.for_each_page(pages.append)
+        seg0 = [p for p in pages if p.segment == 0]
+        # Resume segment 0 after its first page and skip segment 1 entirely
+        resumed = ParallelScan(self.table, segments=2, page_size=10, backoff=self.backoff,
+                               start_keys={0: seg0[0].last_key}, skip_segments=[1])
+        items = [item for page in resumed.pages() for item in page.items]
+        self.assertEqual(len(items), sum(len(p.items) for p in seg0[1:]))
+
+    def test_throttling_backs_off_and_retries(self):
+        scan = ParallelScan(ThrottlingTable(self.table, failures=3), segments=1, backoff=self.backoff)
+        self.assertEqual(len(list(scan)), 100)
+        self.assertEqual(scan.stats["throttled"], 3)
+        self.assertGreaterEqual(len(self.sleeps), 3)
+
+    def test_other_errors_and_exhausted_retries_propagate(self):
+        with self.assertRaises(ClientError):
+            list(ParallelScan(ThrottlingTable(self.table, 1, code="ValidationException"), segments=2,
+                              backoff=self.backoff))
+        with self.assertRaises(ClientError):
+            list(ParallelScan(ThrottlingTable(self.table, 10), segments=1, max_retries=2,
+                              backoff=self.backoff))
+
+    def test_consumer_can_stop_early(self):
+        scan = parallel_scan(self.table, segments=4, page_size=1, backoff=self.backoff)
+        self.assertEqual(len([item for _, item in zip(range(5), scan)]), 5)
+        scan.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from utils.dynamo_stream import DynamoStreamConsumer
+
+def _record(seq, thread_id="t1", event_id=None):
+    return {"eventID": event_id or f"e{seq}", "eventName": "MODIFY",
+            "dynamodb": {"SequenceNumber": str(seq), "NewImage": {"thread_id": {"S": thread_id}}}}
+
+class FakeStreams:
+    """Scripted DynamoDB Streams client: shard id -> list of get_records pages."""
+
+    def __init__(self, shards, pages):
+        self.shards = shards
+        self.pages = pages
+        self.calls = {"describe_stream": 0, "get_shard_iterator": [], "get_records": 0}
+
+    def describe_stream(self, StreamArn, **kwargs):
+        self.calls["describe_stream"] += 1
+        return {"StreamDescription": {"Shards": self.shards}}
+
+    def get_shard_iterator(self, StreamArn, ShardId, ShardIteratorType, SequenceNumber=None):
+        self.calls["get_shard_iterator"].append((ShardId, ShardIteratorType))
+        return {"ShardIterator": f"{ShardId}:0"}
+
+    def get_records(self, ShardIterator, Limit):
+        self.calls["get_records"] += 1
+        shard_id, page = ShardIterator.split(":")
+        pages = self.pages[shard_id]
+        records, closed = pages[int(page)] if int(page) < len(pages) else ([], False)
+        next_iterator = None if closed else f"{shard_id}:{int(page) + 1}"
+        return {"Records": records, "NextShardIterator": next_iterator}
+
+class TestDynamoStreamConsumer(unittest.TestCase):
+
+    def test_dedupes_replayed_records(self):
+        streams = FakeStreams(
+            [{"ShardId": "s1", "SequenceNumberRange": {"StartingSequenceNumber": "1"}}],
+            {"s1": [([_record(1), _record(2)], False), ([_record(2), _record(3)], False)]},
+        )
+        consumer = DynamoStreamConsumer(streams, "arn")
+        first = consumer.poll_once()
+        second = consumer.poll_once()
+        self.assertEqual([r["eventID"] for r in first + second], ["e1", "e2", "e3"])
+        self.assertEqual(consumer.stats["duplicates"], 1)
+        self.assertEqual(consumer.sequence_numbers["s1"], "3")
+        self.assertEqual(streams.calls["describe_stream"], 1)
+
+    def test_follows_child_shard_from_trim_horizon(self):
+        streams = FakeStreams(
+            [{"ShardId": "s1", "SequenceNumberRange": {"StartingSequenceNumber": "1"}}],
+            {"s1": [([_record(1)], True)], "s2": [([_record(5)], False)]},
+        )
+        consumer = DynamoStreamConsumer(streams, "arn")
+        consumer.refresh_shards()
+        streams.shards = streams.shards + [{"ShardId": "s2", "ParentShardId": "s1",
+                                            "SequenceNumberRange": {"StartingSequenceNumber": "5"}}]
+        self.assertEqual(len(consumer.poll_once()), 1)
+        self.assertIn(("s2", "TRIM_HORIZON"), streams.calls["get_shard_iterator"])
+        self.assertEqual([r["eventID"] for r in consumer.poll_once()], ["e5"])
+        self.assertNotIn("s1", consumer.iterators)
+
+if __name__ == "__main__":
+    unittest.main()
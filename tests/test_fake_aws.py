@@ -0,0 +1,94 @@
+import time
+import unittest
+from utils.fake_aws import FakeDynamoDB, FakeS3Client, Key, ClientError
+
+class TestFakeDynamoDB(unittest.TestCase):
+
+    def setUp(self):
+        self.dynamodb = FakeDynamoDB({
+            "chat": {"keys": ("email", "id"), "indexes": {"thread-index": ("thread_id", "timestamp")}},
+            "threads": {"keys": ("thread_id",)},
+        }, page_size=2)
+        self.table = self.dynamodb.Table("chat")
+        with self.table.batch_writer() as batch:
+            for i in range(5):
+                batch.put_item(Item={"email": "t@example.com", "id": f"m{i}", "thread_id": "th1",
+                                     "timestamp": f"2024-01-0{5 - i}", "message": f"msg {i}"})
+
+    def test_query_index_pages_in_sort_order(self):
+        items, kwargs = [], {}
+        while True:
+            response = self.table.query(IndexName="thread-index", KeyConditionExpression=Key("thread_id").eq("th1"),
+                                        ProjectionExpression="#i", ExpressionAttributeNames={"#i": "id"}, **kwargs)
+            items += response["Items"]
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        self.assertEqual([i["id"] for i in items], ["m4", "m3", "m2", "m1", "m0"])
+        self.assertEqual(set(items[0]), {"id"})
+
+    def test_string_key_condition(self):
+        response = self.table.query(
+            IndexName="thread-index",
+            KeyConditionExpression="thread_id = :t AND #ts BETWEEN :a AND :b",
+            ExpressionAttributeNames={"#ts": "timestamp"},
+            ExpressionAttributeValues={":t": "th1", ":a": "2024-01-02", ":b": "2024-01-03"},
+        )
+        self.assertEqual(sorted(i["id"] for i in response["Items"]), ["m2", "m3"])
+
+    def test_update_item_list_append_creates_and_extends(self):
+        threads = self.dynamodb.Table("threads")
+        for n in range(2):
+            threads.update_item(
+                Key={"thread_id": "th1"},
+                UpdateExpression="SET chat_log = list_append(if_not_exists(chat_log, :empty), :m), updated = :n",
+                ExpressionAttributeValues={":m": [{"n": n}], ":empty": [], ":n": n},
+            )
+        item = threads.get_item(Key={"thread_id": "th1"})["Item"]
+        self.assertEqual(item["chat_log"], [{"n": 0}, {"n": 1}])
+        self.assertEqual(item["updated"], 1)
+
+    def test_wrong_key_schema_raises_client_error(self):
+        with self.assertRaises(ClientError) as ctx:
+            self.table.get_item(Key={"thread_id": "th1"})
+        self.assertEqual(ctx.exception.response["Error"]["Code"], "ValidationException")
+
+    def test_parallel_scan_segments_cover_table_once(self):
+        seen = []
+        for segment in range(3):
+            kwargs = {}
+            while True:
+                response = self.table.scan(Segment=segment, TotalSegments=3, **kwargs)
+                seen += [i["id"] for i in response["Items"]]
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        self.assertEqual(sorted(seen), [f"m{i}" for i in range(5)])
+
+class TestFakeS3Client(unittest.TestCase):
+
+    def test_put_get_list_and_presign(self):
+        s3 = FakeS3Client()
+        for i in range(3):
+            s3.put_object(Bucket="b", Key=f"threads/t{i}.json", Body='{"i": %d}' % i, ContentType="application/json")
+        self.assertEqual(s3.get_object(Bucket="b", Key="threads/t1.json")["Body"].read(), b'{"i": 1}')
+        first = s3.list_objects_v2(Bucket="b", Prefix="threads/", MaxKeys=2)
+        self.assertTrue(first["IsTruncated"])
+        rest = s3.list_objects_v2(Bucket="b", Prefix="threads/", ContinuationToken=first["NextContinuationToken"])
+        self.assertEqual([o["Key"] for o in first["Contents"] + rest["Contents"]],
+                         ["threads/t0.json", "threads/t1.json", "threads/t2.json"])
+        self.assertIn("X-Amz-Expires=300", s3.generate_presigned_url(
+            "get_object", Params={"Bucket": "b", "Key": "threads/t0.json"}, ExpiresIn=300))
+        with self.assertRaises(ClientError):
+            s3.get_object(Bucket="b", Key="missing.json")
+
+    def test_latency_is_applied_per_call(self):
+        s3 = FakeS3Client(latency=0.02)
+        start = time.monotonic()
+        for _ in range(3):
+            s3.put_object(Bucket="b", Key="k", Body=b"x")
+        self.assertGreaterEqual(time.monotonic() - start, 0.06)
+        self.assertEqual(s3.stats["put_object"], 3)
+
+if __name__ == "__main__":
+    unittest.main()
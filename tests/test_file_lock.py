@@ -0,0 +1,64 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from utils.file_lock import atomic_write_json, read_json, update_json
+from utils.record_store import JsonlRecordStore
+
+def _increment(path, times):
+    for _ in range(times):
+        update_json(path, lambda data: {"count": (data or {}).get("count", 0) + 1}, default={})
+
+def _append_jobs(path, prefix, times):
+    store = JsonlRecordStore(path, key="job_id", fsync=False)
+    for i in range(times):
+        store.append({"job_id": f"{prefix}_{i}"})
+
+class TestFileLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_shorter_payload_leaves_no_trailing_garbage(self):
+        path = os.path.join(self.tmp_dir, "jobs.json")
+        atomic_write_json(path, [{"job_id": "j1", "description": "x" * 200}])
+        atomic_write_json(path, [])
+        with open(path) as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_concurrent_processes_do_not_lose_updates(self):
+        path = os.path.join(self.tmp_dir, "counter.json")
+        workers = [multiprocessing.Process(target=_increment, args=(path, 25)) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        self.assertEqual(read_json(path), {"count": 100})
+
+    def test_concurrent_store_appends_and_compaction(self):
+        path = os.path.join(self.tmp_dir, "jobs.json")
+        workers = [multiprocessing.Process(target=_append_jobs, args=(path, f"p{n}", 30)) for n in range(3)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        store = JsonlRecordStore(path, key="job_id")
+        store.compact()
+        self.assertEqual(len(store.all()), 90)
+
+    def test_batch_commits_once(self):
+        path = os.path.join(self.tmp_dir, "jobs.json")
+        store = JsonlRecordStore(path, key="job_id")
+        with store.batch():
+            store.append({"job_id": "j1"})
+            store.append({"job_id": "j2"})
+            self.assertFalse(os.path.exists(store.segment_path))
+        self.assertEqual([j["job_id"] for j in store.all()], ["j1", "j2"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from utils.import_profiler import check_budget, parse_importtime, profile_imports, summarize
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       254 |        254 |   _io
+import time:       537 |        791 | _frozen_importlib_external
+import time:      1200 |       1200 |     pandas._libs
+import time:      3000 |       4200 |   pandas.core
+import time:      5000 |       9200 | pandas
+Traceback noise that isn't a timing line
+"""
+
+class TestImportProfiler(unittest.TestCase):
+
+    def test_parse_importtime(self):
+        timings = parse_importtime(SAMPLE)
+        self.assertEqual([t.module for t in timings],
+                         ["_io", "_frozen_importlib_external", "pandas._libs", "pandas.core", "pandas"])
+        self.assertEqual([t.depth for t in timings], [1, 0, 2, 1, 0])
+        self.assertEqual(timings[-1].cumulative_us, 9200)
+
+    def test_summarize_and_budget(self):
+        summary = summarize(parse_importtime(SAMPLE), top=2)
+        self.assertEqual(summary["total_ms"], 10.0)
+        self.assertEqual(summary["slowest_modules"], [("pandas", 9.2), ("pandas.core", 4.2)])
+        self.assertEqual(summary["slowest_packages"][0], ("pandas", 9.2))
+        self.assertTrue(check_budget(summary, budget_ms=10))
+        self.assertFalse(check_budget(summary, budget_ms=5))
+
+    def test_profiles_in_a_fresh_interpreter(self):
+        timings = profile_imports("json")
+        self.assertIn("json", [t.module for t in timings])
+        with self.assertRaises(RuntimeError):
+            profile_imports("no_such_module_here")
+
+if __name__ == "__main__":
+    unittest.main()
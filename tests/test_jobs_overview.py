@@ -0,0 +1,58 @@
+import importlib.util
+import unittest
+from superstructures.ss1_gate.shared.jobs_overview import (build_jobs_overview, format_overview_row,
+                                                            incident_issues, overview_page)
+
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+
+INCIDENTS = [
+    {"incident_id": "i1", "issue": "Leak"},
+    {"incident_id": "i2", "issue": "No power"},
+    {"incident_id": "i1", "issue": "Duplicate"},
+    {"issue": "No id"},
+]
+JOBS = [
+    {"job_id": "j1", "incident_id": "i2", "priority": "High", "accepted": True, "status": "accepted"},
+    {"job_id": "j2", "incident_id": "missing", "status": "pending"},
+    {"job_id": "j3", "incident_id": "i1", "accepted": None, "assigned_contractor_id": "c1"},
+]
+
+class TestOverviewRows(unittest.TestCase):
+
+    def test_first_incident_wins(self):
+        self.assertEqual(incident_issues(INCIDENTS), {"i1": "Leak", "i2": "No power"})
+
+    def test_row_defaults(self):
+        row = format_overview_row({**JOBS[1], "issue": float("nan"), "price": 10.0})
+        self.assertEqual(row, {"Job ID": "j2", "Incident": "N/A", "Priority": "N/A", "Type": "N/A", "Price": 10.0,
+                               "Assigned To": "—", "Accepted": "No", "Status": "pending", "Created By": "N/A",
+                               "Timestamp": "—"})
+        row = format_overview_row({**JOBS[0], "issue": "No power"})
+        self.assertEqual((row["Incident"], row["Priority"], row["Accepted"]), ("No power", "High", "Yes"))
+
+@unittest.skipUnless(HAS_PANDAS, "pandas is not installed")
+class TestJobsOverview(unittest.TestCase):
+
+    def setUp(self):
+        self.incidents = INCIDENTS
+        self.jobs = JOBS
+
+    def test_join_keeps_job_order_and_first_incident(self):
+        frame = build_jobs_overview(self.jobs, self.incidents)
+        self.assertEqual(list(frame["job_id"]), ["j1", "j2", "j3"])
+        page = overview_page(frame, 0, 10)
+        self.assertEqual(list(page["Incident"]), ["No power", "N/A", "Leak"])
+        self.assertEqual(list(page["Accepted"]), ["Yes", "No", "No"])
+        self.assertEqual(list(page["Assigned To"]), ["—", "—", "c1"])
+        self.assertEqual(page.loc[1, "Priority"], "N/A")
+
+    def test_page_only_formats_requested_rows(self):
+        frame = build_jobs_overview(self.jobs, self.incidents)
+        page = overview_page(frame, 1, 2)
+        self.assertEqual(list(page["Job ID"]), ["j2"])
+
+    def test_no_jobs(self):
+        self.assertEqual(len(build_jobs_overview([], self.incidents)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
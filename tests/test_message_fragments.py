@@ -0,0 +1,63 @@
+import unittest
+from utils import message_fragments
+from utils.message_fragments import RENDER_WINDOW, render_message_fragment, visible_window
+
+def _message(i, text=None):
+    return {"id": f"m{i}", "role": "tenant", "timestamp": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+            "message": text if text is not None else f"msg {i}"}
+
+class TestMessageFragments(unittest.TestCase):
+
+    def setUp(self):
+        message_fragments._fragment_cache.clear()
+
+    def test_unchanged_message_is_served_from_the_cache(self):
+        first = render_message_fragment(_message(1))
+        self.assertIs(render_message_fragment(_message(1)), first)
+        self.assertIn("msg 1", first[0])
+        self.assertFalse(first[1])
+
+    def test_edited_message_renders_again(self):
+        before = render_message_fragment(_message(1))
+        after = render_message_fragment(_message(1, "edited"))
+        self.assertIsNot(after, before)
+        self.assertIn("edited", after[0])
+        self.assertNotIn("msg 1", after[0])
+
+    def test_canvas_style_for_keyword_messages(self):
+        fragment, use_canvas = render_message_fragment(_message(1, "Incident summary"))
+        self.assertTrue(use_canvas)
+        self.assertIn("Summary:", fragment)
+
+    def test_cache_evicts_least_recently_used(self):
+        saved = message_fragments.FRAGMENT_CACHE_SIZE
+        message_fragments.FRAGMENT_CACHE_SIZE = 2
+        try:
+            first = render_message_fragment(_message(1))
+            render_message_fragment(_message(2))
+            render_message_fragment(_message(1))
+            render_message_fragment(_message(3))  # evicts m2, the least recently used
+            self.assertIs(render_message_fragment(_message(1)), first)
+            self.assertEqual(len(message_fragments._fragment_cache), 2)
+            self.assertNotIn(("m2", message_fragments._content_hash(_message(2))), message_fragments._fragment_cache)
+        finally:
+            message_fragments.FRAGMENT_CACHE_SIZE = saved
+
+    def test_window_shows_the_last_messages_and_expands(self):
+        log = [_message(i) for i in range(2 * RENDER_WINDOW + 10)]
+        hidden, visible = visible_window(log)
+        self.assertEqual(hidden, RENDER_WINDOW + 10)
+        self.assertEqual(visible, log[-RENDER_WINDOW:])
+
+        # "Load earlier" grows the window one page at a time
+        hidden, visible = visible_window(log, 2 * RENDER_WINDOW)
+        self.assertEqual((hidden, visible), (10, log[10:]))
+        hidden, visible = visible_window(log, 3 * RENDER_WINDOW)
+        self.assertEqual((hidden, visible), (0, log))
+
+    def test_short_log_is_shown_whole(self):
+        log = [_message(i) for i in range(3)]
+        self.assertEqual(visible_window(log), (0, log))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from utils.fake_aws import FakeS3Client
+from utils.presign_cache import PresignCache
+
+class TestPresignCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.s3 = FakeS3Client()
+        self.cache = PresignCache(s3_client=lambda: self.s3, expires_in=3600, safety_margin=300,
+                                  clock=lambda: self.now)
+
+    def test_reuses_url_until_safety_margin(self):
+        url = self.cache.get_url("b", "media/t1/a.jpg")
+        self.now += 3299
+        self.assertEqual(self.cache.get_url("b", "media/t1/a.jpg"), url)
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 1)
+        self.now += 1
+        self.cache.get_url("b", "media/t1/a.jpg")
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 2)
+
+    def test_keyed_by_bucket_key_and_method(self):
+        self.cache.get_url("b", "k")
+        self.cache.get_url("other", "k")
+        self.cache.get_url("b", "k", method="put_object")
+        self.cache.get_url("b", "k")
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 3)
+        self.assertEqual(self.cache.stats, {"hits": 1, "misses": 3})
+
+    def test_short_url_not_served_for_longer_request(self):
+        short = self.cache.get_url("b", "k", expires_in=300)
+        self.assertNotEqual(self.cache.get_url("b", "k", expires_in=3600), short)
+        self.assertEqual(self.cache.get_url("b", "k", expires_in=300), short)
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 2)
+        self.cache.invalidate("b", "k")
+        self.cache.get_url("b", "k", expires_in=3600)
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 3)
+
+    def test_bulk_signs_only_missing_keys(self):
+        first = self.cache.get_urls("b", ["k1", "k2"])
+        urls = self.cache.get_urls("b", ["k1", "k2", "k3", "k3"])
+        self.assertEqual(set(urls), {"k1", "k2", "k3"})
+        self.assertEqual(urls["k1"], first["k1"])
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 3)
+
+    def test_short_lived_urls_reused_for_half_their_lifetime(self):
+        self.cache.get_url("b", "k", expires_in=300)
+        self.now += 149
+        self.cache.get_url("b", "k", expires_in=300)
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 1)
+        self.now += 1
+        self.cache.get_url("b", "k", expires_in=300)
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 2)
+
+    def test_lru_bound_and_invalidate(self):
+        cache = PresignCache(s3_client=lambda: self.s3, max_entries=2, clock=lambda: self.now)
+        cache.get_urls("b", ["k1", "k2", "k3"])
+        cache.get_url("b", "k1")
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 4)
+        cache.invalidate("b", "k1")
+        cache.get_url("b", "k1")
+        self.assertEqual(self.s3.stats["generate_presigned_url"], 5)
+
+    def test_margin_must_be_shorter_than_lifetime(self):
+        with self.assertRaises(ValueError):
+            PresignCache(expires_in=300, safety_margin=300)
+
+if __name__ == '__main__':
+    unittest.main()
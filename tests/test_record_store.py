@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.record_store import JsonlRecordStore, Range
+from utils.record_index import IndexedRecordStore
+
+class TestJsonlRecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "jobs.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_and_patch_replay(self):
+        store = JsonlRecordStore(self.path, key="job_id")
+        store.append({"job_id": "j1", "status": "pending"})
+        store.append({"job_id": "j2", "status": "pending"})
+        store.patch("j1", {"status": "accepted"})
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(store.get("j1")["status"], "accepted")
+        self.assertEqual(len(store.all()), 2)
+
+    def test_adopts_legacy_snapshot_with_trailing_garbage(self):
+        with open(self.path, "w") as f:
+            f.write(json.dumps([{"job_id": "j1", "status": "pending"}]) + "\n  }\n]")
+        store = JsonlRecordStore(self.path, key="job_id")
+        store.patch("j1", {"status": "completed"})
+        self.assertEqual(store.all(), [{"job_id": "j1", "status": "completed"}])
+
+    def test_compact_folds_segment_into_snapshot(self):
+        store = JsonlRecordStore(self.path, key="job_id")
+        store.append({"job_id": "j1", "status": "pending"})
+        store.patch("j1", {"status": "assigned"})
+        store.compact()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), [{"job_id": "j1", "status": "assigned"}])
+        self.assertEqual(os.path.getsize(store.segment_path), 0)
+
+    def test_keyless_store_only_appends(self):
+        store = JsonlRecordStore(os.path.join(self.tmp_dir, "feedback.json"))
+        store.append({"job_id": "j1", "rating": 5})
+        store.append({"job_id": "j1", "rating": 4})
+        self.assertEqual(len(store.find("job_id", "j1")), 2)
+        with self.assertRaises(ValueError):
+            store.patch("j1", {"rating": 3})
+
+class TestIndexedRecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "jobs.json")
+        self.store = IndexedRecordStore(
+            JsonlRecordStore(self.path, key="job_id"),
+            ["assigned_contractor_id", "status"]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_patch_moves_record_between_secondary_buckets(self):
+        self.store.append({"job_id": "j1", "status": "pending", "assigned_contractor_id": None})
+        self.store.append({"job_id": "j2", "status": "pending", "assigned_contractor_id": None})
+        self.store.patch("j1", {"status": "assigned", "assigned_contractor_id": "c1"})
+        self.assertEqual([j["job_id"] for j in self.store.find("status", "pending")], ["j2"])
+        self.assertEqual([j["job_id"] for j in self.store.find("assigned_contractor_id", "c1")], ["j1"])
+
+    def test_external_write_invalidates_index(self):
+        self.store.append({"job_id": "j1", "status": "pending"})
+        self.assertIsNone(self.store.get("j2"))
+        other_process = JsonlRecordStore(self.path, key="job_id")
+        other_process.append({"job_id": "j2", "status": "pending"})
+        self.assertEqual(self.store.get("j2")["status"], "pending")
+        self.assertEqual(len(self.store.find("status", "pending")), 2)
+
+    def test_query_with_range_and_indexed_filter(self):
+        for i in range(5):
+            self.store.append({"job_id": f"j{i}", "status": "pending" if i % 2 else "assigned",
+                               "timestamp": f"2025-01-0{i + 1}"})
+        filters = {"status": "pending", "timestamp": Range("2025-01-02", "2025-01-05")}
+        page = self.store.query(filters, order_by="timestamp", descending=True, limit=1)
+        self.assertEqual([j["job_id"] for j in page], ["j3"])
+        self.assertEqual(self.store.count(filters), 2)
+
+    def test_returned_records_are_copies(self):
+        self.store.append({"job_id": "j1", "status": "pending"})
+        self.store.get("j1")["status"] = "mutated"
+        self.assertEqual(self.store.get("j1")["status"], "pending")
+
+if __name__ == "__main__":
+    unittest.main()
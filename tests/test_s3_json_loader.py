@@ -0,0 +1,53 @@
+import json
+import unittest
+from utils.fake_aws import FakeS3Client
+from utils.record_store import Range
+from utils.s3_json_loader import S3JsonLoader
+
+class TestS3JsonLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.s3 = FakeS3Client()
+        for i in range(25):
+            self.put(f"jobs/job_{i:03d}.json", {"job_id": f"job_{i:03d}"})
+        self.s3.put_object(Bucket="b", Key="jobs/readme.txt", Body=b"not json")
+        self.loader = S3JsonLoader(s3_client=lambda: self.s3, max_workers=4, page_size=10)
+
+    def put(self, key, doc):
+        self.s3.put_object(Bucket="b", Key=key, Body=json.dumps(doc), ContentType="application/json")
+
+    def test_paginates_past_one_page_in_key_order(self):
+        docs = self.loader.load("b", "jobs/")
+        self.assertEqual(len(docs), 25)
+        self.assertEqual(list(docs), sorted(docs))
+        self.assertEqual(self.s3.stats["list_objects_v2"], 3)
+        self.assertEqual(self.s3.stats["get_object"], 25)
+
+    def test_rerun_only_fetches_changed_objects(self):
+        self.loader.load("b", "jobs/")
+        self.put("jobs/job_003.json", {"job_id": "job_003", "status": "accepted"})
+        self.s3.delete_object(Bucket="b", Key="jobs/job_004.json")
+        docs = self.loader.load("b", "jobs/")
+        self.assertEqual(self.s3.stats["get_object"], 26)
+        self.assertEqual(docs["jobs/job_003.json"]["status"], "accepted")
+        self.assertNotIn("jobs/job_004.json", docs)
+        self.assertEqual(self.loader.stats["cached"], 23)
+
+    def test_bad_object_is_skipped(self):
+        self.s3.put_object(Bucket="b", Key="jobs/broken.json", Body=b"{not json")
+        docs = self.loader.load("b", "jobs/")
+        self.assertEqual(len(docs), 25)
+        self.assertEqual(self.loader.stats["errors"], 1)
+
+    def test_query_filters_sorts_and_pages_cached_documents(self):
+        for i in range(25):
+            self.put(f"jobs/job_{i:03d}.json", {"job_id": f"job_{i:03d}", "status": "pending" if i % 2 else "accepted",
+                                                "timestamp": f"2025-01-{i + 1:02d}"})
+        page = self.loader.query("b", "jobs/", {"status": "pending"}, "timestamp", True, limit=3, offset=1)
+        self.assertEqual([d["job_id"] for d in page], ["job_021", "job_019", "job_017"])
+        since = self.loader.query("b", "jobs/", {"timestamp": Range("2025-01-20", None)})
+        self.assertEqual(len(since), 6)
+        self.assertEqual(self.s3.stats["get_object"], 25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.record_store import Range
+from utils.sqlite_store import SqliteRecordStore
+
+class TestSqliteRecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "landten.db")
+        self.store = SqliteRecordStore(
+            "jobs", key="job_id", indexed=["status", "priority"], db_path=self.db_path
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_upserts_and_patch_updates_indexed_column(self):
+        self.store.append({"job_id": "j1", "status": "pending"})
+        self.store.append({"job_id": "j1", "status": "pending", "price": 10})
+        self.store.patch("j1", {"status": "accepted"})
+        self.assertEqual(self.store.get("j1"), {"job_id": "j1", "status": "accepted", "price": 10})
+        self.assertEqual(self.store.count({"status": "pending"}), 0)
+        self.assertEqual(len(self.store.all()), 1)
+
+    def test_query_filters_sorts_and_pages(self):
+        with self.store.batch():
+            for i in range(5):
+                self.store.append({"job_id": f"j{i}", "status": "pending", "price": i, "priority": "High"})
+            self.store.append({"job_id": "j9", "status": "completed", "priority": "High"})
+        page = self.store.query({"status": "pending"}, order_by="price", descending=True, limit=2, offset=1)
+        self.assertEqual([j["job_id"] for j in page], ["j3", "j2"])
+        by_price = self.store.query({"priority": "High"}, order_by="price")
+        self.assertEqual(by_price[-1]["job_id"], "j9")
+        self.assertEqual(self.store.count({"priority": "High"}), 6)
+
+    def test_range_filters_on_indexed_and_json_fields(self):
+        with self.store.batch():
+            for i in range(5):
+                self.store.append({"job_id": f"j{i}", "status": "pending", "timestamp": f"2025-01-0{i + 1}"})
+            self.store.append({"job_id": "j9", "status": "pending"})
+        window = {"status": "pending", "timestamp": Range("2025-01-02", "2025-01-04")}
+        page = self.store.query(window, order_by="timestamp", descending=True)
+        self.assertEqual([j["job_id"] for j in page], ["j2", "j1"])
+        self.assertEqual(self.store.count({"timestamp": Range("2025-01-04")}), 2)
+        self.assertEqual(self.store.count({"timestamp": Range()}), 5)
+
+    def test_failed_batch_rolls_back(self):
+        with self.assertRaises(RuntimeError):
+            with self.store.batch():
+                self.store.append({"job_id": "j1", "status": "pending"})
+                raise RuntimeError("boom")
+        self.assertEqual(self.store.all(), [])
+
+    def test_imports_legacy_json_log_on_first_use(self):
+        legacy_path = os.path.join(self.tmp_dir, "incidents.json")
+        with open(legacy_path, "w") as f:
+            json.dump([{"incident_id": "i1", "tenant_id": "t1"}], f)
+        store = SqliteRecordStore(
+            "incidents", key="incident_id", indexed=["tenant_id"], path=legacy_path, db_path=self.db_path
+        )
+        self.assertEqual([i["incident_id"] for i in store.find("tenant_id", "t1")], ["i1"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import importlib
+import json
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+from utils.fake_aws import ClientError, FakeDynamoDB, Key
+
+def _import_processor():
+    """Import the Lambda module; without boto3 installed, its clients are built from stand-ins."""
+    try:
+        import boto3  # noqa: F401
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    except ImportError:
+        boto3 = types.ModuleType("boto3")
+        boto3.resource = lambda *args, **kwargs: FakeDynamoDB()
+        boto3.client = lambda *args, **kwargs: None
+        conditions = types.ModuleType("boto3.dynamodb.conditions")
+        conditions.Key = Key
+        botocore_config = types.ModuleType("botocore.config")
+        botocore_config.Config = lambda **kwargs: kwargs
+        botocore_exceptions = types.ModuleType("botocore.exceptions")
+        botocore_exceptions.ClientError = ClientError
+        # Only for this import: the rest of the suite must still see boto3 as missing
+        with mock.patch.dict(sys.modules, {
+            "boto3": boto3, "boto3.dynamodb": types.ModuleType("boto3.dynamodb"),
+            "boto3.dynamodb.conditions": conditions, "botocore": types.ModuleType("botocore"),
+            "botocore.config": botocore_config, "botocore.exceptions": botocore_exceptions,
+        }):
+            return importlib.import_module("dynamodb_stream_processor")
+    return importlib.import_module("dynamodb_stream_processor")
+
+processor = _import_processor()
+
+def _item(thread_id, message_id, timestamp):
+    """A chat message item as commit_message writes it, in DynamoDB JSON."""
+    return {"email": {"S": "tenant@x.com"}, "id": {"S": message_id}, "thread_id": {"S": thread_id},
+            "timestamp": {"S": timestamp}, "role": {"S": "tenant"}, "message": {"S": f"msg {message_id}"}}
+
+def _record(seq, thread_id, message_id, timestamp, event="INSERT"):
+    record = {"eventName": event, "dynamodb": {"SequenceNumber": str(seq)}}
+    if event != "REMOVE":
+        record["dynamodb"]["NewImage"] = _item(thread_id, message_id, timestamp)
+    return record
+
+class FakeManagementApi:
+    """post_to_connection that records frames and reports some connections as gone."""
+
+    def __init__(self, gone=()):
+        self.gone = set(gone)
+        self.sent = []
+
+    def post_to_connection(self, ConnectionId, Data):
+        if ConnectionId in self.gone:
+            raise ClientError({"Error": {"Code": "GoneException", "Message": "gone"},
+                               "ResponseMetadata": {"HTTPStatusCode": 410}}, "PostToConnection")
+        self.sent.append((ConnectionId, json.loads(Data)))
+
+class TestStreamProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (processor.connections_table, processor.websocket_client, processor.fan_out)
+        self.table = FakeDynamoDB().create_table("ThreadConnections", ("thread_id", "connection_id"))
+        processor.connections_table = self.table
+
+    def tearDown(self):
+        processor.connections_table, processor.websocket_client, processor.fan_out = self.saved
+
+    def test_group_by_thread_coalesces_each_thread(self):
+        records = [_record(1, "a", "m2", "2025-01-01T00:00:02"), _record(2, "b", "x1", "2025-01-01T00:00:01"),
+                   _record(3, "a", "m1", "2025-01-01T00:00:01"), _record(4, "a", "m1", None, event="REMOVE"),
+                   {"eventName": "MODIFY", "dynamodb": {"SequenceNumber": "5",
+                                                        "NewImage": {"thread_id": {"S": "a"}}}}]
+        threads = processor.group_by_thread(records)
+        self.assertEqual(set(threads), {"a", "b"})
+        self.assertEqual(threads["a"]["sequence_numbers"], ["1", "3"])
+        self.assertEqual([m["id"] for m in threads["a"]["messages"]], ["m2", "m1"])
+
+    def test_message_insert_reaches_subscribers(self):
+        self.table.put_item(Item={"thread_id": "a", "connection_id": "c1"})
+        processor.websocket_client = api = FakeManagementApi()
+        event = {"Records": [_record(1, "a", "m2", "2025-01-01T00:00:02"),
+                             _record(2, "a", "m1", "2025-01-01T00:00:01")]}
+        self.assertEqual(processor.lambda_handler(event, None), {"batchItemFailures": []})
+        (cid, frame), = api.sent
+        self.assertEqual(frame["type"], "chat_delta")
+        self.assertEqual([m["id"] for m in frame["messages"]], ["m1", "m2"])
+        self.assertEqual(frame["messages"][0]["message"], "msg m1")
+        self.assertEqual(frame["seq"], "2025-01-01T00:00:02")
+
+    def test_fan_out_delivers_and_prunes_gone_connections(self):
+        for cid in ("c1", "c2", "c3"):
+            self.table.put_item(Item={"thread_id": "a", "connection_id": cid})
+        self.table.put_item(Item={"thread_id": "other", "connection_id": "c9"})
+        processor.websocket_client = api = FakeManagementApi(gone={"c2"})
+
+        frame = processor.build_chat_frame("a", [{"id": "2", "timestamp": "2025-01-01T00:00:02"}])
+        self.assertEqual(processor.fan_out("a", frame), 2)
+        self.assertEqual(sorted(cid for cid, _ in api.sent), ["c1", "c3"])
+        self.assertEqual(api.sent[0][1]["messages"], [{"id": "2", "timestamp": "2025-01-01T00:00:02"}])
+        self.assertEqual(sorted(i["connection_id"] for i in self.table.scan()["Items"]), ["c1", "c3", "c9"])
+
+    def test_failed_thread_reports_its_first_sequence_number(self):
+        sent = []
+
+        def fan_out(thread_id, frame):
+            if thread_id == "bad":
+                raise RuntimeError("endpoint down")
+            sent.append((thread_id, frame["seq"]))
+            return 1
+
+        processor.fan_out = fan_out
+        event = {"Records": [_record(10, "bad", "1", "2025-01-01T00:00:01"),
+                             _record(11, "good", "x", "2025-01-01T00:00:01"),
+                             _record(12, "bad", "2", "2025-01-01T00:00:02")]}
+        result = processor.lambda_handler(event, None)
+        self.assertEqual(result, {"batchItemFailures": [{"itemIdentifier": "10"}]})
+        self.assertEqual(sent, [("good", "2025-01-01T00:00:01")])
+
+if __name__ == "__main__":
+    unittest.main()
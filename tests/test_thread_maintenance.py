@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from utils.fake_aws import FakeDynamoDB
+from utils.thread_maintenance import DEFAULT_MESSAGE, ThreadPruner, TokenBucket, start_background_prune
+
+NOW = datetime(2025, 1, 2, 12, 0, 0)
+OLD = "2025-01-01T00:00:00"
+FRESH = "2025-01-02T11:59:00"
+
+class TestThreadPruner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.tmp_dir, "prune_checkpoint.json")
+        self.table = FakeDynamoDB(page_size=3).create_table(
+            "chat", ("email", "id"), {"thread_id-timestamp-index": ("thread_id", "timestamp")})
+        self.sleeps = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _put(self, thread_id, n, message=DEFAULT_MESSAGE, timestamp=OLD):
+        self.table.put_item(Item={"email": "a@x.com", "id": f"{thread_id}-{n}", "thread_id": thread_id,
+                                  "message": message, "timestamp": timestamp})
+
+    def _pruner(self, **kwargs):
+        limiter = TokenBucket(rate=1000, sleep=self.sleeps.append)
+        return ThreadPruner(table=self.table, segments=2, page_size=2, min_age=3600,
+                            checkpoint_path=self.checkpoint, thread_index="thread_id-timestamp-index",
+                            limiter=limiter, now=lambda: NOW, **kwargs)
+
+    def _thread_ids(self):
+        return {item["thread_id"] for item in self.table.scan(Limit=1000)["Items"]}
+
+    def test_prunes_only_old_threads_holding_nothing_but_the_default_message(self):
+        for i in range(5):
+            self._put(f"empty{i}", 0)
+        self._put("empty0", 1)
+        self._put("busy", 0)
+        self._put("busy", 1, message="The sink is leaking", timestamp=OLD)
+        self._put("fresh", 0, timestamp=FRESH)
+
+        stats = self._pruner().run()
+
+        self.assertEqual(self._thread_ids(), {"busy", "fresh"})
+        self.assertEqual(stats["threads_deleted"], 5)
+        self.assertEqual(stats["items_deleted"], 6)
+        self.assertGreater(stats["pages"], 2)
+        with open(self.checkpoint) as f:
+            self.assertIn("completed_at", json.load(f))
+
+    def test_resumes_from_checkpoint(self):
+        self._put("empty", 0)
+        # Segment 0 finished and segment 1 was never started in an interrupted run
+        with open(self.checkpoint, "w") as f:
+            json.dump({"total_segments": 2, "segments": {"0": {"last_key": None, "done": True}}}, f)
+        pruner = self._pruner()
+        pruner.run()
+        self.assertEqual(pruner.stats["pages"], 1)
+
+    def test_deletes_are_rate_limited(self):
+        for i in range(3):
+            self._put("empty", i)
+        now = [0.0]
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = TokenBucket(rate=1, clock=lambda: now[0], sleep=sleep)
+        stats = ThreadPruner(table=self.table, segments=1, min_age=0, checkpoint_path="",
+                             thread_index="thread_id-timestamp-index", limiter=limiter,
+                             now=lambda: NOW).run()
+        self.assertEqual(stats["items_deleted"], 3)
+        self.assertEqual(sum(self.sleeps), 2)
+
+    def test_background_prune_runs_once_with_its_own_checkpoint(self):
+        self._put("empty", 0)
+        self._put("empty", 1)
+        release, now = threading.Event(), [0.0]
+
+        def sleep(seconds):
+            release.wait(5)
+            now[0] += seconds
+
+        # The second delete waits for a token until the test releases it
+        limiter = TokenBucket(rate=1, clock=lambda: now[0], sleep=sleep)
+        manual = os.path.join(self.tmp_dir, "manual.json")
+        kwargs = dict(table=self.table, segments=1, min_age=3600, thread_index="thread_id-timestamp-index",
+                      limiter=limiter, now=lambda: NOW, checkpoint_path=manual)
+        worker = start_background_prune(**kwargs)
+        self.assertIsNotNone(worker)
+        self.assertIsNone(start_background_prune(**kwargs))
+        release.set()
+        worker.join(5)
+        self.assertEqual(self._thread_ids(), set())
+        self.assertTrue(os.path.exists(manual))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+if __name__ == "__main__":
+    unittest.main()
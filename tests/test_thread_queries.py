@@ -0,0 +1,65 @@
+import unittest
+from utils.aws_backend import get_setting
+from utils.fake_aws import FakeDynamoDB
+from utils.thread_queries import (all_threads, page_threads, query_thread_messages, read_thread_messages,
+                                  user_threads)
+
+class TestThreadQueries(unittest.TestCase):
+
+    def setUp(self):
+        # Small pages so every read has to follow LastEvaluatedKey
+        self.table = FakeDynamoDB(page_size=2).create_table(
+            "chat", ("email", "id"), {get_setting("DYNAMODB_THREAD_INDEX"): ("thread_id", "timestamp")})
+        self.n = 0
+
+    def _put(self, email, thread_id, minute, **extra):
+        self.n += 1
+        item = {"email": email, "id": f"m{self.n:02d}", "thread_id": thread_id,
+                "timestamp": f"2025-01-01T00:{minute:02d}:00", "message": "hi", **extra}
+        self.table.put_item(Item=item)
+        return item
+
+    def test_thread_messages_in_timestamp_order_across_pages(self):
+        for minute in (5, 1, 4, 2, 3):
+            self._put("a@x.com", "t1", minute)
+        self._put("a@x.com", "t2", 0)
+        messages = read_thread_messages("t1", table=self.table)
+        self.assertEqual([m["timestamp"][14:16] for m in messages], ["01", "02", "03", "04", "05"])
+
+        page, next_key = query_thread_messages("t1", limit=2, newest_first=True, table=self.table)
+        self.assertEqual([m["timestamp"][14:16] for m in page], ["05", "04"])
+        self.assertIsNotNone(next_key)
+
+    def test_messages_without_id_are_not_collapsed(self):
+        # Legacy items without an id (the fake's key schema can't hold them)
+        legacy = [{"thread_id": "t1", "timestamp": f"2025-01-01T00:0{i}:00"} for i in (2, 3)]
+        table = type("LegacyTable", (), {"query": lambda _, **kwargs: {"Items": legacy}})()
+        self.assertEqual(read_thread_messages("t1", table=table), legacy)
+
+    def test_user_threads_are_distinct_and_paged_by_thread(self):
+        for minute, thread_id in enumerate(["t1", "t2", "t1", "t3", "t1", "t2", "t4"]):
+            self._put("a@x.com", thread_id, minute)
+        self._put("b@x.com", "t9", 59)
+        threads = user_threads("a@x.com", table=self.table)
+        self.assertEqual([t["thread_id"] for t in threads], ["t4", "t2", "t1", "t3"])
+        self.assertEqual(threads[0]["timestamp"], "2025-01-01T00:06:00")
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = page_threads(threads, limit=3, cursor=cursor)
+            pages.append([t["thread_id"] for t in page])
+            if cursor is None:
+                break
+        self.assertEqual(pages, [["t4", "t2", "t1"], ["t3"]])
+        self.assertEqual(page_threads(threads)[0], threads)
+
+    def test_all_threads_newest_first(self):
+        self._put("a@x.com", "t1", 1)
+        self._put("b@x.com", "t2", 2)
+        self._put("b@x.com", "t1", 3)
+        self.assertEqual(all_threads(table=self.table), [
+            {"thread_id": "t1", "timestamp": "2025-01-01T00:03:00"},
+            {"thread_id": "t2", "timestamp": "2025-01-01T00:02:00"}])
+
+if __name__ == "__main__":
+    unittest.main()
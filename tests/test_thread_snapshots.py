@@ -0,0 +1,82 @@
+import unittest
+from utils.fake_aws import FakeS3Client
+from utils.thread_snapshots import (ThreadSnapshotService, decode_snapshot, read_thread_snapshot,
+                                    set_snapshot_service)
+
+class TestThreadSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.s3 = FakeS3Client()
+        self.service = ThreadSnapshotService(s3_client=lambda: self.s3, bucket="test-bucket", interval=30,
+                                             encoding="gzip", clock=lambda: self.now, background=False)
+
+    def stored(self, thread_id):
+        obj = self.s3.get_object(Bucket="test-bucket", Key=f"threads/{thread_id}.json")
+        return obj, decode_snapshot(obj["Body"].read())
+
+    def test_first_snapshot_uploads_then_debounces(self):
+        self.service.mark_dirty("t1", [{"id": "m1"}])
+        self.assertEqual(self.service.flush_due(), 1)
+        for i in range(2, 6):
+            self.service.mark_dirty("t1", [{"id": f"m{j}"} for j in range(1, i + 1)])
+            self.assertEqual(self.service.flush_due(), 0)
+        self.now = 31
+        self.assertEqual(self.service.flush_due(), 1)
+        self.assertEqual(self.s3.stats["put_object"], 2)
+        obj, messages = self.stored("t1")
+        self.assertEqual(obj["ContentEncoding"], "gzip")
+        self.assertEqual([m["id"] for m in messages], ["m1", "m2", "m3", "m4", "m5"])
+
+    def test_unchanged_content_is_not_uploaded(self):
+        self.service.mark_dirty("t1", [{"id": "m1", "message": "hi"}])
+        self.service.flush()
+        self.service.mark_dirty("t1", [{"message": "hi", "id": "m1"}])
+        self.assertEqual(self.service.flush(), 0)
+        self.assertEqual(self.service.stats["skipped_unchanged"], 1)
+        self.assertEqual(self.s3.stats["put_object"], 1)
+
+    def test_flush_ignores_interval(self):
+        self.service.mark_dirty("t1", [{"id": "m1"}])
+        self.service.flush_due()
+        self.service.mark_dirty("t1", [{"id": "m1"}, {"id": "m2"}])
+        self.service.mark_dirty("t2", [{"id": "x"}])
+        self.assertEqual(self.service.flush(), 2)
+        self.assertEqual(self.service.pending(), [])
+
+    def test_compact_json_encoding(self):
+        service = ThreadSnapshotService(s3_client=lambda: self.s3, bucket="test-bucket", interval=0,
+                                        encoding="json", clock=lambda: self.now, background=False)
+        service.mark_dirty("t3", [{"id": "m1", "message": "hi"}])
+        service.flush()
+        obj, messages = self.stored("t3")
+        self.assertNotIn("ContentEncoding", obj)
+        self.assertEqual(messages, [{"id": "m1", "message": "hi"}])
+
+    def test_failed_upload_is_retried(self):
+        class Broken:
+            def put_object(self, **kwargs):
+                raise IOError("network down")
+
+        service = ThreadSnapshotService(s3_client=Broken, bucket="b", interval=30,
+                                        clock=lambda: self.now, background=False)
+        service.mark_dirty("t1", [{"id": "m1"}])
+        self.assertEqual(service.flush_due(), 0)
+        self.assertEqual(service.pending(), ["t1"])
+        self.assertEqual(service.stats["errors"], 1)
+
+    def test_flushed_snapshot_reads_back_in_either_encoding(self):
+        messages = [{"id": "m1", "message": "héllo"}, {"id": "m2", "message": "hi"}]
+        for encoding in ("gzip", "json"):
+            service = ThreadSnapshotService(s3_client=lambda: self.s3, bucket="test-bucket", interval=30,
+                                            encoding=encoding, clock=lambda: self.now, background=False)
+            service.mark_dirty(f"t-{encoding}", messages)
+            service.flush()
+            set_snapshot_service(service)
+            try:
+                self.assertEqual(read_thread_snapshot(f"t-{encoding}"), messages)
+            finally:
+                set_snapshot_service(None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+from utils.ws_broadcaster import Broadcaster
+
+class FakeSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def send(self, payload):
+        await asyncio.sleep(self.delay)
+        self.sent.append(payload)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+class TestBroadcaster(unittest.TestCase):
+
+    def test_slow_client_does_not_stall_others(self):
+        async def scenario():
+            broadcaster = Broadcaster(max_queue=4, send_timeout=5)
+            fast, slow = FakeSocket(), FakeSocket(delay=0.2)
+            broadcaster.subscribe("t1", fast)
+            broadcaster.subscribe("t1", slow)
+            for i in range(10):
+                broadcaster.publish("t1", f"m{i}")
+                await asyncio.sleep(0.005)
+            self.assertEqual(len(fast.sent), 10)
+            self.assertLess(len(slow.sent), 10)
+            metrics = broadcaster.metrics()
+            self.assertGreater(metrics["dropped"], 0)
+            self.assertEqual(metrics["connections"], 2)
+            await broadcaster.unsubscribe("t1", fast)
+            await broadcaster.unsubscribe("t1", slow)
+        asyncio.run(scenario())
+
+    def test_snapshots_coalesce_to_latest(self):
+        async def scenario():
+            broadcaster = Broadcaster()
+            socket = FakeSocket(delay=0.05)
+            broadcaster.subscribe("t1", socket)
+            for i in range(5):
+                broadcaster.publish("t1", f"snapshot {i}", coalesce_key="chat_log")
+            await asyncio.sleep(0.2)
+            self.assertEqual(socket.sent, ["snapshot 4"])
+            self.assertEqual(broadcaster.metrics()["coalesced"], 4)
+            await broadcaster.unsubscribe("t1", socket)
+        asyncio.run(scenario())
+
+    def test_send_timeout_closes_slow_client(self):
+        async def scenario():
+            broadcaster = Broadcaster(send_timeout=0.05)
+            socket = FakeSocket(delay=1)
+            sender = broadcaster.subscribe("t1", socket)
+            broadcaster.publish("t1", "m0")
+            await asyncio.sleep(0.15)
+            self.assertTrue(sender.closed)
+            self.assertEqual(socket.closed_with, 1013)
+            await broadcaster.unsubscribe("t1", socket)
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    unittest.main()
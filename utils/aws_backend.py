@@ -0,0 +1,162 @@
+# utils/aws_backend.py
+"""
+Single place the app gets its DynamoDB resource and S3 client from.
+
+LANDTEN_AWS_BACKEND=fake swaps both for the in-process fakes in
+utils/fake_aws.py (latency per call from LANDTEN_FAKE_LATENCY_MS), so the
+chat and storage paths run offline and can be load-tested on a laptop.
+Tests can also inject their own objects with set_aws_backend().
+
+Real clients are created lazily, once per process, from one shared boto3
+Session (credentials are resolved once) with client_config(): a larger
+connection pool for the worker threads, TCP keep-alive and adaptive
+retries. boto3 clients are thread-safe, so every module and thread shares
+them; don't build clients with boto3.client() elsewhere.
+"""
+import os
+import threading
+from typing import Optional
+
+try:
+    from boto3.dynamodb.conditions import Key, Attr
+    from botocore.exceptions import ClientError
+except ImportError:  # offline / fake backend only
+    from utils.fake_aws import Key, Attr, ClientError
+
+AWS_BACKEND = os.getenv("LANDTEN_AWS_BACKEND", "aws").lower()
+FAKE_LATENCY_MS = float(os.getenv("LANDTEN_FAKE_LATENCY_MS", "0"))
+
+_defaults = {
+    "AWS_REGION": "us-east-1",
+    "DYNAMODB_TABLE": "landten_chat",
+    "DYNAMODB_THREAD_INDEX": "thread_id-timestamp-index",
+    "S3_BUCKET": "landten-local",
+}
+
+_lock = threading.Lock()
+_session = None
+_config = None
+_dynamodb = None
+_s3_client = None
+_clients = {}
+
+
+def get_setting(name: str, default=None):
+    """Streamlit secret, then environment variable, then the local default."""
+    try:
+        import streamlit as st
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        pass  # no streamlit or no secrets.toml (scripts, tests, fake backend)
+    return os.getenv(name, _defaults.get(name, default))
+
+
+def fake_backend_enabled() -> bool:
+    return AWS_BACKEND == "fake"
+
+
+def _fake_dynamodb():
+    from utils.fake_aws import FakeDynamoDB
+    # Same key schema and GSI as the real chat/users tables
+    return FakeDynamoDB({
+        get_setting("DYNAMODB_TABLE"): {
+            "keys": ("email", "id"),
+            "indexes": {get_setting("DYNAMODB_THREAD_INDEX"): ("thread_id", "timestamp")},
+        },
+        "landten_users": {"keys": ("user_id",)},
+    }, latency=FAKE_LATENCY_MS / 1000.0)
+
+
+def _aws_kwargs() -> dict:
+    return {
+        "aws_access_key_id": get_setting("AWS_ACCESS_KEY"),
+        "aws_secret_access_key": get_setting("AWS_SECRET_ACCESS_KEY"),
+        "region_name": get_setting("AWS_REGION"),
+    }
+
+
+def client_config():
+    """
+    botocore Config used for every client and resource. AWS_MAX_POOL_CONNECTIONS
+    (default 50), AWS_MAX_ATTEMPTS (5), AWS_CONNECT_TIMEOUT (5s) and
+    AWS_READ_TIMEOUT (30s) are read with get_setting().
+    """
+    from botocore.config import Config
+    return Config(
+        region_name=get_setting("AWS_REGION"),
+        max_pool_connections=int(get_setting("AWS_MAX_POOL_CONNECTIONS", 50)),
+        tcp_keepalive=True,
+        connect_timeout=float(get_setting("AWS_CONNECT_TIMEOUT", 5)),
+        read_timeout=float(get_setting("AWS_READ_TIMEOUT", 30)),
+        retries={"mode": "adaptive", "max_attempts": int(get_setting("AWS_MAX_ATTEMPTS", 5))},
+    )
+
+
+def _create(kind: str, service_name: str, **kwargs):
+    # Caller holds _lock. boto3.client() would go through the default session,
+    # which isn't safe to use from several threads at once.
+    global _session, _config
+    if _session is None:
+        import boto3
+        _session = boto3.session.Session(**_aws_kwargs())
+        _config = client_config()
+    factory = _session.resource if kind == "resource" else _session.client
+    return factory(service_name, config=_config, **kwargs)
+
+
+def get_dynamodb():
+    """The DynamoDB resource (boto3 or fake); call .Table(name) on it."""
+    global _dynamodb
+    with _lock:
+        if _dynamodb is None:
+            if fake_backend_enabled():
+                _dynamodb = _fake_dynamodb()
+            else:
+                _dynamodb = _create("resource", "dynamodb")
+        return _dynamodb
+
+
+def get_s3_client():
+    """The S3 client (boto3 or fake)."""
+    global _s3_client
+    with _lock:
+        if _s3_client is None:
+            if fake_backend_enabled():
+                from utils.fake_aws import FakeS3Client
+                _s3_client = FakeS3Client(latency=FAKE_LATENCY_MS / 1000.0)
+            else:
+                _s3_client = _create("client", "s3")
+        return _s3_client
+
+
+def get_aws_client(service_name: str, endpoint_url: Optional[str] = None):
+    """Any other boto3 client (dynamodb, dynamodbstreams, ...), one per service and endpoint."""
+    key = (service_name, endpoint_url)
+    with _lock:
+        if key not in _clients:
+            if fake_backend_enabled():
+                raise RuntimeError(f"The fake AWS backend has no {service_name} client; inject one with set_aws_client().")
+            _clients[key] = _create("client", service_name, endpoint_url=endpoint_url)
+        return _clients[key]
+
+
+def set_aws_client(service_name: str, client, endpoint_url: Optional[str] = None) -> None:
+    with _lock:
+        if client is None:
+            _clients.pop((service_name, endpoint_url), None)
+        else:
+            _clients[(service_name, endpoint_url)] = client
+
+
+def get_table(name: Optional[str] = None):
+    """A DynamoDB Table, defaulting to the chat table."""
+    return get_dynamodb().Table(name or get_setting("DYNAMODB_TABLE"))
+
+
+def set_aws_backend(dynamodb=None, s3_client=None) -> None:
+    """Inject DynamoDB/S3 implementations (tests, benchmarks); None resets to lazy defaults."""
+    global _dynamodb, _s3_client
+    with _lock:
+        _dynamodb = dynamodb
+        _s3_client = s3_client
@@ -0,0 +1,156 @@
+# utils/cache.py
+"""
+Process-wide TTL cache for data-layer reads.
+
+Streamlit runs every session in one process, so a module-level cache is
+shared across sessions and reruns. Functions decorated with @cached are
+memoized per argument set for `ttl` seconds under one or more tags; the
+write paths call invalidate(tag) so the next read after a mutation goes
+back to the store. The TTL only bounds staleness from writers outside this
+process (scripts, Lambdas).
+
+Hits return a copy of the result's containers and rows (a list of dicts
+comes back as a new list of new dicts), so callers can add or change
+fields on what they get without touching the cached value; anything
+nested deeper inside a row is shared and must not be mutated. A miss that
+races an invalidate() is returned but not stored.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+
+class TTLCache:
+    """LRU of (expires_at, tags, value) with tag-based invalidation."""
+
+    def __init__(self, max_entries: int = 2048, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # Tag -> version of its last invalidation; tags without one read as
+        # _floor (raised whenever counters are pruned, so old snapshots fail)
+        self._generations: Dict[str, int] = {}
+        self._version = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key: tuple) -> Tuple[bool, object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self.clock() >= entry[0]:
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, entry[2]
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        with self._lock:
+            return self._generation(tags)
+
+    def _generation(self, tags: Iterable[str]) -> tuple:
+        # Caller holds self._lock
+        return tuple(self._generations.get(tag, self._floor) for tag in tags)
+
+    def set(self, key: tuple, value, ttl: float, tags: Tuple[str, ...], generation: Optional[tuple] = None) -> bool:
+        """Store `value`; skipped if any tag was invalidated since `generation` was taken."""
+        with self._lock:
+            if generation is not None and generation != self._generation(tags):
+                return False
+            self._entries[key] = (self.clock() + ttl, tags, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of `tags`; returns how many were dropped."""
+        tags = set(tags)
+        with self._lock:
+            self._version += 1
+            for tag in tags:
+                self._generations[tag] = self._version
+            stale = [key for key, entry in self._entries.items() if tags.intersection(entry[1])]
+            for key in stale:
+                del self._entries[key]
+            if len(self._generations) > self.max_entries:
+                self._prune_generations()
+            self.stats["invalidations"] += 1
+            return len(stale)
+
+    def _prune_generations(self) -> None:
+        # Caller holds self._lock. Per-record tags (chat:{id}) would otherwise
+        # pile up forever; keep only the counters of tags still on an entry.
+        live = set()
+        for entry in self._entries.values():
+            live.update(entry[1])
+        self._generations = {tag: v for tag, v in self._generations.items() if tag in live}
+        # A dropped tag now reads as the floor, which no earlier snapshot holds
+        self._floor = self._version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._floor = self._version = self._version + 1
+
+
+_cache = TTLCache()
+
+
+def get_cache() -> TTLCache:
+    return _cache
+
+
+def invalidate(*tags: str) -> int:
+    return _cache.invalidate(*tags)
+
+
+def _freeze(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        # dict/list arguments (filters, projections): key on their repr
+        return ("repr", repr(value))
+
+
+def _copy_rows(value, depth: int = 2):
+    """Copy lists and dicts `depth` levels down; tuples (e.g. (rows, cursor)) are copied without using up a level."""
+    if depth and isinstance(value, list):
+        return [_copy_rows(item, depth - 1) for item in value]
+    if depth and isinstance(value, dict):
+        return {key: _copy_rows(item, depth - 1) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_copy_rows(item, depth) for item in value)
+    return value
+
+
+def cached(ttl: float = 60, tags: Union[Iterable[str], Callable[..., Iterable[str]]] = (), copy_result: bool = True):
+    """
+    Memoize a data-layer read. `tags` is a tuple of tag names, or a callable
+    taking the function's arguments and returning them (per-record tags such
+    as f"chat:{thread_id}"). The undecorated function stays available as
+    `.uncached`. copy_result=False hands out the cached value itself, for
+    callers that never mutate it.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            entry_tags = tuple(tags(*args, **kwargs) if callable(tags) else tags)
+            key = (func.__module__, func.__qualname__, _freeze(args), _freeze(tuple(sorted(kwargs.items()))))
+            hit, value = _cache.get(key)
+            if not hit:
+                generation = _cache.generation(entry_tags)
+                value = func(*args, **kwargs)
+                _cache.set(key, value, ttl, entry_tags, generation)
+            return _copy_rows(value) if copy_result else value
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,204 @@
+# utils/chat_delta.py
+"""
+Delta protocol for chat updates pushed over WebSocket.
+
+Every chat message is its own item in the chat table, so a frame carries
+only the new messages of one thread, taken from the stream records'
+NewImages. Positions in a thread (`seq`) are message timestamps, the sort
+key of the thread index: the client derives its own position from the
+messages it already holds (the same GSI items), with no counter to keep in
+step. `base_seq` is the newest position the server had published before
+the frame; a client whose newest message is older than that missed a frame
+and asks for a resync from its own position. Merging is by message id, so
+a replayed or overlapping frame is harmless.
+
+    {"type": "chat_delta", "thread_id": ..., "base_seq": "2025-01-01T10:00:00", "seq": "...", "messages": [...]}
+    {"type": "resync", "thread_id": ..., "since": "2025-01-01T09:59:00"}          (client -> server)
+    {"type": "chat_snapshot", "thread_id": ..., "since": "...", "seq": "...", "messages": [...]}
+"""
+import asyncio
+import json
+import logging
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.chat_log import ChatLog
+
+
+def from_dynamodb(value: dict):
+    """Decode one DynamoDB-JSON attribute value from a stream image."""
+    (kind, data), = value.items()
+    if kind == "S" or kind == "B":
+        return data
+    if kind == "N":
+        number = Decimal(data)
+        return int(number) if number == number.to_integral_value() else float(number)
+    if kind == "BOOL":
+        return data
+    if kind == "NULL":
+        return None
+    if kind == "L":
+        return [from_dynamodb(v) for v in data]
+    if kind == "M":
+        return {k: from_dynamodb(v) for k, v in data.items()}
+    if kind in ("SS", "BS"):
+        return list(data)
+    if kind == "NS":
+        return [from_dynamodb({"N": n}) for n in data]
+    raise ValueError(f"Unknown DynamoDB attribute type: {kind}")
+
+
+def message_seq(message: dict) -> str:
+    """A message's position in its thread: its timestamp, the thread index's sort key."""
+    return str(message.get("timestamp") or "")
+
+
+def log_seq(messages: Iterable[dict]) -> str:
+    """Position of the newest message ("" for an empty thread)."""
+    return max((message_seq(m) for m in messages), default="")
+
+
+def stream_messages(records: Iterable[dict]) -> Dict[str, List[dict]]:
+    """
+    {thread_id: new or edited messages, oldest first} from a batch of stream
+    records. Each chat message is its own item (see utils/message_pipeline.py),
+    so a record's NewImage is the message itself; removals and items that
+    aren't messages (no id or thread_id) are skipped.
+    """
+    threads: Dict[str, List[dict]] = {}
+    for record in records:
+        if record.get("eventName") not in ("INSERT", "MODIFY"):
+            continue
+        image = record.get("dynamodb", {}).get("NewImage", {})
+        if "id" not in image or "thread_id" not in image:
+            continue
+        message = {k: from_dynamodb(v) for k, v in image.items()}
+        threads.setdefault(message["thread_id"], []).append(message)
+    for messages in threads.values():
+        messages.sort(key=message_seq)
+    return threads
+
+
+def build_delta(thread_id: str, messages: List[dict], base_seq: Optional[str] = None) -> dict:
+    """
+    Frame for new `messages` of a thread. `base_seq` is the newest position
+    the sender had already published for the thread, or None if it doesn't
+    know (then receivers can't detect a gap and simply merge).
+    """
+    messages = sorted(messages, key=message_seq)
+    return {"type": "chat_delta", "thread_id": thread_id, "base_seq": base_seq,
+            "seq": max(log_seq(messages), base_seq or ""), "messages": messages}
+
+
+def build_snapshot(thread_id: str, messages: Iterable[dict], since: str = "") -> dict:
+    """Every message after position `since` (the answer to a resync request)."""
+    messages = sorted((m for m in messages if message_seq(m) > since), key=message_seq)
+    return {"type": "chat_snapshot", "thread_id": thread_id, "since": since,
+            "seq": max(log_seq(messages), since), "messages": messages}
+
+
+class ChatDeltaReceiver:
+    """Client-side copy of one thread kept current from delta/snapshot frames."""
+
+    def __init__(self, thread_id: str, chat_log: Optional[Iterable[dict]] = None):
+        self.thread_id = thread_id
+        # Copies: ChatLog updates edited messages in place
+        self.chat_log = ChatLog(dict(m) for m in chat_log or [])
+
+    @property
+    def seq(self) -> str:
+        return message_seq(self.chat_log[-1]) if self.chat_log else ""
+
+    def apply(self, frame: dict) -> Tuple[List[dict], Optional[dict]]:
+        """
+        Apply a frame for this thread. Returns (messages that were new or
+        changed, resync request or None); the caller sends a resync request
+        back to the server. A delta that starts past our newest message means
+        a frame was missed: it isn't applied, the resync snapshot covers it.
+        """
+        if frame.get("thread_id") != self.thread_id or frame.get("type") not in ("chat_delta", "chat_snapshot"):
+            return [], None
+        if frame["type"] == "chat_delta" and frame.get("base_seq") is not None and frame["base_seq"] > self.seq:
+            return [], self.resync_request()
+        changed = []
+        for message in frame.get("messages", []):
+            known = self.chat_log.get(message.get("id")) if message.get("id") is not None else None
+            if known != message:
+                changed.append(message)
+                self.chat_log.append(dict(message))
+        return changed, None
+
+    def resync_request(self) -> dict:
+        return {"type": "resync", "thread_id": self.thread_id, "since": self.seq}
+
+
+class ChatDeltaListener:
+    """
+    Background WebSocket subscription for one thread.
+
+    A daemon thread keeps a ChatDeltaReceiver current from the server's
+    frames (answering gaps with resync requests). The UI thread calls drain()
+    on each rerun to pick up the messages and notifications that arrived
+    since, and merges them into what it renders; nothing here touches
+    Streamlit state from the background thread.
+    """
+
+    def __init__(self, url: str, thread_id: str, chat_log: Optional[List[dict]] = None,
+                 token: Optional[str] = None):
+        self.url = url
+        self.thread_id = thread_id
+        self.token = token
+        self.receiver = ChatDeltaReceiver(thread_id, chat_log)
+        self._messages: List[dict] = []
+        self._notifications: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def handle(self, frame: dict) -> Optional[dict]:
+        """Apply one server frame; returns the reply to send back (a resync request) or None."""
+        kind = frame.get("type")
+        if kind == "notification":
+            with self._lock:
+                self._notifications.append(frame.get("message", ""))
+            return None
+        if kind not in ("chat_delta", "chat_snapshot") or frame.get("thread_id") != self.thread_id:
+            return None
+        with self._lock:
+            changed, resync = self.receiver.apply(frame)
+            self._messages.extend(changed)
+        return resync
+
+    def drain(self) -> Tuple[List[dict], List[str]]:
+        """(messages, notifications) received since the last call."""
+        with self._lock:
+            messages, self._messages = self._messages, []
+            notifications, self._notifications = self._notifications, []
+        return messages, notifications
+
+    async def _listen(self) -> None:
+        import websockets
+        async with websockets.connect(self.url) as websocket:
+            if self.token:
+                await websocket.send(self.token)
+            while not self._stop.is_set():
+                reply = self.handle(json.loads(await websocket.recv()))
+                if reply:
+                    await websocket.send(json.dumps(reply))
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._listen())
+        except Exception as e:
+            logging.warning(f"Chat listener for thread {self.thread_id} stopped: {e}")
+
+    def start(self) -> "ChatDeltaListener":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"chat-listener-{self.thread_id}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop after the next frame (the thread is a daemon, so a quiet socket doesn't block exit)."""
+        self._stop.set()
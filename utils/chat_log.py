@@ -0,0 +1,114 @@
+# utils/chat_log.py
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+
+class ChatLog:
+    """
+    Chat messages kept de-duplicated by id and ordered by timestamp.
+
+    Replaces the `{m["id"]: m for m in sorted(log)}` pass that used to run on
+    every rerun: inserts find their slot with bisect (appending in time order
+    is the common, cheap case), membership is an id lookup, and re-adding an
+    id updates that message in place. Behaves like a read-only list for
+    iteration, len(), indexing and slicing; list(log) gives plain dicts for
+    JSON.
+    """
+
+    def __init__(self, messages: Optional[Iterable[dict]] = None):
+        self._messages: List[dict] = []
+        self._keys: List[tuple] = []
+        self._by_id: Dict[str, dict] = {}
+        self._counter = 0
+        for message in messages or []:
+            self.append(message)
+
+    def _message_id(self, message: dict) -> str:
+        message_id = message.get("id")
+        if message_id is None:
+            # Legacy messages without an id still get a stable identity
+            message_id = f"_anon_{self._counter}"
+        return message_id
+
+    def _sort_key(self, message: dict) -> tuple:
+        timestamp = message.get("timestamp")
+        if timestamp is None:
+            # No timestamp: keep it where it was appended
+            timestamp = self._keys[-1][0] if self._keys else ""
+        self._counter += 1
+        return (str(timestamp), self._counter)
+
+    # ---------------------------
+    # Mutation
+    # ---------------------------
+    def append(self, message: dict) -> None:
+        """Insert in timestamp order; an id already present is updated instead."""
+        message_id = self._message_id(message)
+        existing = self._by_id.get(message_id)
+        if existing is not None:
+            if existing is not message:
+                existing.clear()
+                existing.update(message)
+            return
+        key = self._sort_key(message)
+        if not self._keys or key >= self._keys[-1]:
+            self._keys.append(key)
+            self._messages.append(message)
+        else:
+            index = bisect_right(self._keys, key)
+            self._keys.insert(index, key)
+            self._messages.insert(index, message)
+        self._by_id[message_id] = message
+
+    add = append
+
+    def extend(self, messages: Iterable[dict]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._keys.clear()
+        self._by_id.clear()
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def get(self, message_id: str) -> Optional[dict]:
+        return self._by_id.get(message_id)
+
+    def __contains__(self, item) -> bool:
+        if isinstance(item, dict):
+            message_id = item.get("id")
+            if message_id is not None:
+                return message_id in self._by_id
+            return any(m == item for m in self._messages)
+        return item in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __reversed__(self):
+        return reversed(self._messages)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+    def __bool__(self) -> bool:
+        return bool(self._messages)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ChatLog):
+            return self._messages == other._messages
+        if isinstance(other, list):
+            return self._messages == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ChatLog({len(self._messages)} messages)"
+
+    def to_list(self) -> List[dict]:
+        return list(self._messages)
@@ -1,10 +1,21 @@
 # chat_log_writer.py
 import os, json
+from utils.file_lock import update_json, atomic_write_json, file_lock
+from utils.sqlite_store import SqliteRecordStore, sqlite_enabled
+from utils.cache import invalidate
+
+# With the SQLite backend, every thread's messages live in one indexed table
+# instead of a JSON file per thread.
+_messages = SqliteRecordStore("chat_messages", indexed=["thread_id"]) if sqlite_enabled() else None
 
 def get_chat_log_path(thread_id):
     return f"logs/chat_thread_{thread_id}.json"
 
 def load_chat_log(thread_id):
+    if _messages is not None:
+        rows = _messages.find("thread_id", thread_id)
+        if rows:
+            return [row["message"] for row in rows]
     path = get_chat_log_path(thread_id)
     if not os.path.exists("logs"):
         os.makedirs("logs")
@@ -17,8 +28,31 @@ def load_chat_log(thread_id):
         return []
 
 def append_chat_log(thread_id, message):
-    path = get_chat_log_path(thread_id)
-    log = load_chat_log(thread_id)
-    log.append(message)
-    with open(path, "w") as f:
-        json.dump(log, f, indent=2)
+    if _messages is not None:
+        with _messages.batch():
+            if _messages.count({"thread_id": thread_id}) == 0:
+                # First write for this thread: carry over its legacy JSON file
+                for legacy in load_chat_log(thread_id):
+                    _messages.append({"thread_id": thread_id, "message": legacy})
+            _messages.append({"thread_id": thread_id, "message": message})
+    else:
+        path = get_chat_log_path(thread_id)
+        update_json(path, lambda log: (log if isinstance(log, list) else []) + [message], default=[])
+    invalidate(f"chat:{thread_id}")
+
+def write_chat_log(thread_id, messages):
+    """Bring the local copy of a thread up to `messages` (the full, current log)."""
+    if _messages is not None:
+        with _messages.batch():
+            rows = _messages.find("thread_id", thread_id)
+            stored = {row["message"].get("id") for row in rows}
+            for message in messages:
+                # Append-only table: add what it hasn't seen yet (id-less legacy
+                # messages only on the thread's first write)
+                if (message.get("id") not in stored) if message.get("id") is not None else not rows:
+                    _messages.append({"thread_id": thread_id, "message": message})
+    else:
+        path = get_chat_log_path(thread_id)
+        with file_lock(path):
+            atomic_write_json(path, list(messages))
+    invalidate(f"chat:{thread_id}")
@@ -1,14 +1,52 @@
 import json
 import os
-from typing import List, Dict
-from utils.validation import validate_incident, validate_job
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 from utils.validation import validate_incident, validate_job
+from utils.record_store import Range, RecordStore, JsonlRecordStore
+from utils.record_index import IndexedRecordStore
+from utils.sqlite_store import SqliteRecordStore, sqlite_enabled
+from utils.chat_log_writer import load_chat_log, append_chat_log
+from utils.cache import cached, invalidate
 
 INCIDENTS_LOG = "logs/incidents.json"
 JOBS_LOG = "logs/jobs.json"
+FEEDBACK_LOG = "logs/feedback.json"
+
+def _build_store(name: str, path: str, key, fields: List[str]) -> RecordStore:
+    # LANDTEN_STORAGE_BACKEND=sqlite selects the SQLite engine; otherwise the
+    # JSONL log is wrapped in a process-wide index so lookups don't re-parse it.
+    if sqlite_enabled():
+        return SqliteRecordStore(name, key=key, indexed=fields, path=path)
+    return IndexedRecordStore(JsonlRecordStore(path, key=key), fields)
+
+# Record stores behind the incident/job/feedback logs. Swap one out with
+# set_record_store() to change how that log is persisted.
+_stores: Dict[str, RecordStore] = {
+    "incidents": _build_store(
+        "incidents", INCIDENTS_LOG, "incident_id",
+        ["tenant_id", "status", "priority", "timestamp"]
+    ),
+    "jobs": _build_store(
+        "jobs", JOBS_LOG, "job_id",
+        ["incident_id", "assigned_contractor_id", "status", "priority", "timestamp"]
+    ),
+    "feedback": _build_store("feedback", FEEDBACK_LOG, None, ["job_id"]),
+}
+
+def get_record_store(name: str) -> RecordStore:
+    return _stores[name]
+
+def set_record_store(name: str, store: RecordStore) -> None:
+    _stores[name] = store
+    invalidate(name)
+
+def _store_for_path(filepath: str):
+    return next((s for s in _stores.values() if getattr(s, "path", None) == filepath), None)
 
 def _load_json(filepath: str) -> List[Dict]:
+    store = _store_for_path(filepath)
+    if store is not None:
+        return store.all()
     if not os.path.exists(filepath):
         return []
     with open(filepath, "r") as f:
@@ -18,32 +56,36 @@ def _load_json(filepath: str) -> List[Dict]:
             return []
 
 def _write_json(filepath: str, data: List[Dict]):
+    store = _store_for_path(filepath)
+    if store is not None:
+        store.replace_all(data)
+        invalidate(*[name for name, s in _stores.items() if s is store])
+        return
     with open(filepath, "w") as f:
         json.dump(data, f, indent=2)
 
+# Public aliases used by the action relay and feedback modules
+load_json = _load_json
+save_json = _write_json
+
 def save_incident(incident_dict: dict) -> None:
     validate_incident(incident_dict)
-    records = _load_json(INCIDENTS_LOG)
-    records.append(incident_dict)
-    _write_json(INCIDENTS_LOG, records)
+    _stores["incidents"].append(incident_dict)
+    invalidate("incidents")
 
 def get_incidents_by_user(user_id: str) -> List[dict]:
-    records = _load_json(INCIDENTS_LOG)
-    return [i for i in records if i.get("tenant_id") == user_id]
+    return _stores["incidents"].find("tenant_id", user_id)
 
 def save_job(job_dict: dict) -> None:
     validate_job(job_dict)
-    records = _load_json(JOBS_LOG)
-    records.append(job_dict)
-    _write_json(JOBS_LOG, records)
+    _stores["jobs"].append(job_dict)
+    invalidate("jobs")
 
 def get_jobs_by_contractor(user_id: str) -> List[dict]:
-    records = _load_json(JOBS_LOG)
-    return [j for j in records if j.get("assigned_contractor_id") == user_id]
+    return _stores["jobs"].find("assigned_contractor_id", user_id)
 
 def convert_incident_to_job(incident_id: str, job_fields: dict) -> dict:
-    incidents = _load_json(INCIDENTS_LOG)
-    matching = next((i for i in incidents if i["incident_id"] == incident_id), None)
+    matching = _stores["incidents"].get(incident_id)
     if not matching:
         raise ValueError(f"Incident {incident_id} not found")
     new_job = {
@@ -59,77 +101,122 @@ def convert_incident_to_job(incident_id: str, job_fields: dict) -> dict:
     save_job(new_job)
     return new_job
 
+@cached(ttl=60, tags=("incidents",))
 def get_all_incidents() -> List[dict]:
     """Retrieve all incidents from the incidents log."""
-    return _load_json(INCIDENTS_LOG)
+    return _stores["incidents"].all()
 
+@cached(ttl=60, tags=("jobs",))
 def get_all_jobs() -> List[dict]:
     """Retrieve all jobs from the jobs log."""
-    return _load_json(JOBS_LOG)
+    return _stores["jobs"].all()
 
 def patch_job(job_id: str, updates: dict) -> None:
     """Update specific fields of a job in the jobs log."""
-    jobs = _load_json(JOBS_LOG)
-    for job in jobs:
-        if job.get("job_id") == job_id:
-            job.update(updates)
-            break
-    else:
+    if _stores["jobs"].get(job_id) is None:
         raise ValueError(f"Job with ID {job_id} not found.")
-    _write_json(JOBS_LOG, jobs)
+    _stores["jobs"].patch(job_id, updates)
+    invalidate("jobs")
 
+@cached(ttl=60, tags=lambda incident_id: (f"chat:{incident_id}",))
 def get_chat_thread(incident_id: str) -> List[dict]:
-    path = f"logs/chat_thread_{incident_id}.json"
-    try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
+    return load_chat_log(incident_id)
+
+def append_chat_message(incident_id: str, message: dict) -> None:
+    """Append a message to an incident's local chat thread under the file lock."""
+    append_chat_log(incident_id, message)
 
 def save_feedback(entry: dict):
-    path = "logs/feedback.json"
-    if not os.path.exists(path):
-        with open(path, "w") as f:
-            json.dump([entry], f, indent=2)
-    else:
-        with open(path, "r+") as f:
-            data = json.load(f)
-            data.append(entry)
-            f.seek(0)
-            json.dump(data, f, indent=2)
+    _stores["feedback"].append(entry)
+    invalidate("feedback")
 
 def get_feedback_by_job(job_id: str) -> list:
-    path = "logs/feedback.json"
-    if not os.path.exists(path):
-        return []
-    with open(path) as f:
-        feedback = json.load(f)
-    return [f for f in feedback if f["job_id"] == job_id]
-
-FEEDBACK_LOG = "logs/feedback.json"
+    return _stores["feedback"].find("job_id", job_id)
 
+@cached(ttl=60, tags=("feedback",))
 def load_all_feedback() -> list:
     """Load all feedback entries from logs/feedback.json"""
-    if not os.path.exists(FEEDBACK_LOG):
-        return []
-    try:
-        with open(FEEDBACK_LOG, "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return []
+    return _stores["feedback"].all()
+
+def query_jobs(filters: dict = None, order_by: str = None, descending: bool = False,
+               limit: int = None, offset: int = 0) -> List[dict]:
+    """Filtered, sorted slice of the jobs log, evaluated by the storage engine."""
+    return _stores["jobs"].query(filters, order_by, descending, limit, offset)
+
+def query_incidents(filters: dict = None, order_by: str = None, descending: bool = False,
+                    limit: int = None, offset: int = 0) -> List[dict]:
+    """Filtered, sorted slice of the incidents log, evaluated by the storage engine."""
+    return _stores["incidents"].query(filters, order_by, descending, limit, offset)
 
 def get_incident(incident_id: str) -> dict:
     """Retrieve a single incident by ID."""
-    incidents = _load_json(INCIDENTS_LOG)
-    for inc in incidents:
-        if inc.get("incident_id") == incident_id:
-            return inc
-    raise ValueError(f"Incident with ID {incident_id} not found.")
+    incident = _stores["incidents"].get(incident_id)
+    if incident is None:
+        raise ValueError(f"Incident with ID {incident_id} not found.")
+    return incident
 
 def get_job_by_incident(incident_id: str) -> dict:
     """Retrieve the job linked to a given incident ID."""
-    jobs = _load_json(JOBS_LOG)
-    for job in jobs:
-        if job.get("incident_id") == incident_id:
-            return job
-    return {}  # Return empty dict if not found
+    jobs = _stores["jobs"].find("incident_id", incident_id)
+    return jobs[0] if jobs else {}  # Return empty dict if not found
+
+@cached(ttl=60, tags=("jobs",))
+def count_jobs(filters: dict = None) -> int:
+    """Number of jobs matching `filters`, without loading them."""
+    return _stores["jobs"].count(filters)
+
+@cached(ttl=60, tags=("incidents",))
+def count_incidents(filters: dict = None) -> int:
+    """Number of incidents matching `filters`, without loading them."""
+    return _stores["incidents"].count(filters)
+
+def get_incidents(incident_ids: List[str]) -> List[dict]:
+    """Incidents for the given IDs (primary-key lookups); unknown IDs are skipped."""
+    found = (_stores["incidents"].get(i) for i in dict.fromkeys(incident_ids) if i)
+    return [incident for incident in found if incident is not None]
+
+# ---------------------------
+# Listings: one page per call, filtered and sorted by the storage engine
+# ---------------------------
+def _listing_filters(fields: dict, since: str = None, until: str = None) -> dict:
+    filters = {field: value for field, value in fields.items() if value is not None}
+    if since is not None or until is not None:
+        filters["timestamp"] = Range(since, until)
+    return filters
+
+def job_filters(status: str = None, priority: str = None, contractor: str = None,
+                since: str = None, until: str = None) -> dict:
+    """Filters for list_jobs/count_jobs; `since`/`until` bound the ISO timestamp (until exclusive)."""
+    return _listing_filters({"status": status, "priority": priority, "assigned_contractor_id": contractor},
+                            since, until)
+
+def incident_filters(status: str = None, priority: str = None, tenant: str = None,
+                     since: str = None, until: str = None) -> dict:
+    """Filters for list_incidents/count_incidents; same date-range rules as job_filters."""
+    return _listing_filters({"status": status, "priority": priority, "tenant_id": tenant}, since, until)
+
+def _list_page(name: str, filters: dict, page_size: int, cursor: Optional[int],
+               sort_key: str, descending: bool) -> Tuple[List[dict], Optional[int]]:
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    offset = cursor or 0
+    # One extra row tells us whether there is a next page
+    rows = _stores[name].query(filters, sort_key, descending, page_size + 1, offset)
+    next_cursor = offset + page_size if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+@cached(ttl=60, tags=("jobs",))
+def list_jobs(filters: dict = None, page_size: int = 10, cursor: int = None,
+              sort_key: str = "timestamp", descending: bool = True) -> Tuple[List[dict], Optional[int]]:
+    """
+    One page of jobs. Returns (jobs, next_cursor); pass next_cursor back for
+    the following page, None means this was the last one. The cursor is the
+    position in the listing, so page n starts at cursor n * page_size.
+    """
+    return _list_page("jobs", filters, page_size, cursor, sort_key, descending)
+
+@cached(ttl=60, tags=("incidents",))
+def list_incidents(filters: dict = None, page_size: int = 10, cursor: int = None,
+                   sort_key: str = "timestamp", descending: bool = True) -> Tuple[List[dict], Optional[int]]:
+    """One page of incidents; same cursor rules as list_jobs."""
+    return _list_page("incidents", filters, page_size, cursor, sort_key, descending)
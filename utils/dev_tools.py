@@ -4,23 +4,21 @@ import json
 import logging
 import uuid
 from datetime import datetime
-from botocore.exceptions import ClientError
-import boto3
+from utils.aws_backend import ClientError, get_setting, get_s3_client
+from utils.presign_cache import presign_url
+from utils.s3_json_loader import get_s3_json_loader
+from utils.cache import cached, invalidate
 
 # Schema + utils
 from utils.schema import IncidentSchema, JobSchema
-from utils.db import _load_json
+from utils.db import _load_json, save_incident, save_job, get_record_store
 
 # Paths
 INCIDENTS_LOG = "logs/incidents.json"
 JOBS_LOG = "logs/jobs.json"
 
 # S3
-s3_client = boto3.client("s3",
-    aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-    aws_secret_access_key=st.secrets["AWS_SECRET_ACCESS_KEY"],
-    region_name=st.secrets["AWS_REGION"]
-)
+S3_BUCKET = get_setting("S3_BUCKET")
 
 def _ensure_log(path):
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -51,12 +49,9 @@ def seed_incidents(n=3):
             created_by=f"tenant_{i+1}@example.com"
         ))
 
-    with open(INCIDENTS_LOG, "r+") as f:
-        existing = json.load(f)
-        existing.extend(incidents)
-        f.seek(0)
-        json.dump(existing, f, indent=2)
-        f.truncate()
+    with get_record_store("incidents").batch():
+        for incident in incidents:
+            save_incident(incident)
 
     st.session_state["incidents"] = _load_json(INCIDENTS_LOG)
     st.success(f"Seeded {len(incidents)} incidents.")
@@ -85,12 +80,9 @@ def seed_jobs_from_incidents():
             created_by="landlord@example.com"
         ))
 
-    with open(JOBS_LOG, "r+") as f:
-        existing = json.load(f)
-        existing.extend(jobs)
-        f.seek(0)
-        json.dump(existing, f, indent=2)
-        f.truncate()
+    with get_record_store("jobs").batch():
+        for job in jobs:
+            save_job(job)
 
     st.session_state["jobs"] = _load_json(JOBS_LOG)
     st.success(f"Seeded {len(jobs)} jobs from incidents.")
@@ -101,15 +93,14 @@ def seed_jobs_from_incidents():
 def upload_incident_to_s3(incident_id, data):
     try:
         file_key = f"incidents/{incident_id}.json"
-        s3_client.put_object(
-            Bucket=st.secrets["S3_BUCKET"],
+        get_s3_client().put_object(
+            Bucket=S3_BUCKET,
             Key=file_key,
             Body=json.dumps(data, indent=2),
             ContentType="application/json"
         )
-        presigned_url = s3_client.generate_presigned_url("get_object",
-            Params={"Bucket": st.secrets["S3_BUCKET"], "Key": file_key},
-            ExpiresIn=300)
+        invalidate("s3:incidents/")
+        presigned_url = presign_url(S3_BUCKET, file_key, expires_in=300)
         st.success(f"✅ Incident uploaded: [view]({presigned_url})", icon="🪣")
         return presigned_url
     except ClientError as e:
@@ -118,15 +109,14 @@ def upload_incident_to_s3(incident_id, data):
 def upload_job_to_s3(job_id, data):
     try:
         file_key = f"jobs/{job_id}.json"
-        s3_client.put_object(
-            Bucket=st.secrets["S3_BUCKET"],
+        get_s3_client().put_object(
+            Bucket=S3_BUCKET,
             Key=file_key,
             Body=json.dumps(data, indent=2),
             ContentType="application/json"
         )
-        presigned_url = s3_client.generate_presigned_url("get_object",
-            Params={"Bucket": st.secrets["S3_BUCKET"], "Key": file_key},
-            ExpiresIn=300)
+        invalidate("s3:jobs/")
+        presigned_url = presign_url(S3_BUCKET, file_key, expires_in=300)
         st.success(f"✅ Job uploaded: [view]({presigned_url})", icon="🛠️")
         return presigned_url
     except ClientError as e:
@@ -136,15 +126,57 @@ def upload_job_to_s3(job_id, data):
 def list_json_objects(prefix: str):
     """List all JSON file keys under a prefix like 'jobs/' or 'incidents/'."""
     try:
-        response = s3_client.list_objects_v2(Bucket=st.secrets["S3_BUCKET"], Prefix=prefix)
-        return [obj["Key"] for obj in response.get("Contents", []) if obj["Key"].endswith(".json")]
+        return [obj["Key"] for obj in get_s3_json_loader().list_objects(S3_BUCKET, prefix)]
     except ClientError as e:
         st.error(f"S3 List Error: {e.response['Error']['Message']}")
         return []
 
+@cached(ttl=60, tags=lambda prefix: (f"s3:{prefix}",))
+def load_json_objects(prefix: str):
+    """
+    Every JSON document under a prefix, in key order. Unchanged objects
+    (same ETag) come from memory; the rest are fetched in parallel.
+    """
+    try:
+        return list(get_s3_json_loader().load(S3_BUCKET, prefix).values())
+    except ClientError as e:
+        st.error(f"S3 Load Error: {e.response['Error']['Message']}")
+        return []
+
+def _s3_tags(prefix: str, *args, **kwargs):
+    return (f"s3:{prefix}",)
+
+@cached(ttl=60, tags=_s3_tags)
+def list_json_page(prefix: str, filters: dict = None, page_size: int = 10, cursor: int = None,
+                   sort_key: str = "timestamp", descending: bool = True):
+    """
+    One page of the JSON documents under a prefix, filtered and sorted like
+    utils.db.list_jobs and with the same (page, next_cursor) contract.
+    Only objects whose ETag changed since the last load are fetched.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    offset = cursor or 0
+    try:
+        rows = get_s3_json_loader().query(S3_BUCKET, prefix, filters, sort_key, descending, page_size + 1, offset)
+    except ClientError as e:
+        st.error(f"S3 Load Error: {e.response['Error']['Message']}")
+        return [], None
+    next_cursor = offset + page_size if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+@cached(ttl=60, tags=_s3_tags)
+def count_json_objects(prefix: str, filters: dict = None) -> int:
+    """Number of JSON documents under a prefix matching `filters`."""
+    try:
+        return len(get_s3_json_loader().query(S3_BUCKET, prefix, filters))
+    except ClientError as e:
+        st.error(f"S3 Load Error: {e.response['Error']['Message']}")
+        return 0
+
 def load_json_from_s3(key: str):
     try:
-        obj = s3_client.get_object(Bucket=st.secrets["S3_BUCKET"], Key=key)
+        obj = get_s3_client().get_object(Bucket=S3_BUCKET, Key=key)
         return json.loads(obj["Body"].read().decode("utf-8"))
     except ClientError as e:
         st.error(f"Failed to load {key}: {e.response['Error']['Message']}")
@@ -152,12 +184,13 @@ def load_json_from_s3(key: str):
 
 def delete_all_from_s3(prefix: str):
     try:
-        response = s3_client.list_objects_v2(Bucket=st.secrets["S3_BUCKET"], Prefix=prefix)
+        response = get_s3_client().list_objects_v2(Bucket=S3_BUCKET, Prefix=prefix)
         if "Contents" not in response:
             st.warning(f"No files under `{prefix}`")
             return
         for obj in response["Contents"]:
-            s3_client.delete_object(Bucket=st.secrets["S3_BUCKET"], Key=obj["Key"])
+            get_s3_client().delete_object(Bucket=S3_BUCKET, Key=obj["Key"])
+        invalidate(f"s3:{prefix}")
         st.success(f"🗑️ Deleted {len(response['Contents'])} `{prefix}` files from S3.")
     except ClientError as e:
         st.error(f"S3 Deletion Error: {e.response['Error']['Message']}")
@@ -182,10 +215,10 @@ def dev_seed_expander():
                 st.error(f"❌ Failed to generate test data: {e}")
 
         if st.button("🗑️ Delete All Dummy Incidents + Jobs"):
-            for file in [INCIDENTS_LOG, JOBS_LOG]:
-                if os.path.exists(file):
-                    os.remove(file)
-                    st.success(f"Deleted {file}")
+            for name, file in [("incidents", INCIDENTS_LOG), ("jobs", JOBS_LOG)]:
+                get_record_store(name).clear()
+                invalidate(name)
+                st.success(f"Deleted {file}")
             st.session_state["incidents"] = []
             st.session_state["jobs"] = []
 
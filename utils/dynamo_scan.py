@@ -0,0 +1,207 @@
+# utils/dynamo_scan.py
+"""
+Parallel segmented scans of a DynamoDB table.
+
+ParallelScan splits the table into `segments` (Segment/TotalSegments) and
+walks each one on its own worker thread, following LastEvaluatedKey until
+the segment is exhausted, so tables past the 1 MB page limit are read in
+full and in parallel. Results come back either as a generator of items /
+pages, or by running a callback on every page inside the worker
+(for_each_page), which is how bulk deletes and checkpointing jobs use it.
+
+Throttling (ProvisionedThroughputExceededException and friends) is retried
+with exponential backoff plus jitter, and the delay is shared by all
+segments: every throttle doubles the pause taken before the next page
+request and every successful page halves it again, so the scan settles just
+under the table's read capacity instead of hammering it. `stats` reports
+pages, items, throttles and throughput.
+
+The default segment count comes from DYNAMODB_SCAN_SEGMENTS (get_setting,
+default 4).
+"""
+import logging
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from utils.aws_backend import ClientError, get_setting, get_table
+
+THROTTLE_ERRORS = {"ProvisionedThroughputExceededException", "ThrottlingException",
+                   "RequestLimitExceeded"}
+
+ScanPage = namedtuple("ScanPage", ["segment", "items", "last_key"])
+"""One scan response: its segment, items, and LastEvaluatedKey (None at the end of the segment)."""
+
+_DONE = object()
+
+
+class AdaptiveBackoff:
+    """Pacing delay shared by all segments: doubled on throttle, halved on success."""
+
+    def __init__(self, base_delay: float = 0.05, max_delay: float = 5.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self) -> None:
+        with self._lock:
+            delay = self.delay
+        if delay:
+            self.sleep(delay)
+
+    def throttled(self, attempt: int) -> None:
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+            delay = self.delay * (2 ** attempt)
+        self.sleep(min(self.max_delay, random.uniform(delay / 2, delay)))
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.base_delay else 0.0
+
+
+class ParallelScan:
+    """Segmented scan of one table; see the module docstring."""
+
+    def __init__(self, table=None, segments: Optional[int] = None, page_size: Optional[int] = None,
+                 start_keys: Optional[Dict[int, dict]] = None, skip_segments: Iterable[int] = (),
+                 max_retries: int = 8, backoff: Optional[AdaptiveBackoff] = None, **scan_kwargs):
+        segments = int(segments or get_setting("DYNAMODB_SCAN_SEGMENTS", 4))
+        if segments < 1:
+            raise ValueError("segments must be at least 1")
+        self.table = table if table is not None else get_table()
+        self.segments = segments
+        self.page_size = page_size
+        self.start_keys = dict(start_keys or {})
+        self.skip_segments = set(skip_segments)
+        self.max_retries = max_retries
+        self.backoff = backoff or AdaptiveBackoff()
+        self.scan_kwargs = scan_kwargs
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {"segments": segments, "pages": 0, "items": 0, "scanned": 0, "throttled": 0,
+                      "seconds": 0.0, "items_per_second": 0.0}
+
+    def _scan_page(self, kwargs: dict) -> dict:
+        attempt = 0
+        while True:
+            self.backoff.pause()
+            try:
+                response = self.table.scan(**kwargs)
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in THROTTLE_ERRORS or attempt >= self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats["throttled"] += 1
+                self.backoff.throttled(attempt)
+                attempt += 1
+                continue
+            self.backoff.succeeded()
+            return response
+
+    def _run_segment(self, segment: int, handle_page: Callable[[ScanPage], None]) -> None:
+        kwargs = dict(self.scan_kwargs)
+        if self.segments > 1:
+            kwargs.update(Segment=segment, TotalSegments=self.segments)
+        if self.page_size:
+            kwargs["Limit"] = self.page_size
+        if self.start_keys.get(segment):
+            kwargs["ExclusiveStartKey"] = self.start_keys[segment]
+        while not self._stop.is_set():
+            response = self._scan_page(kwargs)
+            items = response.get("Items", [])
+            last_key = response.get("LastEvaluatedKey")
+            with self._lock:
+                self.stats["pages"] += 1
+                self.stats["items"] += len(items)
+                self.stats["scanned"] += response.get("ScannedCount", len(items))
+            handle_page(ScanPage(segment, items, last_key))
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def _run(self, handle_page: Callable[[ScanPage], None]) -> None:
+        self._stop.clear()
+        started = time.monotonic()
+        segments = [s for s in range(self.segments) if s not in self.skip_segments]
+        try:
+            if segments:
+                with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix="dynamo-scan") as pool:
+                    futures = [pool.submit(self._run_segment, s, handle_page) for s in segments]
+                    wait(futures, return_when=FIRST_EXCEPTION)
+                    # Stop the other segments at their next page if one failed
+                    if any(f.done() and f.exception() for f in futures):
+                        self._stop.set()
+                for future in futures:
+                    future.result()
+        finally:
+            seconds = time.monotonic() - started
+            with self._lock:
+                self.stats["seconds"] = round(seconds, 3)
+                self.stats["items_per_second"] = round(self.stats["items"] / seconds, 1) if seconds else 0.0
+            logging.info(f"Parallel scan of {getattr(self.table, 'name', 'table')}: {self.stats}")
+
+    def for_each_page(self, handle_page: Callable[[ScanPage], None]) -> dict:
+        """
+        Call `handle_page` on every page, on the segment's worker thread, and
+        return the stats. The first exception stops the remaining segments and
+        is re-raised.
+        """
+        self._run(handle_page)
+        return dict(self.stats)
+
+    def pages(self, max_buffered: Optional[int] = None) -> Iterator[ScanPage]:
+        """Generator of pages as they arrive from any segment (at most `max_buffered` held in memory)."""
+        pages = queue.Queue(maxsize=max_buffered or self.segments * 2)
+        errors = []
+
+        def put(item) -> None:
+            while not self._stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            try:
+                self._run(put)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                pages.put(_DONE)
+
+        producer = threading.Thread(target=produce, name="dynamo-scan-producer", daemon=True)
+        producer.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is _DONE:
+                    break
+                yield page
+        finally:
+            # Consumer stopped early (break / exception): let the workers wind down
+            self._stop.set()
+            while producer.is_alive():
+                try:
+                    pages.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        if errors:
+            raise errors[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        for page in self.pages():
+            yield from page.items
+
+
+def parallel_scan(table=None, segments: Optional[int] = None, **kwargs) -> Iterator[dict]:
+    """Every item of `table` (the chat table by default), scanned in `segments` parallel segments."""
+    return iter(ParallelScan(table, segments=segments, **kwargs))
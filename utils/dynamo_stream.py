@@ -0,0 +1,135 @@
+# utils/dynamo_stream.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class DynamoStreamConsumer:
+    """
+    Single reader for a DynamoDB stream, shared by every WebSocket client.
+
+    Tracks one iterator and the last sequence number per shard, picks up new
+    (child) shards as the stream splits, and drops records it has already
+    seen, so each change is delivered once no matter how many clients watch.
+    """
+
+    def __init__(self, streams_client, stream_arn: str, poll_interval: float = 1.0,
+                 shard_refresh_interval: float = 60.0, batch_limit: int = 1000, seen_capacity: int = 10000):
+        self.client = streams_client
+        self.stream_arn = stream_arn
+        self.poll_interval = poll_interval
+        self.shard_refresh_interval = shard_refresh_interval
+        self.batch_limit = batch_limit
+        self.seen_capacity = seen_capacity
+        self.iterators: Dict[str, Optional[str]] = {}
+        self.sequence_numbers: Dict[str, str] = {}
+        self.closed_shards = set()
+        self._seen_event_ids = OrderedDict()
+        self._last_refresh = None
+        self.stats = {"polls": 0, "records": 0, "duplicates": 0}
+
+    # ---------------------------
+    # Shards
+    # ---------------------------
+    def _list_shards(self) -> List[dict]:
+        shards, kwargs = [], {}
+        while True:
+            description = self.client.describe_stream(StreamArn=self.stream_arn, **kwargs)["StreamDescription"]
+            shards.extend(description.get("Shards", []))
+            last = description.get("LastEvaluatedShardId")
+            if not last:
+                return shards
+            kwargs["ExclusiveStartShardId"] = last
+
+    def _iterator_for(self, shard_id: str, from_start: bool) -> Optional[str]:
+        kwargs = {"StreamArn": self.stream_arn, "ShardId": shard_id}
+        if shard_id in self.sequence_numbers:
+            kwargs.update(ShardIteratorType="AFTER_SEQUENCE_NUMBER", SequenceNumber=self.sequence_numbers[shard_id])
+        else:
+            kwargs["ShardIteratorType"] = "TRIM_HORIZON" if from_start else "LATEST"
+        return self.client.get_shard_iterator(**kwargs).get("ShardIterator")
+
+    def refresh_shards(self) -> None:
+        first_refresh = self._last_refresh is None
+        for shard in self._list_shards():
+            shard_id = shard["ShardId"]
+            if shard_id in self.iterators or shard_id in self.closed_shards:
+                continue
+            # On start-up only open shards matter (LATEST); shards that appear
+            # later are children of a split and must be read from the beginning.
+            open_shard = "EndingSequenceNumber" not in shard.get("SequenceNumberRange", {})
+            if first_refresh and not open_shard:
+                self.closed_shards.add(shard_id)
+                continue
+            self.iterators[shard_id] = self._iterator_for(shard_id, from_start=not first_refresh)
+        self._last_refresh = time.monotonic()
+
+    # ---------------------------
+    # Records
+    # ---------------------------
+    def _is_new(self, shard_id: str, record: dict) -> bool:
+        sequence = record.get("dynamodb", {}).get("SequenceNumber")
+        last = self.sequence_numbers.get(shard_id)
+        if sequence is not None and last is not None and int(sequence) <= int(last):
+            return False
+        event_id = record.get("eventID")
+        if event_id is not None:
+            if event_id in self._seen_event_ids:
+                return False
+            self._seen_event_ids[event_id] = None
+            if len(self._seen_event_ids) > self.seen_capacity:
+                self._seen_event_ids.popitem(last=False)
+        return True
+
+    def poll_once(self) -> List[dict]:
+        """Read every shard once and return the records not delivered before."""
+        if self._last_refresh is None or time.monotonic() - self._last_refresh > self.shard_refresh_interval:
+            self.refresh_shards()
+        self.stats["polls"] += 1
+        records, shards_closed = [], False
+        for shard_id, iterator in list(self.iterators.items()):
+            if iterator is None:
+                continue
+            try:
+                response = self.client.get_records(ShardIterator=iterator, Limit=self.batch_limit)
+            except Exception as e:
+                if type(e).__name__ == "ExpiredIteratorException" or "ExpiredIterator" in str(e):
+                    self.iterators[shard_id] = self._iterator_for(shard_id, from_start=True)
+                    continue
+                raise
+            for record in response.get("Records", []):
+                if self._is_new(shard_id, record):
+                    records.append(record)
+                else:
+                    self.stats["duplicates"] += 1
+                sequence = record.get("dynamodb", {}).get("SequenceNumber")
+                if sequence is not None:
+                    self.sequence_numbers[shard_id] = sequence
+            next_iterator = response.get("NextShardIterator")
+            if next_iterator is None:
+                # Shard closed by a split: stop reading it and look for children
+                del self.iterators[shard_id]
+                self.closed_shards.add(shard_id)
+                shards_closed = True
+            else:
+                self.iterators[shard_id] = next_iterator
+        if shards_closed:
+            self.refresh_shards()
+        self.stats["records"] += len(records)
+        return records
+
+    async def run(self, dispatch: Callable[[List[dict]], Awaitable[None]]) -> None:
+        """Poll forever, handing each batch of new records to `dispatch`."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                records = await loop.run_in_executor(None, self.poll_once)
+                if records:
+                    await dispatch(records)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error in DynamoDB stream consumer: {e}")
+            await asyncio.sleep(self.poll_interval)
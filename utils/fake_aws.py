@@ -0,0 +1,518 @@
+# utils/fake_aws.py
+"""
+In-process stand-ins for the DynamoDB Table resource and the S3 client.
+
+They implement the subset of calls this app makes, with the same request and
+response shapes, so hot paths can be exercised and load-tested without AWS.
+Every call sleeps for `latency` seconds first and is counted in `stats`.
+"""
+import copy
+import hashlib
+import io
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:  # botocore not installed: same shape, local class
+    class ClientError(Exception):
+        def __init__(self, error_response, operation_name):
+            self.response = error_response
+            self.operation_name = operation_name
+            super().__init__(f"An error occurred ({error_response['Error'].get('Code')}) "
+                             f"when calling the {operation_name} operation: {error_response['Error'].get('Message')}")
+
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+# ---------------------------
+# Conditions
+# ---------------------------
+class _Condition:
+    def __init__(self, operator, *values):
+        self.operator = operator
+        self.values = values
+
+    def get_expression(self):
+        return {"operator": self.operator, "values": self.values}
+
+    def __and__(self, other):
+        return _Condition("AND", self, other)
+
+    def __or__(self, other):
+        return _Condition("OR", self, other)
+
+    def __invert__(self):
+        return _Condition("NOT", self)
+
+
+class Key:
+    """Minimal boto3.dynamodb.conditions.Key/Attr look-alike for use without boto3."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def eq(self, value):
+        return _Condition("=", self, value)
+
+    def ne(self, value):
+        return _Condition("<>", self, value)
+
+    def lt(self, value):
+        return _Condition("<", self, value)
+
+    def lte(self, value):
+        return _Condition("<=", self, value)
+
+    def gt(self, value):
+        return _Condition(">", self, value)
+
+    def gte(self, value):
+        return _Condition(">=", self, value)
+
+    def between(self, low, high):
+        return _Condition("BETWEEN", self, low, high)
+
+    def begins_with(self, value):
+        return _Condition("begins_with", self, value)
+
+    def exists(self):
+        return _Condition("attribute_exists", self)
+
+    def not_exists(self):
+        return _Condition("attribute_not_exists", self)
+
+    def contains(self, value):
+        return _Condition("contains", self, value)
+
+
+Attr = Key
+
+_COMPARE = {
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+}
+
+
+def _matches(condition, item: dict) -> bool:
+    # Works for both boto3 condition objects and the local ones above
+    expression = condition.get_expression()
+    operator, values = expression["operator"], expression["values"]
+    if operator == "AND":
+        return _matches(values[0], item) and _matches(values[1], item)
+    if operator == "OR":
+        return _matches(values[0], item) or _matches(values[1], item)
+    if operator == "NOT":
+        return not _matches(values[0], item)
+    actual = item.get(values[0].name)
+    if operator in _COMPARE:
+        return _COMPARE[operator](actual, values[1])
+    if operator == "BETWEEN":
+        return actual is not None and values[1] <= actual <= values[2]
+    if operator == "begins_with":
+        return isinstance(actual, str) and actual.startswith(values[1])
+    if operator == "attribute_exists":
+        return values[0].name in item
+    if operator == "attribute_not_exists":
+        return values[0].name not in item
+    if operator == "contains":
+        return actual is not None and values[1] in actual
+    raise ValueError(f"Unsupported condition operator: {operator}")
+
+
+_KEY_CLAUSE = re.compile(
+    r"^\s*(?:begins_with\(\s*(?P<bw_name>[#\w]+)\s*,\s*(?P<bw_value>:\w+)\s*\)"
+    r"|(?P<name>[#\w]+)\s*(?:(?P<op><>|<=|>=|=|<|>)\s*(?P<value>:\w+)"
+    r"|BETWEEN\s+(?P<low>:\w+)\s+AND\s+(?P<high>:\w+)))\s*$",
+    re.IGNORECASE
+)
+
+
+def _parse_key_condition(expression: str, names: dict, values: dict):
+    """Turn a string KeyConditionExpression into the condition objects above."""
+    # Protect BETWEEN's own "AND" before splitting the clauses apart
+    protected = re.sub(r"(BETWEEN\s+:\w+\s+)AND(\s+:\w+)", r"\1&&\2", expression, flags=re.IGNORECASE)
+    merged = [c.replace("&&", "AND") for c in re.split(r"\s+AND\s+", protected, flags=re.IGNORECASE)]
+    condition = None
+    for clause in merged:
+        match = _KEY_CLAUSE.match(clause)
+        if not match:
+            raise _client_error("ValidationException", f"Unsupported key condition: {clause}", "Query")
+        if match.group("bw_name"):
+            part = Key(names.get(match.group("bw_name"), match.group("bw_name"))).begins_with(values[match.group("bw_value")])
+        elif match.group("op"):
+            part = _Condition(match.group("op"), Key(names.get(match.group("name"), match.group("name"))),
+                              values[match.group("value")])
+        else:
+            part = Key(names.get(match.group("name"), match.group("name"))).between(values[match.group("low")],
+                                                                                     values[match.group("high")])
+        condition = part if condition is None else condition & part
+    return condition
+
+
+# ---------------------------
+# Update expressions
+# ---------------------------
+def _split_top_level(text: str):
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def _operand(text: str, item: dict, names: dict, values: dict):
+    text = text.strip()
+    call = re.match(r"^(list_append|if_not_exists)\s*\((.*)\)$", text, re.DOTALL)
+    if call:
+        args = _split_top_level(call.group(2))
+        if call.group(1) == "list_append":
+            return list(_operand(args[0], item, names, values)) + list(_operand(args[1], item, names, values))
+        name = names.get(args[0], args[0])
+        return item[name] if name in item else _operand(args[1], item, names, values)
+    if text.startswith(":"):
+        return copy.deepcopy(values[text])
+    return item.get(names.get(text, text))
+
+
+def _apply_update(item: dict, expression: str, names: dict, values: dict) -> None:
+    for section in re.split(r"\b(?=SET\b|REMOVE\b)", expression.strip()):
+        section = section.strip()
+        if not section:
+            continue
+        action, _, body = section.partition(" ")
+        if action.upper() == "SET":
+            for assignment in _split_top_level(body):
+                target, _, value = assignment.partition("=")
+                item[names.get(target.strip(), target.strip())] = _operand(value, item, names, values)
+        elif action.upper() == "REMOVE":
+            for target in _split_top_level(body):
+                item.pop(names.get(target, target), None)
+        else:
+            raise _client_error("ValidationException", f"Unsupported update action: {action}", "UpdateItem")
+
+
+# ---------------------------
+# DynamoDB
+# ---------------------------
+class FakeTable:
+    """A DynamoDB table held in a dict, keyed by its primary key attributes."""
+
+    def __init__(self, name: str, key_names: Tuple[str, ...], indexes: Optional[Dict[str, tuple]] = None,
+                 latency: float = 0.0, page_size: int = 100):
+        self.name = self.table_name = name
+        self.key_names = tuple(key_names)
+        self.indexes = dict(indexes or {})
+        self.latency = latency
+        self.page_size = page_size
+        self.stats = Counter()
+        self._items: Dict[tuple, dict] = {}
+        self._lock = threading.RLock()
+
+    def _call(self, operation: str) -> None:
+        self.stats[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _key_of(self, key: dict, operation: str) -> tuple:
+        if set(key) != set(self.key_names):
+            raise _client_error("ValidationException",
+                                "The provided key element does not match the schema", operation)
+        return tuple(key[k] for k in self.key_names)
+
+    def _base_key(self, item: dict) -> dict:
+        return {k: item[k] for k in self.key_names}
+
+    @staticmethod
+    def _project(item: dict, projection: Optional[str], names: dict) -> dict:
+        if not projection:
+            return copy.deepcopy(item)
+        fields = [names.get(f.strip(), f.strip()) for f in projection.split(",")]
+        return {f: copy.deepcopy(item[f]) for f in fields if f in item}
+
+    def put_item(self, Item: dict, **kwargs) -> dict:
+        self._call("put_item")
+        with self._lock:
+            missing = [k for k in self.key_names if k not in Item]
+            if missing:
+                raise _client_error("ValidationException", f"Missing the key {missing[0]} in the item", "PutItem")
+            self._items[tuple(Item[k] for k in self.key_names)] = copy.deepcopy(Item)
+        return {}
+
+    def get_item(self, Key: dict, ProjectionExpression: str = None, ExpressionAttributeNames: dict = None,
+                 **kwargs) -> dict:
+        self._call("get_item")
+        with self._lock:
+            item = self._items.get(self._key_of(Key, "GetItem"))
+            if item is None:
+                return {}
+            return {"Item": self._project(item, ProjectionExpression, ExpressionAttributeNames or {})}
+
+    def update_item(self, Key: dict, UpdateExpression: str, ExpressionAttributeValues: dict = None,
+                    ExpressionAttributeNames: dict = None, ReturnValues: str = "NONE", **kwargs) -> dict:
+        self._call("update_item")
+        with self._lock:
+            key = self._key_of(Key, "UpdateItem")
+            item = copy.deepcopy(self._items.get(key, dict(Key)))
+            _apply_update(item, UpdateExpression, ExpressionAttributeNames or {}, ExpressionAttributeValues or {})
+            self._items[key] = item
+            return {"Attributes": copy.deepcopy(item)} if ReturnValues == "ALL_NEW" else {}
+
+    def delete_item(self, Key: dict, **kwargs) -> dict:
+        self._call("delete_item")
+        with self._lock:
+            self._items.pop(self._key_of(Key, "DeleteItem"), None)
+        return {}
+
+    def _page(self, items, limit, start_key, projection, names, key_fields, filter_condition=None):
+        # Resume after the item whose key matches ExclusiveStartKey
+        if start_key:
+            base = {k: start_key[k] for k in self.key_names}
+            for i, item in enumerate(items):
+                if self._base_key(item) == base:
+                    items = items[i + 1:]
+                    break
+        size = min(limit or self.page_size, self.page_size)
+        page, last_key, scanned = items[:size], None, 0
+        if len(items) > size:
+            last = page[-1]
+            last_key = {k: last[k] for k in key_fields if k in last}
+        matched = [item for item in page if filter_condition is None or _matches(filter_condition, item)]
+        response = {
+            "Items": [self._project(item, projection, names) for item in matched],
+            "Count": len(matched),
+            "ScannedCount": len(page),
+        }
+        if last_key:
+            response["LastEvaluatedKey"] = last_key
+        return response
+
+    def scan(self, ProjectionExpression: str = None, ExpressionAttributeNames: dict = None,
+             ExclusiveStartKey: dict = None, Limit: int = None, Segment: int = None, TotalSegments: int = None,
+             FilterExpression=None, **kwargs) -> dict:
+        self._call("scan")
+        with self._lock:
+            items = list(self._items.items())
+        if TotalSegments:
+            items = [(k, v) for k, v in items if zlib.crc32(repr(k).encode()) % TotalSegments == Segment]
+        return self._page([v for _, v in items], Limit, ExclusiveStartKey, ProjectionExpression,
+                          ExpressionAttributeNames or {}, self.key_names, FilterExpression)
+
+    def query(self, KeyConditionExpression, IndexName: str = None, ScanIndexForward: bool = True,
+              ExpressionAttributeValues: dict = None, ExpressionAttributeNames: dict = None,
+              ProjectionExpression: str = None, ExclusiveStartKey: dict = None, Limit: int = None,
+              FilterExpression=None, **kwargs) -> dict:
+        self._call("query")
+        names = ExpressionAttributeNames or {}
+        if isinstance(KeyConditionExpression, str):
+            KeyConditionExpression = _parse_key_condition(KeyConditionExpression, names,
+                                                          ExpressionAttributeValues or {})
+        if IndexName is not None and IndexName not in self.indexes:
+            raise _client_error("ValidationException",
+                                f"The table does not have the specified index: {IndexName}", "Query")
+        index_keys = self.indexes[IndexName] if IndexName else self.key_names
+        with self._lock:
+            items = [v for v in self._items.values()
+                     if all(k in v for k in index_keys) and _matches(KeyConditionExpression, v)]
+        if len(index_keys) > 1:
+            items.sort(key=lambda v: v[index_keys[1]], reverse=not ScanIndexForward)
+        key_fields = tuple(dict.fromkeys(self.key_names + tuple(index_keys)))
+        return self._page(items, Limit, ExclusiveStartKey, ProjectionExpression, names, key_fields,
+                          FilterExpression)
+
+    @contextmanager
+    def batch_writer(self, overwrite_by_pkeys=None):
+        yield _FakeBatchWriter(self)
+
+    def item_count(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+class _FakeBatchWriter:
+    def __init__(self, table: FakeTable):
+        self.table = table
+
+    def put_item(self, Item: dict) -> None:
+        self.table.put_item(Item=Item)
+
+    def delete_item(self, Key: dict) -> None:
+        self.table.delete_item(Key=Key)
+
+
+class FakeDynamoDB:
+    """Stands in for boto3.resource("dynamodb"); tables are created on first use."""
+
+    def __init__(self, schemas: Optional[Dict[str, dict]] = None, latency: float = 0.0, page_size: int = 100):
+        self.schemas = dict(schemas or {})
+        self.latency = latency
+        self.page_size = page_size
+        self._tables: Dict[str, FakeTable] = {}
+        self._lock = threading.Lock()
+
+    def create_table(self, name: str, key_names: Tuple[str, ...], indexes: Optional[Dict[str, tuple]] = None):
+        with self._lock:
+            self.schemas[name] = {"keys": tuple(key_names), "indexes": dict(indexes or {})}
+            self._tables[name] = FakeTable(name, key_names, indexes, self.latency, self.page_size)
+            return self._tables[name]
+
+    def Table(self, name: str) -> FakeTable:
+        with self._lock:
+            if name not in self._tables:
+                schema = self.schemas.get(name, {"keys": ("id",)})
+                self._tables[name] = FakeTable(name, schema["keys"], schema.get("indexes"),
+                                               self.latency, self.page_size)
+            return self._tables[name]
+
+
+# ---------------------------
+# S3
+# ---------------------------
+class _StreamingBody:
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def read(self, amt: int = None) -> bytes:
+        return self._stream.read() if amt is None else self._stream.read(amt)
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class FakeS3Client:
+    """Stands in for boto3.client("s3") with objects held in memory per bucket."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.stats = Counter()
+        self._buckets: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def _call(self, operation: str) -> None:
+        self.stats[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _bucket(self, name: str) -> Dict[str, dict]:
+        return self._buckets.setdefault(name, {})
+
+    def put_object(self, Bucket: str, Key: str, Body=b"", ContentType: str = "binary/octet-stream",
+                   **kwargs) -> dict:
+        self._call("put_object")
+        data = Body.encode("utf-8") if isinstance(Body, str) else (Body.read() if hasattr(Body, "read") else Body)
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        with self._lock:
+            self._bucket(Bucket)[Key] = {
+                "Body": bytes(data), "ContentType": ContentType, "ETag": etag,
+                "LastModified": datetime.now(timezone.utc), "Metadata": kwargs.get("Metadata", {}),
+                "ContentEncoding": kwargs.get("ContentEncoding"),
+            }
+        return {"ETag": etag}
+
+    def upload_fileobj(self, Fileobj, Bucket: str, Key: str, ExtraArgs: dict = None, **kwargs) -> None:
+        self.put_object(Bucket=Bucket, Key=Key, Body=Fileobj.read(), **(ExtraArgs or {}))
+
+    def _get(self, Bucket: str, Key: str, operation: str) -> dict:
+        with self._lock:
+            obj = self._bucket(Bucket).get(Key)
+        if obj is None:
+            raise _client_error("NoSuchKey", "The specified key does not exist.", operation)
+        return obj
+
+    def _headers(self, obj: dict) -> dict:
+        headers = {"ContentType": obj["ContentType"], "ContentLength": len(obj["Body"]),
+                   "ETag": obj["ETag"], "LastModified": obj["LastModified"], "Metadata": obj["Metadata"]}
+        if obj["ContentEncoding"]:
+            headers["ContentEncoding"] = obj["ContentEncoding"]
+        return headers
+
+    def get_object(self, Bucket: str, Key: str, IfNoneMatch: str = None, **kwargs) -> dict:
+        self._call("get_object")
+        obj = self._get(Bucket, Key, "GetObject")
+        if IfNoneMatch and IfNoneMatch == obj["ETag"]:
+            raise _client_error("304", "Not Modified", "GetObject")
+        return {"Body": _StreamingBody(obj["Body"]), **self._headers(obj)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        self._call("head_object")
+        return self._headers(self._get(Bucket, Key, "HeadObject"))
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        self._call("delete_object")
+        with self._lock:
+            self._bucket(Bucket).pop(Key, None)
+        return {}
+
+    def delete_objects(self, Bucket: str, Delete: dict, **kwargs) -> dict:
+        self._call("delete_objects")
+        with self._lock:
+            for entry in Delete.get("Objects", []):
+                self._bucket(Bucket).pop(entry["Key"], None)
+        return {"Deleted": [{"Key": e["Key"]} for e in Delete.get("Objects", [])]}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", MaxKeys: int = 1000,
+                        ContinuationToken: str = None, StartAfter: str = None, **kwargs) -> dict:
+        self._call("list_objects_v2")
+        with self._lock:
+            objects = self._bucket(Bucket)
+            keys = sorted(k for k in objects if k.startswith(Prefix))
+            after = ContinuationToken or StartAfter
+            if after:
+                keys = [k for k in keys if k > after]
+            page = keys[:MaxKeys]
+            contents = [{"Key": k, "Size": len(objects[k]["Body"]), "ETag": objects[k]["ETag"],
+                         "LastModified": objects[k]["LastModified"]} for k in page]
+        response = {"Name": Bucket, "Prefix": Prefix, "KeyCount": len(contents), "MaxKeys": MaxKeys,
+                    "IsTruncated": len(keys) > MaxKeys}
+        if contents:
+            response["Contents"] = contents
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    def get_paginator(self, operation_name: str):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(f"Fake S3 has no paginator for {operation_name}")
+        return _FakeListPaginator(self)
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict = None, ExpiresIn: int = 3600,
+                               HttpMethod: str = None) -> str:
+        self._call("generate_presigned_url")
+        params = Params or {}
+        signed_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        return (f"https://{params.get('Bucket')}.s3.fake.local/{params.get('Key')}"
+                f"?X-Amz-Date={signed_at}&X-Amz-Expires={ExpiresIn}&X-Amz-Method={ClientMethod}")
+
+
+class _FakeListPaginator:
+    def __init__(self, client: FakeS3Client):
+        self.client = client
+
+    def paginate(self, Bucket: str, Prefix: str = "", PaginationConfig: dict = None, **kwargs):
+        page_size = (PaginationConfig or {}).get("PageSize", 1000)
+        token = None
+        while True:
+            kwargs_page = {"ContinuationToken": token} if token else {}
+            page = self.client.list_objects_v2(Bucket=Bucket, Prefix=Prefix, MaxKeys=page_size, **kwargs_page)
+            yield page
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
@@ -0,0 +1,120 @@
+# utils/file_lock.py
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+class _PathLock:
+    def __init__(self, lock_path: str):
+        self.lock_path = lock_path
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_path_locks: Dict[str, _PathLock] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_path_lock(path: str) -> _PathLock:
+    lock_path = os.path.abspath(path) + ".lock"
+    with _registry_lock:
+        if lock_path not in _path_locks:
+            _path_locks[lock_path] = _PathLock(lock_path)
+        return _path_locks[lock_path]
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive advisory lock on `path`, held via a sidecar `<path>.lock` file.
+
+    Re-entrant within a thread; other threads in this process wait on an
+    RLock and other processes (Streamlit sessions, scripts) wait on flock.
+    """
+    lock = _get_path_lock(path)
+    with lock.rlock:
+        if lock.depth == 0:
+            os.makedirs(os.path.dirname(lock.lock_path), exist_ok=True)
+            lock.fd = os.open(lock.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl:
+                fcntl.flock(lock.fd, fcntl.LOCK_EX)
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0:
+                if fcntl:
+                    fcntl.flock(lock.fd, fcntl.LOCK_UN)
+                os.close(lock.fd)
+                lock.fd = None
+
+
+def atomic_write_json(path: str, data, indent: int = 2) -> None:
+    """Write JSON to a temp file in the same directory, fsync, then rename over `path`."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(directory)
+
+
+def _fsync_dir(directory: str) -> None:
+    # Persist the rename itself; not supported on every platform.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_json(path: str, default=None):
+    """Read a JSON document, ignoring trailing garbage left by old non-truncating writers."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "r") as f:
+        raw = f.read()
+    if not raw.strip():
+        return default
+    try:
+        data, _ = json.JSONDecoder().raw_decode(raw.lstrip())
+        return data
+    except json.JSONDecodeError:
+        return default
+
+
+def update_json(path: str, mutate: Callable, default=None, indent: int = 2):
+    """
+    Locked read-modify-write of a JSON file.
+
+    `mutate` receives the current document (or `default`) and returns the new
+    one; the result is written atomically and returned.
+    """
+    with file_lock(path):
+        data = read_json(path, default)
+        data = mutate(data)
+        atomic_write_json(path, data, indent=indent)
+        return data
@@ -51,10 +51,17 @@ def call_gpt_vision(image_bytes):
     )
     return response.choices[0].message.content
 
-def call_gpt_model(prompt: str) -> str:
-    """Calls the GPT model with the given prompt and returns the response."""
+def call_gpt_model(prompt: str, timeout: float = None) -> str:
+    """
+    Calls the GPT model with the given prompt and returns the response.
+    With `timeout` the request is abandoned by the client after that many
+    seconds (and not retried by it), so the calling thread is freed.
+    """
+    completions = openai.chat.completions
+    if timeout is not None:
+        completions = completions.with_options(timeout=timeout, max_retries=0)
     try:
-        response = openai.chat.completions.create(
+        response = completions.create(
             model="gpt-4o",
             messages=[{"role": "system", "content": prompt}]
         )
@@ -0,0 +1,76 @@
+# utils/import_profiler.py
+"""
+Import-time profiling for the Streamlit cold start.
+
+profile_imports() imports a module in a fresh interpreter with
+`python -X importtime` and parses the per-module timings it prints, so the
+numbers include everything the module drags in and nothing already cached
+in this process. summarize() ranks the results and check_budget() compares
+the total against IMPORT_BUDGET_MS (get_setting, default 1500 ms).
+scripts/profile_imports.py is the command-line front end.
+"""
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional
+
+from utils.aws_backend import get_setting
+
+ImportTiming = namedtuple("ImportTiming", ["module", "depth", "self_us", "cumulative_us"])
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Timings from `-X importtime` stderr, in the order printed (children before their parent)."""
+    timings = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # One space separates the column; nested imports add two more per level
+            timings.append(ImportTiming(module, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return timings
+
+
+def profile_imports(module: str, python: str = sys.executable, cwd: Optional[str] = None,
+                    env: Optional[Dict[str, str]] = None, timeout: float = 120) -> List[ImportTiming]:
+    """Import `module` in a fresh interpreter and return its import timings."""
+    cwd = cwd or os.getcwd()
+    run_env = dict(os.environ, **(env or {}))
+    run_env["PYTHONPATH"] = os.pathsep.join(filter(None, [cwd, run_env.get("PYTHONPATH")]))
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=cwd,
+                            env=run_env, capture_output=True, text=True, timeout=timeout)
+    timings = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"Importing {module} failed: {error}")
+    return timings
+
+
+def summarize(timings: Iterable[ImportTiming], top: int = 20) -> dict:
+    """
+    Total import time plus the `top` slowest modules by cumulative time and
+    the slowest top-level packages by summed self time (ms).
+    """
+    timings = list(timings)
+    packages: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + timing.self_us
+    return {
+        "total_ms": round(sum(t.self_us for t in timings) / 1000, 1),
+        "modules": len(timings),
+        "slowest_modules": [(t.module, round(t.cumulative_us / 1000, 1))
+                            for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]],
+        "slowest_packages": [(name, round(us / 1000, 1))
+                             for name, us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]],
+    }
+
+
+def check_budget(summary: dict, budget_ms: Optional[float] = None) -> bool:
+    """True if the import fits in `budget_ms` (IMPORT_BUDGET_MS by default)."""
+    budget_ms = float(budget_ms if budget_ms is not None else get_setting("IMPORT_BUDGET_MS", 1500))
+    return summary["total_ms"] <= budget_ms
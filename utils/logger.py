@@ -1,20 +1,21 @@
-import json
-import os
+import logging
 from datetime import datetime
+from utils.file_lock import update_json
+from utils.sqlite_store import SqliteRecordStore, sqlite_enabled
 
 LOG_PATH = "logs/agent_analytics.json"
 
+_events = SqliteRecordStore("agent_events", path=LOG_PATH) if sqlite_enabled() else None
+
 def log_agent_event(event: dict):
     event["timestamp"] = datetime.utcnow().isoformat()
     try:
-        if not os.path.exists(LOG_PATH):
-            with open(LOG_PATH, "w") as f:
-                json.dump([event], f, indent=2)
-        else:
-            with open(LOG_PATH, "r+") as f:
-                data = json.load(f)
-                data.append(event)
-                f.seek(0)
-                json.dump(data, f, indent=2)
+        if _events is not None:
+            _events.append(event)
+            return
+        update_json(LOG_PATH, lambda data: (data or []) + [event], default=[])
     except Exception as e:
-        print(f"[Logger] Failed to log agent event: {e}")
\ No newline at end of file
+        print(f"[Logger] Failed to log agent event: {e}")
+
+def log_info(message: str):
+    logging.info(message)
@@ -0,0 +1,74 @@
+# utils/message_fragments.py
+"""
+Chat message HTML for tri_chat_core, kept free of Streamlit so it can be tested.
+
+render_message_fragment() memoizes each message's HTML, keyed by (message id,
+content hash): an edited message re-renders and an unchanged one is never
+reformatted on rerun. visible_window() picks the slice of a chat log that
+the page shows.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+# Shared by every session thread, so lookups and evictions hold the lock.
+_fragment_cache = OrderedDict()
+_fragment_lock = threading.Lock()
+FRAGMENT_CACHE_SIZE = 5000
+CANVAS_KEYWORDS = ["summary", "inference", "incident", "description", "transcription"]
+
+# Messages shown at first; "Load earlier" reveals another page of this size.
+RENDER_WINDOW = 50
+
+
+def _content_hash(msg: dict) -> str:
+    content = f"{msg.get('role', '')}\x00{msg.get('message', '')}"
+    return hashlib.sha1(content.encode("utf-8", "replace")).hexdigest()
+
+
+def render_message_fragment(msg: dict) -> Tuple[str, bool]:
+    """HTML for one message and whether it used the canvas style, memoized."""
+    key = (msg.get("id"), _content_hash(msg))
+    with _fragment_lock:
+        cached = _fragment_cache.get(key)
+        if cached is not None:
+            _fragment_cache.move_to_end(key)
+            return cached
+
+    role = msg.get("role", "").capitalize()
+    content = msg.get("message", "")
+    word_count = len(content.split()) if isinstance(content, str) else 0
+    use_canvas = word_count > 100 or any(
+        kw in content.lower() for kw in CANVAS_KEYWORDS
+    ) if isinstance(content, str) else False
+
+    if use_canvas:
+        fragment = f"""
+            <div style='background-color:#2b2b2b; padding:12px; margin:12px 0; border-left:4px solid #00c9a7;
+                        border-radius:8px; color:#eee;'>
+                <strong>{role} - Summary:</strong><br>{content}
+            </div>
+        """
+    else:
+        fragment = f"""
+            <div style='background-color:#1e1e1e; padding:10px; margin:8px 0;
+                        border-radius:10px; color:#eee;'>
+                <strong>{role}:</strong><br>{content}
+            </div>
+        """
+
+    rendered = (fragment, use_canvas)
+    with _fragment_lock:
+        # Another thread may have rendered it meanwhile; keep the first copy
+        rendered = _fragment_cache.setdefault(key, rendered)
+        _fragment_cache.move_to_end(key)
+        while len(_fragment_cache) > FRAGMENT_CACHE_SIZE:
+            _fragment_cache.popitem(last=False)
+    return rendered
+
+
+def visible_window(chat_log: Sequence[dict], window: int = RENDER_WINDOW) -> Tuple[int, Sequence[dict]]:
+    """(hidden, messages): the last `window` messages and how many earlier ones are hidden."""
+    hidden = max(len(chat_log) - window, 0)
+    return hidden, chat_log[hidden:]
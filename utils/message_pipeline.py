@@ -0,0 +1,153 @@
+# utils/message_pipeline.py
+"""
+One commit path for chat messages.
+
+commit_message() writes the message once to the primary store (the chat
+table) and returns. The thread's derived artifacts -- the local JSON mirror
+and the S3 thread snapshot -- are rebuilt by a background worker from the
+latest chat log handed in; several commits to a thread before the worker
+gets to it collapse into a single mirror write. The S3 snapshot is handed
+to utils.thread_snapshots, which debounces the uploads further.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+from utils.aws_backend import ClientError, get_table
+from utils.cache import invalidate
+from utils.chat_log_writer import write_chat_log
+from utils.thread_snapshots import mark_thread_dirty
+
+REQUIRED_FIELDS = ["id", "timestamp", "role", "message", "thread_id", "email"]
+
+
+def validate_message(message: dict) -> None:
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in message]
+    if missing_fields:
+        raise ValueError(f"Message is missing required fields: {missing_fields}")
+
+
+def put_message(thread_id: str, message: dict) -> None:
+    """Primary write: one item in the chat table."""
+    validate_message(message)
+    get_table().put_item(Item=message)
+
+
+class MessagePipeline:
+    """
+    Synchronous primary write plus coalesced, asynchronous derived artifacts.
+
+    `write(thread_id, message)` is the primary store; each callable in
+    `artifacts` is called as `artifact(thread_id, messages)` from a single
+    background thread with the newest chat log queued for that thread. An
+    artifact that fails is logged and doesn't stop the others.
+    """
+
+    def __init__(self, write: Optional[Callable] = None, artifacts: Optional[Iterable[Callable]] = None):
+        self.write = write or put_message
+        self.artifacts = list(artifacts) if artifacts is not None else [write_chat_log, mark_thread_dirty]
+        self._pending: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._busy = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"committed": 0, "failed": 0, "scheduled": 0, "coalesced": 0,
+                      "artifact_runs": 0, "artifact_errors": 0}
+
+    def _start(self) -> None:
+        # Caller holds self._cond
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="message-pipeline", daemon=True)
+            self._thread.start()
+
+    def commit(self, thread_id: str, message: dict, chat_log: Optional[Iterable[dict]] = None) -> bool:
+        """
+        Write `message` to the primary store; on success queue the derived
+        artifacts for `chat_log` (the thread as the caller now has it).
+        Returns False if the primary write failed.
+        """
+        try:
+            self.write(thread_id, message)
+        except ValueError as ve:
+            logging.error(f"Schema validation error for thread_id {thread_id}: {ve}")
+            self._count("failed")
+            return False
+        except ClientError as e:
+            logging.error(f"DynamoDB Error committing message to thread_id {thread_id}: {e.response['Error']['Message']}")
+            self._count("failed")
+            return False
+        self._count("committed")
+        invalidate("threads")
+        if chat_log is not None:
+            self.schedule(thread_id, chat_log)
+        return True
+
+    def schedule(self, thread_id: str, chat_log: Iterable[dict]) -> None:
+        """Queue a rebuild of the thread's artifacts; replaces any rebuild not yet started."""
+        messages = list(chat_log)
+        with self._cond:
+            if thread_id in self._pending:
+                self.stats["coalesced"] += 1
+            self._pending[thread_id] = messages
+            self.stats["scheduled"] += 1
+            self._start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued rebuild has run (or `timeout` passes)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _count(self, name: str) -> None:
+        with self._cond:
+            self.stats[name] += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                thread_id, messages = self._pending.popitem(last=False)
+                self._busy += 1
+            try:
+                for artifact in self.artifacts:
+                    try:
+                        artifact(thread_id, messages)
+                        self._count("artifact_runs")
+                    except Exception as e:
+                        self._count("artifact_errors")
+                        logging.error(f"Derived artifact {getattr(artifact, '__name__', artifact)} failed for thread_id {thread_id}: {e}")
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._cond.notify_all()
+
+
+_pipeline: Optional[MessagePipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_message_pipeline() -> MessagePipeline:
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = MessagePipeline()
+        return _pipeline
+
+
+def set_message_pipeline(pipeline: Optional[MessagePipeline]) -> None:
+    global _pipeline
+    with _pipeline_lock:
+        _pipeline = pipeline
+
+
+def commit_message(thread_id: str, message: dict, chat_log: Optional[Iterable[dict]] = None) -> bool:
+    """Write a chat message once and refresh the thread's mirror/S3 snapshot in the background."""
+    return get_message_pipeline().commit(thread_id, message, chat_log)
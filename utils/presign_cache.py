@@ -0,0 +1,129 @@
+# utils/presign_cache.py
+"""
+Reuse of S3 presigned URLs.
+
+A presigned URL stays valid until it expires, so there is no need to sign
+the same object again on every rerun.
+
+Entries are keyed by (bucket, key, client method, expires_in). A caller
+asking for a longer lifetime therefore never gets a shorter-lived URL that
+was signed for someone else.
+
+An entry is served until `safety_margin` seconds before it expires, which
+leaves a link handed to the browser time to be used. For URLs that live
+less than twice the margin, the cutoff is half the lifetime instead.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from utils.aws_backend import get_s3_client
+
+
+class PresignCache:
+    """LRU of presigned URLs with expiry-aware reuse."""
+
+    def __init__(self, s3_client: Optional[Callable] = None, expires_in: int = 3600,
+                 safety_margin: int = 300, max_entries: int = 10000,
+                 clock: Callable[[], float] = time.time):
+        if safety_margin >= expires_in:
+            raise ValueError("safety_margin must be shorter than expires_in")
+        self._s3_client = s3_client or get_s3_client
+        self.expires_in = expires_in
+        self.safety_margin = safety_margin
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _lookup(self, cache_key: tuple, now: float) -> Optional[str]:
+        # Caller holds self._lock
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        url, reuse_until = entry
+        if now >= reuse_until:
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return url
+
+    def _store(self, cache_key: tuple, url: str, reuse_until: float) -> None:
+        # Caller holds self._lock
+        self._entries[cache_key] = (url, reuse_until)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _sign(self, bucket: str, key: str, method: str, expires_in: int) -> str:
+        return self._s3_client().generate_presigned_url(
+            method, Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires_in)
+
+    def get_url(self, bucket: str, key: str, method: str = "get_object",
+                expires_in: Optional[int] = None) -> str:
+        return self.get_urls(bucket, [key], method, expires_in)[key]
+
+    def get_urls(self, bucket: str, keys: Iterable[str], method: str = "get_object",
+                 expires_in: Optional[int] = None) -> Dict[str, str]:
+        """
+        Presigned URLs for many keys in one bucket: cached ones are reused
+        and only the missing or nearly expired ones are signed.
+        """
+        expires_in = expires_in or self.expires_in
+        now = self.clock()
+        urls, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                url = self._lookup((bucket, key, method, expires_in), now)
+                if url is None:
+                    missing.append(key)
+                else:
+                    urls[key] = url
+            self.stats["hits"] += len(urls)
+            self.stats["misses"] += len(missing)
+        # Signing is local HMAC work, done outside the lock
+        signed = {key: self._sign(bucket, key, method, expires_in) for key in missing}
+        reuse_until = now + expires_in - min(self.safety_margin, expires_in / 2)
+        with self._lock:
+            for key, url in signed.items():
+                self._store((bucket, key, method, expires_in), url, reuse_until)
+        urls.update(signed)
+        return urls
+
+    def invalidate(self, bucket: str, key: Optional[str] = None) -> None:
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == bucket and (key is None or k[1] == key)]:
+                del self._entries[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[PresignCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_presign_cache() -> PresignCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PresignCache()
+        return _cache
+
+
+def set_presign_cache(cache: Optional[PresignCache]) -> None:
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def presign_url(bucket: str, key: str, method: str = "get_object", expires_in: Optional[int] = None) -> str:
+    return get_presign_cache().get_url(bucket, key, method, expires_in)
+
+
+def presign_urls(bucket: str, keys: Iterable[str], method: str = "get_object",
+                 expires_in: Optional[int] = None) -> Dict[str, str]:
+    return get_presign_cache().get_urls(bucket, keys, method, expires_in)
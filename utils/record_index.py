@@ -0,0 +1,200 @@
+# utils/record_index.py
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from utils.record_store import Range, RecordStore, _filter_sort_slice
+
+
+class IndexedRecordStore(RecordStore):
+    """
+    Process-wide in-memory index over a file-backed RecordStore.
+
+    Keeps every record in memory with a primary index on the store key and
+    secondary indexes on `fields`, so lookups no longer parse the log. Writes
+    made through this wrapper update the indexes in place; writes from other
+    processes (or direct file edits) are picked up by comparing the
+    inode/mtime/size of the underlying files before each read.
+    """
+
+    def __init__(self, store: RecordStore, fields: List[str]):
+        self.store = store
+        self.key = store.key
+        self.fields = list(fields)
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        self._records: Dict[int, dict] = {}
+        self._primary: Dict[str, int] = {}
+        self._secondary: Dict[str, Dict[object, Dict[int, None]]] = {}
+        self._next_pos = 0
+
+    @property
+    def path(self):
+        return getattr(self.store, "path", None)
+
+    # ---------------------------
+    # Coherence
+    # ---------------------------
+    def _files(self):
+        return [p for p in (getattr(self.store, "path", None), getattr(self.store, "segment_path", None)) if p]
+
+    def _stat_files(self):
+        stats = []
+        for path in self._files():
+            try:
+                st = os.stat(path)
+                stats.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stats.append(None)
+        return tuple(stats)
+
+    def _ensure_fresh(self) -> None:
+        fingerprint = self._stat_files()
+        if fingerprint != self._fingerprint:
+            self._rebuild(fingerprint)
+
+    def _rebuild(self, fingerprint) -> None:
+        self._records = {}
+        self._primary = {}
+        self._secondary = {field: {} for field in self.fields}
+        self._next_pos = 0
+        for record in self.store.all():
+            self._insert(record)
+        self._fingerprint = fingerprint
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fingerprint = None
+
+    @contextmanager
+    def locked(self):
+        # Always take our lock before the store's file lock to keep one order.
+        with self._lock, self.store.locked():
+            yield
+
+    @contextmanager
+    def batch(self):
+        with self.locked():
+            self._ensure_fresh()
+            try:
+                with self.store.batch():
+                    yield
+            except Exception:
+                self._fingerprint = None
+                raise
+            self._fingerprint = self._stat_files()
+
+    # ---------------------------
+    # Index maintenance
+    # ---------------------------
+    def _insert(self, record: dict) -> None:
+        key_value = record.get(self.key) if self.key else None
+        if key_value is not None and key_value in self._primary:
+            pos = self._primary[key_value]
+            self._unlink_secondary(pos, self._records[pos])
+        else:
+            pos = self._next_pos
+            self._next_pos += 1
+            if key_value is not None:
+                self._primary[key_value] = pos
+        self._records[pos] = record
+        self._link_secondary(pos, record)
+
+    def _link_secondary(self, pos: int, record: dict) -> None:
+        for field in self.fields:
+            self._secondary[field].setdefault(record.get(field), {})[pos] = None
+
+    def _unlink_secondary(self, pos: int, record: dict) -> None:
+        for field in self.fields:
+            bucket = self._secondary[field].get(record.get(field))
+            if bucket is not None:
+                bucket.pop(pos, None)
+                if not bucket:
+                    del self._secondary[field][record.get(field)]
+
+    def _write_through(self, write, apply) -> None:
+        with self.locked():
+            before = self._stat_files()
+            write()
+            if before == self._fingerprint:
+                apply()
+                self._fingerprint = self._stat_files()
+            else:
+                # Someone else changed the files since our last read.
+                self._fingerprint = None
+
+    # ---------------------------
+    # RecordStore interface
+    # ---------------------------
+    def all(self) -> List[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return [dict(self._records[pos]) for pos in sorted(self._records)]
+
+    def get(self, key_value: str) -> Optional[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            pos = self._primary.get(key_value)
+            return dict(self._records[pos]) if pos is not None else None
+
+    def find(self, field: str, value) -> List[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            if field not in self._secondary:
+                return [dict(r) for pos, r in sorted(self._records.items()) if r.get(field) == value]
+            bucket = self._secondary[field].get(value, {})
+            return [dict(self._records[pos]) for pos in sorted(bucket)]
+
+    def _select(self, filters: Optional[Dict], order_by: Optional[str] = None, descending: bool = False,
+                limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        # Caller holds self._lock. Narrow candidates with the first exact-match
+        # indexed filter, check the rest; records are not copied here.
+        filters = dict(filters or {})
+        indexed = next((f for f, v in filters.items() if f in self._secondary and not isinstance(v, Range)), None)
+        if indexed is not None:
+            positions = sorted(self._secondary[indexed].get(filters.pop(indexed), {}))
+        else:
+            positions = sorted(self._records)
+        candidates = [self._records[pos] for pos in positions]
+        return _filter_sort_slice(candidates, filters, order_by, descending, limit, offset)
+
+    def query(self, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return [dict(r) for r in self._select(filters, order_by, descending, limit, offset)]
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._select(filters))
+
+    def append(self, record: dict) -> None:
+        record = dict(record)
+        self._write_through(lambda: self.store.append(record), lambda: self._insert(record))
+
+    def patch(self, key_value: str, updates: dict) -> None:
+        def apply():
+            pos = self._primary.get(key_value)
+            if pos is None:
+                return
+            self._unlink_secondary(pos, self._records[pos])
+            self._records[pos].update(updates)
+            self._link_secondary(pos, self._records[pos])
+
+        self._write_through(lambda: self.store.patch(key_value, updates), apply)
+
+    def replace_all(self, records: List[dict]) -> None:
+        with self._lock:
+            self.store.replace_all(records)
+            self._fingerprint = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self.store.clear()
+            self._fingerprint = None
+
+    def compact(self) -> None:
+        with self._lock:
+            self.store.compact()
+            self._fingerprint = None
@@ -0,0 +1,283 @@
+# utils/record_store.py
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from utils.file_lock import file_lock, atomic_write_json, read_json
+
+
+class RecordStore:
+    """Persistence backend behind the record functions in utils/db.py."""
+
+    key: Optional[str] = None
+
+    @contextmanager
+    def locked(self):
+        """Hold the store's write lock across a read-check-write sequence."""
+        yield
+
+    @contextmanager
+    def batch(self):
+        """Group several writes into a single commit."""
+        yield
+
+    def all(self) -> List[dict]:
+        raise NotImplementedError
+
+    def append(self, record: dict) -> None:
+        raise NotImplementedError
+
+    def patch(self, key_value: str, updates: dict) -> None:
+        raise NotImplementedError
+
+    def replace_all(self, records: List[dict]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get(self, key_value: str) -> Optional[dict]:
+        return next((r for r in self.all() if r.get(self.key) == key_value), None)
+
+    def find(self, field: str, value) -> List[dict]:
+        return [r for r in self.all() if r.get(field) == value]
+
+    def query(self, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        """Filter on field values (exact, or a Range), optionally sort, and return one slice."""
+        return _filter_sort_slice(self.all(), filters, order_by, descending, limit, offset)
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        return len(self.query(filters))
+
+
+class Range:
+    """
+    Filter value matching `lo <= field < hi`; either bound may be None.
+    Records without the field never match.
+    """
+
+    def __init__(self, lo=None, hi=None):
+        self.lo = lo
+        self.hi = hi
+
+    def matches(self, value) -> bool:
+        if value is None:
+            return False
+        try:
+            return (self.lo is None or value >= self.lo) and (self.hi is None or value < self.hi)
+        except TypeError:
+            return False
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Range) and (self.lo, self.hi) == (other.lo, other.hi)
+
+    def __repr__(self) -> str:
+        return f"Range({self.lo!r}, {self.hi!r})"
+
+
+def _matches(record: dict, filters: Dict) -> bool:
+    for field, value in filters.items():
+        if isinstance(value, Range):
+            if not value.matches(record.get(field)):
+                return False
+        elif record.get(field) != value:
+            return False
+    return True
+
+
+def _filter_sort_slice(records: List[dict], filters, order_by, descending, limit, offset) -> List[dict]:
+    if filters:
+        records = [r for r in records if _matches(r, filters)]
+    if order_by:
+        # Records missing the field sort last either way
+        present = [r for r in records if r.get(order_by) is not None]
+        missing = [r for r in records if r.get(order_by) is None]
+        records = sorted(present, key=lambda r: r[order_by], reverse=descending) + missing
+    end = None if limit is None else offset + limit
+    return records[offset:end]
+
+
+class JsonlRecordStore(RecordStore):
+    """
+    Record store made of the legacy JSON array (the snapshot) plus an
+    append-only JSONL segment next to it.
+
+    Writes only append one line to the segment:
+    - {"op": "put", "record": {...}}               insert, or replace by key
+    - {"op": "patch", "key": "...", "set": {...}}  field-level update
+
+    Once the segment holds `compact_after` entries it is folded back into the
+    snapshot on a background thread, so `logs/*.json` stays readable as a plain
+    array and existing files are adopted in place without a migration step.
+
+    All file access happens under `file_lock(path)`, so concurrent Streamlit
+    sessions and scripts serialize on the same advisory lock. Inside
+    `batch()` entries are buffered and committed with one write and one fsync.
+    """
+
+    def __init__(self, path: str, key: Optional[str] = None, compact_after: int = 500, fsync: bool = True):
+        self.path = path
+        self.key = key
+        self.segment_path = os.path.splitext(path)[0] + ".jsonl"
+        self.compact_after = compact_after
+        self.fsync = fsync
+        self._pending = None  # segment entry count, read lazily
+        self._compacting = False
+        self._batch_depth = 0
+        self._batch_lines: List[str] = []
+
+    def locked(self):
+        return file_lock(self.path)
+
+    @contextmanager
+    def batch(self):
+        with self.locked():
+            self._batch_depth += 1
+            try:
+                yield
+            except Exception:
+                if self._batch_depth == 1:
+                    self._batch_lines = []
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_lines:
+                lines, self._batch_lines = self._batch_lines, []
+                self._commit(lines)
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def all(self) -> List[dict]:
+        with self.locked():
+            return self._materialize()
+
+    def _read_snapshot(self) -> List[dict]:
+        # read_json tolerates trailing garbage left behind by the old
+        # `r+` + seek(0) writers that never truncated the file.
+        data = read_json(self.path, [])
+        return data if isinstance(data, list) else []
+
+    def _read_segment(self) -> List[dict]:
+        if not os.path.exists(self.segment_path):
+            return []
+        entries = []
+        with open(self.segment_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append; skip it.
+                    logging.warning(f"[RecordStore] Skipping torn entry in {self.segment_path}")
+        return entries
+
+    def _materialize(self) -> List[dict]:
+        records = self._read_snapshot()
+        entries = self._read_segment()
+        self._pending = len(entries)
+        return self._replay(records, entries)
+
+    def _replay(self, records: List[dict], entries: List[dict]) -> List[dict]:
+        positions: Dict[str, int] = {}
+        if self.key:
+            for i, record in enumerate(records):
+                if record.get(self.key) is not None:
+                    positions.setdefault(record[self.key], i)
+
+        for entry in entries:
+            op = entry.get("op")
+            if op == "put":
+                record = entry["record"]
+                key_value = record.get(self.key) if self.key else None
+                if key_value is not None and key_value in positions:
+                    records[positions[key_value]] = record
+                else:
+                    if key_value is not None:
+                        positions[key_value] = len(records)
+                    records.append(record)
+            elif op == "patch":
+                i = positions.get(entry.get("key"))
+                if i is not None:
+                    records[i].update(entry.get("set", {}))
+        return records
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def append(self, record: dict) -> None:
+        self._write_entry({"op": "put", "record": record})
+
+    def patch(self, key_value: str, updates: dict) -> None:
+        if not self.key:
+            raise ValueError(f"Store {self.path} has no key field to patch by.")
+        self._write_entry({"op": "patch", "key": key_value, "set": updates})
+
+    def replace_all(self, records: List[dict]) -> None:
+        with self.locked():
+            self._write_snapshot(records)
+            self._truncate_segment()
+
+    def clear(self) -> None:
+        with self.locked():
+            for path in (self.path, self.segment_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._pending = 0
+
+    def _write_entry(self, entry: dict) -> None:
+        line = json.dumps(entry, default=str) + "\n"
+        with self.locked():
+            if self._batch_depth:
+                self._batch_lines.append(line)
+            else:
+                self._commit([line])
+
+    def _commit(self, lines: List[str]) -> None:
+        with self.locked():
+            os.makedirs(os.path.dirname(self.segment_path) or ".", exist_ok=True)
+            with open(self.segment_path, "a") as f:
+                f.write("".join(lines))
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if self._pending is None:
+                self._pending = len(self._read_segment())
+            else:
+                self._pending += len(lines)
+            should_compact = self._pending >= self.compact_after and not self._compacting
+            if should_compact:
+                self._compacting = True
+        if should_compact:
+            threading.Thread(target=self._background_compact, daemon=True).start()
+
+    # ---------------------------
+    # Compaction
+    # ---------------------------
+    def compact(self) -> None:
+        """Fold the segment into the snapshot and start a fresh segment."""
+        with self.locked():
+            records = self._materialize()
+            self._write_snapshot(records)
+            self._truncate_segment()
+
+    def _background_compact(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logging.error(f"[RecordStore] Compaction failed for {self.path}: {e}")
+        finally:
+            self._compacting = False
+
+    def _write_snapshot(self, records: List[dict]) -> None:
+        atomic_write_json(self.path, records)
+
+    def _truncate_segment(self) -> None:
+        if os.path.exists(self.segment_path):
+            open(self.segment_path, "w").close()
+        self._pending = 0
@@ -0,0 +1,114 @@
+# utils/s3_json_loader.py
+"""
+Bulk loading of JSON documents under an S3 prefix.
+
+The listing is paginated (no 1000-key ceiling) and already carries each
+object's ETag, so documents whose ETag hasn't changed since the last load
+are served from memory without a GET. The rest are fetched concurrently on
+a bounded thread pool. query() filters, sorts and slices the loaded
+documents with the same rules as RecordStore.query, so the dashboards can
+page over S3 listings the way they page over the record stores.
+"""
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.aws_backend import get_s3_client
+from utils.record_store import _filter_sort_slice
+
+
+class S3JsonLoader:
+    """ETag-keyed cache of parsed JSON objects plus a parallel fetcher."""
+
+    def __init__(self, s3_client: Optional[Callable] = None, max_workers: int = 16, page_size: int = 1000):
+        self._s3_client = s3_client or get_s3_client
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self._cache: Dict[Tuple[str, str], Tuple[str, object]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"listed": 0, "cached": 0, "fetched": 0, "errors": 0}
+
+    def list_objects(self, bucket: str, prefix: str, suffix: str = ".json") -> List[dict]:
+        """Every object under `prefix` ending in `suffix`, following continuation tokens."""
+        paginator = self._s3_client().get_paginator("list_objects_v2")
+        objects = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={"PageSize": self.page_size}):
+            objects.extend(obj for obj in page.get("Contents", []) if obj["Key"].endswith(suffix))
+        return objects
+
+    def _fetch(self, bucket: str, key: str) -> Tuple[str, object]:
+        obj = self._s3_client().get_object(Bucket=bucket, Key=key)
+        return obj.get("ETag"), json.loads(obj["Body"].read().decode("utf-8"))
+
+    def load(self, bucket: str, prefix: str, suffix: str = ".json") -> Dict[str, object]:
+        """
+        {key: parsed document} for every JSON object under `prefix`, in key
+        order. Objects that fail to load are logged and left out. Documents
+        are shared with the cache; treat them as read-only.
+        """
+        listed = self.list_objects(bucket, prefix, suffix)
+        results: Dict[str, object] = {}
+        stale = []
+        with self._lock:
+            for obj in listed:
+                cached = self._cache.get((bucket, obj["Key"]))
+                if cached is not None and cached[0] == obj.get("ETag"):
+                    results[obj["Key"]] = cached[1]
+                else:
+                    stale.append(obj["Key"])
+            # Forget objects that were deleted from the prefix
+            listed_keys = {obj["Key"] for obj in listed}
+            for cache_key in [k for k in self._cache if k[0] == bucket and k[1].startswith(prefix)
+                              and k[1].endswith(suffix) and k[1] not in listed_keys]:
+                del self._cache[cache_key]
+            self.stats["listed"] += len(listed)
+            self.stats["cached"] += len(results)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale)),
+                                    thread_name_prefix="s3-json-loader") as pool:
+                futures = {key: pool.submit(self._fetch, bucket, key) for key in stale}
+            for key, future in futures.items():
+                try:
+                    etag, data = future.result()
+                except Exception as e:
+                    logging.error(f"Failed to load s3://{bucket}/{key}: {e}")
+                    with self._lock:
+                        self.stats["errors"] += 1
+                    continue
+                results[key] = data
+                with self._lock:
+                    self._cache[(bucket, key)] = (etag, data)
+                    self.stats["fetched"] += 1
+
+        return {obj["Key"]: results[obj["Key"]] for obj in listed if obj["Key"] in results}
+
+    def query(self, bucket: str, prefix: str, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        """Documents under `prefix` matching `filters`, sorted and sliced like RecordStore.query."""
+        return _filter_sort_slice(list(self.load(bucket, prefix).values()), filters, order_by, descending,
+                                  limit, offset)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+_loader: Optional[S3JsonLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_s3_json_loader() -> S3JsonLoader:
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = S3JsonLoader()
+        return _loader
+
+
+def set_s3_json_loader(loader: Optional[S3JsonLoader]) -> None:
+    global _loader
+    with _loader_lock:
+        _loader = loader
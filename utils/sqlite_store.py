@@ -0,0 +1,233 @@
+# utils/sqlite_store.py
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from utils.record_store import Range, RecordStore, JsonlRecordStore
+
+# Storage engine selection: "jsonl" (default) or "sqlite"
+STORAGE_BACKEND = os.getenv("LANDTEN_STORAGE_BACKEND", "jsonl").lower()
+SQLITE_PATH = os.getenv("LANDTEN_SQLITE_PATH", "logs/landten.db")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def sqlite_enabled() -> bool:
+    return STORAGE_BACKEND == "sqlite"
+
+
+def _identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQLite identifier: {name}")
+    return name
+
+
+def _column_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+class SqliteRecordStore(RecordStore):
+    """
+    RecordStore backed by one SQLite table in WAL mode.
+
+    Each record is stored as a JSON document alongside copies of its key and
+    `indexed` fields in real, indexed columns, so filters, ordering and
+    LIMIT/OFFSET run in SQLite instead of over every record in Python. SQL is
+    built once per store and always bound with parameters, so sqlite3's
+    statement cache reuses the prepared statements.
+
+    `path` is the JSON log this table replaces; if the table is empty on
+    first use, that log's records are imported.
+    """
+
+    def __init__(self, table: str, key: Optional[str] = None, indexed: Optional[List[str]] = None,
+                 path: Optional[str] = None, db_path: str = None):
+        self.table = _identifier(table)
+        self.key = key
+        self.indexed = [_identifier(f) for f in (indexed or []) if f != key]
+        self.path = path
+        self.db_path = db_path or SQLITE_PATH
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+        columns = ["key"] + self.indexed
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in ["data"] + self.indexed)
+        self._sql_upsert = (
+            f"INSERT INTO {self.table} ({', '.join(columns)}, data) VALUES ({placeholders}) "
+            f"ON CONFLICT(key) DO UPDATE SET {updates}"
+        )
+        self._sql_update = (
+            f"UPDATE {self.table} SET data = ?"
+            + "".join(f", {c} = ?" for c in self.indexed)
+            + " WHERE key = ?"
+        )
+        self._sql_get = f"SELECT data FROM {self.table} WHERE key = ?"
+
+    # ---------------------------
+    # Connection / schema
+    # ---------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            columns = "".join(f", {c}" for c in self.indexed)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE{columns}, data TEXT NOT NULL)"
+            )
+            for column in self.indexed:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{column} ON {self.table} ({column})")
+            self._import_legacy(conn)
+            self._schema_ready = True
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        if conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone():
+            return
+        records = JsonlRecordStore(self.path, key=self.key).all()
+        with self._transaction(conn):
+            conn.executemany(self._sql_upsert, [self._row(r) for r in records])
+
+    @contextmanager
+    def _transaction(self, conn: sqlite3.Connection):
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield
+        except Exception:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.execute("COMMIT")
+
+    def locked(self):
+        return self._transaction(self._conn())
+
+    def batch(self):
+        return self._transaction(self._conn())
+
+    def _row(self, record: dict) -> tuple:
+        key_value = record.get(self.key) if self.key else None
+        values = [_column_value(record.get(c)) for c in self.indexed]
+        return (key_value, *values, json.dumps(record, default=str))
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def _column_expr(self, field: str, params: list) -> str:
+        if field == self.key:
+            return "key"
+        if field in self.indexed:
+            return field
+        params.append("$." + json.dumps(field))
+        return "json_extract(data, ?)"
+
+    def _where(self, filters: Optional[Dict]) -> tuple:
+        clauses, params = [], []
+        for field, value in (filters or {}).items():
+            if isinstance(value, Range):
+                # Each comparison gets its own expression (and json path param);
+                # NULL never compares true, so rows without the field drop out
+                if value.lo is None and value.hi is None:
+                    clauses.append(f"{self._column_expr(field, params)} IS NOT NULL")
+                for op, bound in ((">=", value.lo), ("<", value.hi)):
+                    if bound is not None:
+                        clauses.append(f"{self._column_expr(field, params)} {op} ?")
+                        params.append(_column_value(bound))
+                continue
+            expr = self._column_expr(field, params)
+            if value is None:
+                clauses.append(f"{expr} IS NULL")
+            else:
+                clauses.append(f"{expr} = ?")
+                params.append(_column_value(value))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def all(self) -> List[dict]:
+        return self.query()
+
+    def get(self, key_value: str) -> Optional[dict]:
+        row = self._conn().execute(self._sql_get, (key_value,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, field: str, value) -> List[dict]:
+        return self.query({field: value})
+
+    def query(self, filters: Optional[Dict] = None, order_by: Optional[str] = None,
+              descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+        where, params = self._where(filters)
+        sql = f"SELECT data FROM {self.table}{where}"
+        if order_by:
+            expr = self._column_expr(order_by, params)
+            if expr.startswith("json_extract"):
+                params.append(params[-1])
+            # Rows missing the field sort last either way
+            sql += f" ORDER BY {expr} IS NULL, {expr} {'DESC' if descending else 'ASC'}, seq"
+        else:
+            sql += " ORDER BY seq"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        return [json.loads(row[0]) for row in self._conn().execute(sql, params)]
+
+    def count(self, filters: Optional[Dict] = None) -> int:
+        where, params = self._where(filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}{where}", params).fetchone()[0]
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def append(self, record: dict) -> None:
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute(self._sql_upsert, self._row(record))
+
+    def patch(self, key_value: str, updates: dict) -> None:
+        if not self.key:
+            raise ValueError(f"Table {self.table} has no key field to patch by.")
+        conn = self._conn()
+        with self._transaction(conn):
+            row = conn.execute(self._sql_get, (key_value,)).fetchone()
+            if not row:
+                return
+            record = json.loads(row[0])
+            record.update(updates)
+            _, *values, data = self._row(record)
+            conn.execute(self._sql_update, (data, *values, key_value))
+
+    def replace_all(self, records: List[dict]) -> None:
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.executemany(self._sql_upsert, [self._row(r) for r in records])
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with self._transaction(conn):
+            conn.execute(f"DELETE FROM {self.table}")
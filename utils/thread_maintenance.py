@@ -0,0 +1,242 @@
+# utils/thread_maintenance.py
+"""
+Scheduled pruning of empty chat threads.
+
+A thread is empty when every item it holds is the default
+"New conversation started." message and the newest of them is older than
+`min_age` seconds (so a conversation someone just opened is left alone).
+
+The table is walked with a ParallelScan (utils/dynamo_scan.py) that only
+returns default-message items; each candidate
+thread is then confirmed with a query on the thread index before its items
+are deleted. Deletes go through a token bucket sized to the write capacity
+the job may use, and each segment's position is checkpointed after every
+page so an interrupted run resumes where it stopped.
+
+Run it from cron / a scheduled task (scripts/prune_empty_threads.py), never
+from the chat path. The dashboards' "Delete Empty Threads" button uses
+start_background_prune(), which runs one pass on a daemon thread with its
+own checkpoint (PRUNE_MANUAL_CHECKPOINT_PATH) so it neither blocks the
+Streamlit request nor resumes or overwrites the scheduled job's progress.
+PRUNE_SEGMENTS, PRUNE_PAGE_SIZE, PRUNE_DELETES_PER_SECOND,
+PRUNE_MIN_AGE_SECONDS and PRUNE_CHECKPOINT_PATH are read with get_setting().
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from utils.aws_backend import Attr, Key, get_setting, get_table
+from utils.cache import invalidate
+from utils.dynamo_scan import ParallelScan, ScanPage
+from utils.file_lock import atomic_write_json, file_lock
+
+DEFAULT_MESSAGE = "New conversation started."
+_ITEM_NAMES = {"#e": "email", "#i": "id", "#m": "message", "#ts": "timestamp"}
+
+
+class TokenBucket:
+    """Allows `rate` operations per second on average, with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or rate
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until `tokens` are available; returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+
+class PruneCheckpoint:
+    """Per-segment scan positions for the current run, persisted as JSON."""
+
+    def __init__(self, path: str, total_segments: int):
+        self.path = path
+        self.total_segments = total_segments
+        self._lock = threading.Lock()
+        self.segments: Dict[str, dict] = {}
+        self.resumed = False
+        if path and os.path.exists(path):
+            try:
+                with file_lock(path), open(path) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.error(f"Ignoring unreadable prune checkpoint {path}: {e}")
+                saved = {}
+            # A finished run, or one with a different segment count, starts over
+            if saved.get("total_segments") == total_segments and not saved.get("completed_at"):
+                self.segments = saved.get("segments", {})
+                self.resumed = bool(self.segments)
+
+    def position(self, segment: int) -> dict:
+        with self._lock:
+            return dict(self.segments.get(str(segment), {}))
+
+    def update(self, segment: int, last_key: Optional[dict]) -> None:
+        with self._lock:
+            self.segments[str(segment)] = {"last_key": last_key, "done": last_key is None}
+            self._save()
+
+    def complete(self, stats: dict) -> None:
+        with self._lock:
+            self._save(completed_at=datetime.utcnow().isoformat(), stats=stats)
+
+    def _save(self, **extra) -> None:
+        # Caller holds self._lock
+        if not self.path:
+            return
+        with file_lock(self.path):
+            atomic_write_json(self.path, {"total_segments": self.total_segments,
+                                          "segments": self.segments, **extra})
+
+
+class ThreadPruner:
+    """One pruning run over the chat table; see the module docstring."""
+
+    def __init__(self, table=None, segments: Optional[int] = None, page_size: Optional[int] = None,
+                 deletes_per_second: Optional[float] = None, min_age: Optional[float] = None,
+                 checkpoint_path: Optional[str] = None, thread_index: Optional[str] = None,
+                 limiter: Optional[TokenBucket] = None, now: Callable[[], datetime] = datetime.utcnow):
+        self.table = table if table is not None else get_table()
+        self.segments = int(segments or get_setting("PRUNE_SEGMENTS", 4))
+        self.page_size = int(page_size or get_setting("PRUNE_PAGE_SIZE", 500))
+        self.min_age = float(min_age if min_age is not None else get_setting("PRUNE_MIN_AGE_SECONDS", 3600))
+        self.checkpoint_path = (checkpoint_path if checkpoint_path is not None
+                                else get_setting("PRUNE_CHECKPOINT_PATH", "logs/prune_checkpoint.json"))
+        self.thread_index = thread_index or get_setting("DYNAMODB_THREAD_INDEX")
+        self.limiter = limiter or TokenBucket(
+            float(deletes_per_second or get_setting("PRUNE_DELETES_PER_SECOND", 10)))
+        self.now = now
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.stats = {"pages": 0, "scanned": 0, "candidates": 0, "threads_deleted": 0,
+                      "items_deleted": 0, "throttled_seconds": 0.0, "scan_throttled": 0, "errors": 0}
+
+    def _count(self, **deltas) -> None:
+        with self._lock:
+            for name, value in deltas.items():
+                self.stats[name] += value
+
+    def _thread_items(self, thread_id: str) -> Optional[List[dict]]:
+        """Keys of the thread's items, or None as soon as a real message turns up."""
+        items, kwargs = [], {}
+        while True:
+            response = self.table.query(
+                IndexName=self.thread_index, KeyConditionExpression=Key("thread_id").eq(thread_id),
+                ProjectionExpression="#e, #i, #m, #ts", ExpressionAttributeNames=_ITEM_NAMES,
+                **kwargs)
+            for item in response.get("Items", []):
+                if item.get("message") != DEFAULT_MESSAGE:
+                    return None
+                items.append(item)
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _prune_thread(self, thread_id: str, cutoff: str) -> int:
+        items = self._thread_items(thread_id)
+        if not items or max(str(item.get("timestamp", "")) for item in items) >= cutoff:
+            return 0
+        with self.table.batch_writer() as batch:
+            for item in items:
+                self._count(throttled_seconds=self.limiter.acquire())
+                batch.delete_item(Key={"email": item["email"], "id": item["id"]})
+        logging.info(f"Pruned empty thread {thread_id} ({len(items)} items)")
+        self._count(threads_deleted=1, items_deleted=len(items))
+        return len(items)
+
+    def _handle_page(self, page: ScanPage, checkpoint: PruneCheckpoint, cutoff: str) -> None:
+        for item in page.items:
+            thread_id = item.get("thread_id")
+            with self._lock:
+                if not thread_id or thread_id in self._seen:
+                    continue
+                self._seen.add(thread_id)
+                self.stats["candidates"] += 1
+            try:
+                self._prune_thread(thread_id, cutoff)
+            except Exception as e:
+                logging.error(f"Failed to prune thread {thread_id}: {e}")
+                self._count(errors=1)
+        # Only once the page is handled, so a resumed run never skips items
+        checkpoint.update(page.segment, page.last_key)
+
+    def run(self) -> dict:
+        """Prune every segment (resuming from the checkpoint) and return the run's stats."""
+        cutoff = (self.now() - timedelta(seconds=self.min_age)).isoformat()
+        checkpoint = PruneCheckpoint(self.checkpoint_path, self.segments)
+        if checkpoint.resumed:
+            logging.info(f"Resuming thread prune from {self.checkpoint_path}")
+        positions = {s: checkpoint.position(s) for s in range(self.segments)}
+        scan = ParallelScan(
+            self.table, segments=self.segments, page_size=self.page_size,
+            start_keys={s: p.get("last_key") for s, p in positions.items()},
+            skip_segments=[s for s, p in positions.items() if p.get("done")],
+            ProjectionExpression="#t", ExpressionAttributeNames={"#t": "thread_id"},
+            FilterExpression=Attr("message").eq(DEFAULT_MESSAGE) & Attr("timestamp").lt(cutoff))
+        try:
+            scan_stats = scan.for_each_page(lambda page: self._handle_page(page, checkpoint, cutoff))
+        finally:
+            if self.stats["items_deleted"]:
+                invalidate("threads")
+        self.stats.update(pages=scan_stats["pages"], scanned=scan_stats["scanned"],
+                          scan_throttled=scan_stats["throttled"], seconds=scan_stats["seconds"])
+        checkpoint.complete(self.stats)
+        return dict(self.stats)
+
+
+def prune_empty_threads(**kwargs) -> dict:
+    """Run one pruning pass with settings from get_setting(); keyword arguments override them."""
+    return ThreadPruner(**kwargs).run()
+
+
+_background: Optional[threading.Thread] = None
+_background_lock = threading.Lock()
+
+
+def _run_background_prune(kwargs: dict) -> None:
+    try:
+        stats = ThreadPruner(**kwargs).run()
+        logging.info(f"Background thread prune finished: {stats}")
+    except Exception as e:
+        logging.error(f"Background thread prune failed: {e}")
+
+
+def start_background_prune(**kwargs) -> Optional[threading.Thread]:
+    """
+    Start one pruning pass on a daemon thread, checkpointed to
+    PRUNE_MANUAL_CHECKPOINT_PATH unless `checkpoint_path` is given. Returns
+    None if a background pass is already running.
+    """
+    global _background
+    kwargs.setdefault("checkpoint_path",
+                      get_setting("PRUNE_MANUAL_CHECKPOINT_PATH", "logs/prune_checkpoint_manual.json"))
+    with _background_lock:
+        if _background is not None and _background.is_alive():
+            return None
+        _background = threading.Thread(target=_run_background_prune, args=(kwargs,),
+                                       name="thread-prune", daemon=True)
+        _background.start()
+        return _background
@@ -0,0 +1,112 @@
+# utils/thread_queries.py
+"""
+Thread reads against the chat table.
+
+Messages are one item each, keyed (email, id), with a thread_id/timestamp
+GSI (DYNAMODB_THREAD_INDEX). A thread's messages are a paginated Query on
+that index; a user's threads come from a Query on their `email` partition
+projected down to thread_id and timestamp; the landlord's list of every
+thread is a parallel scan with the same projection. Every function takes
+the table as an optional argument (the chat table by default).
+
+summon_engine wraps these with the Streamlit error reporting and caching.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from utils.aws_backend import Key, get_setting, get_table
+from utils.dynamo_scan import parallel_scan
+
+
+def projection_kwargs(fields: Optional[List[str]]) -> dict:
+    # Attribute names go through placeholders; "timestamp" is a reserved word
+    if not fields:
+        return {}
+    names = {f"#p{i}": field for i, field in enumerate(fields)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def query_thread_messages(thread_id: str, limit: Optional[int] = None, start_key: Optional[dict] = None,
+                          projection: Optional[List[str]] = None, newest_first: bool = False,
+                          table=None) -> Tuple[List[dict], Optional[dict]]:
+    """
+    One page of a thread's messages from the thread_id/timestamp GSI.
+
+    Returns (items, next_key); pass next_key back as start_key for the next
+    page, it is None once the thread is exhausted.
+    """
+    table = table if table is not None else get_table()
+    kwargs = {
+        "IndexName": get_setting("DYNAMODB_THREAD_INDEX"),
+        "KeyConditionExpression": Key("thread_id").eq(thread_id),
+        "ScanIndexForward": not newest_first,
+        **projection_kwargs(projection)
+    }
+    if limit:
+        kwargs["Limit"] = limit
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    response = table.query(**kwargs)
+    return response.get("Items", []), response.get("LastEvaluatedKey")
+
+
+def read_thread_messages(thread_id: str, projection: Optional[List[str]] = None, table=None) -> List[dict]:
+    """
+    All messages of one thread in timestamp order. A repeated id keeps its
+    first item; messages without an id are all kept.
+    """
+    messages, seen, start_key = [], set(), None
+    while True:
+        items, start_key = query_thread_messages(thread_id, start_key=start_key, projection=projection, table=table)
+        for item in items:
+            message_id = item.get("id")
+            if message_id is not None:
+                if message_id in seen:
+                    continue
+                seen.add(message_id)
+            messages.append(item)
+        if not start_key:
+            return messages
+
+
+def latest_by_thread(items: Iterable[dict]) -> List[dict]:
+    """{"thread_id", "timestamp"} per distinct thread, newest activity first."""
+    threads = {}
+    for item in items:
+        thread_id = item.get("thread_id")
+        if thread_id and item.get("timestamp", "") >= threads.get(thread_id, ""):
+            threads[thread_id] = item.get("timestamp", "")
+    ordered = sorted(threads.items(), key=lambda t: t[1], reverse=True)
+    return [{"thread_id": t, "timestamp": ts} for t, ts in ordered]
+
+
+def user_threads(email: str, table=None) -> List[dict]:
+    """Every thread the user has posted in, newest activity first."""
+    table = table if table is not None else get_table()
+    kwargs = {"KeyConditionExpression": Key("email").eq(email), **projection_kwargs(["thread_id", "timestamp"])}
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return latest_by_thread(items)
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def page_threads(threads: List[dict], limit: Optional[int] = None,
+                 cursor: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
+    """
+    (page, next_cursor) over a thread list: `limit` distinct threads starting
+    at position `cursor`; next_cursor is None on the last page. Without a
+    limit the rest of the list is one page.
+    """
+    offset = cursor or 0
+    if not limit:
+        return threads[offset:], None
+    end = offset + limit
+    return threads[offset:end], end if end < len(threads) else None
+
+
+def all_threads(table=None) -> List[dict]:
+    """Every thread with its latest timestamp, newest first (parallel scan, two attributes)."""
+    table = table if table is not None else get_table()
+    return latest_by_thread(parallel_scan(table, **projection_kwargs(["thread_id", "timestamp"])))
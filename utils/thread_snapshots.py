@@ -0,0 +1,183 @@
+# utils/thread_snapshots.py
+"""
+Debounced S3 snapshots of chat threads (threads/{thread_id}.json).
+
+Writers call mark_dirty() with the thread's current messages; a background
+flusher uploads each dirty thread at most once per `interval` seconds, and
+flush() forces everything out (session end / logout, process exit).
+Snapshots are compact JSON, gzip-encoded by default, and an upload is
+skipped when the content hash matches the last one stored for the thread.
+
+THREAD_SNAPSHOT_INTERVAL (seconds, default 30) and THREAD_SNAPSHOT_ENCODING
+("gzip" or "json") are read with get_setting().
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.aws_backend import get_setting, get_s3_client
+
+
+def snapshot_key(thread_id: str) -> str:
+    return f"threads/{thread_id}.json"
+
+
+def encode_snapshot(messages: List[dict], encoding: str = "gzip") -> tuple:
+    """(body, content hash, extra put_object args) for a thread snapshot."""
+    raw = json.dumps(messages, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    if encoding == "gzip":
+        # mtime=0 keeps the bytes deterministic for identical content
+        return gzip.compress(raw, mtime=0), digest, {"ContentEncoding": "gzip"}
+    return raw, digest, {}
+
+
+def decode_snapshot(body: bytes) -> List[dict]:
+    """Read a snapshot written in either encoding."""
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+class ThreadSnapshotService:
+    """Dirty-thread tracking plus a flusher thread that rate-limits S3 PUTs per thread."""
+
+    def __init__(self, s3_client: Optional[Callable] = None, bucket: Optional[str] = None,
+                 interval: Optional[float] = None, encoding: Optional[str] = None,
+                 clock: Callable[[], float] = time.monotonic, background: bool = True):
+        self._s3_client = s3_client or get_s3_client
+        self.bucket = bucket or get_setting("S3_BUCKET")
+        self.interval = float(interval if interval is not None else get_setting("THREAD_SNAPSHOT_INTERVAL", 30))
+        self.encoding = (encoding or get_setting("THREAD_SNAPSHOT_ENCODING", "gzip")).lower()
+        self.clock = clock
+        self.background = background
+        self._dirty: Dict[str, List[dict]] = {}
+        self._last_upload: Dict[str, float] = {}
+        self._hashes: Dict[str, str] = {}
+        self._lock = threading.Condition()
+        self._upload_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"marked": 0, "uploaded": 0, "skipped_unchanged": 0, "errors": 0}
+
+    def mark_dirty(self, thread_id: str, messages: Iterable[dict]) -> None:
+        """Record the thread's latest messages; they're uploaded on the next due flush."""
+        with self._lock:
+            self._dirty[thread_id] = list(messages)
+            self.stats["marked"] += 1
+            if self.background and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="thread-snapshots", daemon=True)
+                self._thread.start()
+            self._lock.notify_all()
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._dirty)
+
+    def _due(self, now: float) -> List[tuple]:
+        # Caller holds self._lock
+        due = [t for t in self._dirty if now - self._last_upload.get(t, float("-inf")) >= self.interval]
+        return [(t, self._dirty.pop(t)) for t in due]
+
+    def flush_due(self) -> int:
+        """Upload every dirty thread whose interval has elapsed; returns the number of PUTs."""
+        with self._lock:
+            batch = self._due(self.clock())
+        return sum(self._upload(t, messages) for t, messages in batch)
+
+    def flush(self, thread_id: Optional[str] = None) -> int:
+        """Upload dirty threads now, ignoring the interval (all of them, or just `thread_id`)."""
+        with self._lock:
+            if thread_id is None:
+                batch = list(self._dirty.items())
+                self._dirty.clear()
+            elif thread_id in self._dirty:
+                batch = [(thread_id, self._dirty.pop(thread_id))]
+            else:
+                batch = []
+        return sum(self._upload(t, messages) for t, messages in batch)
+
+    def _upload(self, thread_id: str, messages: List[dict]) -> bool:
+        body, digest, extra = encode_snapshot(messages, self.encoding)
+        with self._upload_lock:
+            if self._hashes.get(thread_id) == digest:
+                with self._lock:
+                    self.stats["skipped_unchanged"] += 1
+                return False
+            try:
+                self._s3_client().put_object(Bucket=self.bucket, Key=snapshot_key(thread_id), Body=body,
+                                             ContentType="application/json", **extra)
+            except Exception as e:
+                logging.error(f"S3 snapshot upload failed for thread_id {thread_id}: {e}")
+                with self._lock:
+                    self.stats["errors"] += 1
+                    # Retry after another interval unless newer messages arrived meanwhile
+                    self._dirty.setdefault(thread_id, messages)
+                    self._last_upload[thread_id] = self.clock()
+                return False
+            self._hashes[thread_id] = digest
+        with self._lock:
+            self._last_upload[thread_id] = self.clock()
+            self.stats["uploaded"] += 1
+        return True
+
+    def read(self, thread_id: str) -> List[dict]:
+        """The stored snapshot of a thread, in whichever encoding it was written."""
+        response = self._s3_client().get_object(Bucket=self.bucket, Key=snapshot_key(thread_id))
+        return decode_snapshot(response["Body"].read())
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._dirty:
+                    self._lock.wait()
+                now = self.clock()
+                waits = [self._last_upload.get(t, float("-inf")) + self.interval - now for t in self._dirty]
+                delay = min(waits)
+                if delay > 0:
+                    self._lock.wait(min(delay, self.interval))
+                    continue
+            try:
+                self.flush_due()
+            except Exception as e:
+                logging.error(f"Thread snapshot flusher error: {e}")
+
+
+_service: Optional[ThreadSnapshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_snapshot_service() -> ThreadSnapshotService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ThreadSnapshotService()
+        return _service
+
+
+def set_snapshot_service(service: Optional[ThreadSnapshotService]) -> None:
+    global _service
+    with _service_lock:
+        _service = service
+
+
+def mark_thread_dirty(thread_id: str, messages: Iterable[dict]) -> None:
+    get_snapshot_service().mark_dirty(thread_id, messages)
+
+
+def read_thread_snapshot(thread_id: str) -> List[dict]:
+    return get_snapshot_service().read(thread_id)
+
+
+def flush_thread_snapshots(thread_id: Optional[str] = None) -> int:
+    """Force pending snapshots out now (logout / session end)."""
+    with _service_lock:
+        service = _service
+    return service.flush(thread_id) if service is not None else 0
+
+
+atexit.register(flush_thread_snapshots)
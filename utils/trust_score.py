@@ -1,24 +1,18 @@
-import json
 from collections import defaultdict
-import os
-
-FEEDBACK_PATH = "logs/feedback.json"
-JOB_PATH = "logs/jobs.json"
+from utils.db import get_all_jobs, load_all_feedback
+from utils.cache import cached
 
+@cached(ttl=60, tags=("jobs", "feedback"))
 def compute_contractor_trust_scores() -> dict:
     """
     Computes average rating score per contractor based on feedback.json + jobs.json.
     Returns: Dict[contractor_id: str, avg_rating: float]
     """
-    if not os.path.exists(FEEDBACK_PATH) or not os.path.exists(JOB_PATH):
+    feedback = load_all_feedback()
+    jobs = get_all_jobs()
+    if not feedback or not jobs:
         return {}
 
-    with open(FEEDBACK_PATH, "r") as f:
-        feedback = json.load(f)
-
-    with open(JOB_PATH, "r") as f:
-        jobs = json.load(f)
-
     # Map job_id to contractor_id
     job_to_contractor = {job["job_id"]: job.get("assigned_to") for job in jobs if "assigned_to" in job}
 
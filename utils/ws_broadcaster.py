@@ -0,0 +1,136 @@
+# utils/ws_broadcaster.py
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class ConnectionSender:
+    """
+    Bounded outbound queue plus a writer task for one WebSocket connection.
+
+    Frames queued with a `coalesce_key` replace any unsent frame with the same
+    key (only the latest chat-log snapshot matters). When the queue is full
+    the oldest frame is dropped. A send that takes longer than `send_timeout`
+    marks the client as too slow and closes it, so it can't hold up anyone else.
+    """
+
+    def __init__(self, websocket, max_queue: int = 64, send_timeout: float = 10.0):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self._frames: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._next_id = 0
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0, "max_depth": 0}
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    def enqueue(self, payload: str, coalesce_key: Optional[Hashable] = None) -> None:
+        if self.closed:
+            return
+        if coalesce_key is not None and ("key", coalesce_key) in self._frames:
+            # Replace the stale snapshot but keep its place in the queue
+            self._frames[("key", coalesce_key)] = payload
+            self.stats["coalesced"] += 1
+            return
+        if len(self._frames) >= self.max_queue:
+            self._frames.popitem(last=False)
+            self.stats["dropped"] += 1
+        if coalesce_key is not None:
+            self._frames[("key", coalesce_key)] = payload
+        else:
+            self._frames[("seq", self._next_id)] = payload
+            self._next_id += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._frames))
+        self._ready.set()
+
+    async def _writer(self) -> None:
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                if not self._frames:
+                    self._ready.clear()
+                    continue
+                _, payload = self._frames.popitem(last=False)
+                await asyncio.wait_for(self.websocket.send(payload), timeout=self.send_timeout)
+                self.stats["sent"] += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            logging.warning(f"Closing slow WebSocket client after {self.send_timeout}s send timeout")
+            await self._close_socket(code=1013, reason="Client too slow")
+        except Exception as e:
+            logging.info(f"WebSocket writer stopped: {e}")
+        finally:
+            self.closed = True
+            self._frames.clear()
+
+    async def _close_socket(self, code: int, reason: str) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), timeout=1.0)
+        except Exception:
+            pass
+
+    async def stop(self) -> None:
+        self.closed = True
+        self._ready.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class Broadcaster:
+    """Thread subscriptions and non-blocking fan-out to per-connection senders."""
+
+    def __init__(self, max_queue: int = 64, send_timeout: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.subscribers: Dict[str, Dict[object, ConnectionSender]] = {}
+        self.retired = {"sent": 0, "dropped": 0, "coalesced": 0}
+
+    def subscribe(self, thread_id: str, websocket) -> ConnectionSender:
+        sender = ConnectionSender(websocket, self.max_queue, self.send_timeout)
+        self.subscribers.setdefault(thread_id, {})[websocket] = sender
+        sender.start()
+        return sender
+
+    async def unsubscribe(self, thread_id: str, websocket) -> None:
+        senders = self.subscribers.get(thread_id, {})
+        sender = senders.pop(websocket, None)
+        if not senders:
+            self.subscribers.pop(thread_id, None)
+        if sender is not None:
+            await sender.stop()
+            for name in self.retired:
+                self.retired[name] += sender.stats[name]
+
+    def publish(self, thread_id: str, payload: str, coalesce_key: Optional[Hashable] = None) -> int:
+        """Queue `payload` for every subscriber of the thread; never waits on a socket."""
+        senders = list(self.subscribers.get(thread_id, {}).values())
+        for sender in senders:
+            sender.enqueue(payload, coalesce_key)
+        return len(senders)
+
+    def metrics(self) -> dict:
+        senders = [s for subs in self.subscribers.values() for s in subs.values()]
+        totals = {name: value + sum(s.stats[name] for s in senders) for name, value in self.retired.items()}
+        return {
+            "connections": len(senders),
+            "threads": len(self.subscribers),
+            "queue_depth": sum(s.depth for s in senders),
+            "max_queue_depth": max((s.stats["max_depth"] for s in senders), default=0),
+            "slow_clients": sum(1 for s in senders if s.closed),
+            **totals,
+        }
@@ -0,0 +1,146 @@
+import base64
+import boto3
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from boto3.dynamodb.conditions import Attr, Key
+
+# Subscription index read by dynamodb_stream_processor.py:
+#   partition key thread_id, sort key connection_id,
+#   GSI "connection_id-index" (partition key connection_id) for disconnect cleanup,
+#   TTL attribute expires_at so abandoned rows age out.
+CONNECTIONS_TABLE = os.environ.get("CONNECTIONS_TABLE", "ThreadConnections")
+CONNECTION_INDEX = os.environ.get("CONNECTION_INDEX", "connection_id-index")
+CONNECTION_TTL_SECONDS = int(os.environ.get("CONNECTION_TTL_SECONDS", str(24 * 3600)))
+
+# Membership: a caller may follow a thread it has messages in (chat table,
+# thread GSI), or any thread if its role is in OPEN_ROLES (landlords see all
+# threads in the dashboard). Callers prove who they are with the HS256 token
+# the Streamlit app mints (superstructures/ss1_gate/shared/live_chat.py).
+CHAT_TABLE = os.environ.get("CHAT_TABLE", "ChatThreads")
+CHAT_THREAD_INDEX = os.environ.get("CHAT_THREAD_INDEX", "thread_id-timestamp-index")
+WS_JWT_SECRET = os.environ.get("WS_JWT_SECRET", "your_jwt_secret_key")
+OPEN_ROLES = set(filter(None, os.environ.get("OPEN_ROLES", "landlord").split(",")))
+
+dynamodb = boto3.resource('dynamodb')
+connections_table = dynamodb.Table(CONNECTIONS_TABLE)
+chat_table = dynamodb.Table(CHAT_TABLE)
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def verify_token(token):
+    """
+    Claims of an HS256 JWT signed with WS_JWT_SECRET, or None if it is
+    malformed, wrongly signed or expired (kept local: this file deploys alone).
+    """
+    try:
+        header, payload, signature = token.split(".")
+        if json.loads(_b64decode(header)).get("alg") != "HS256":
+            return None
+        expected = hmac.new(WS_JWT_SECRET.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if not isinstance(claims, dict) or ("exp" in claims and claims["exp"] < time.time()):
+        return None
+    return claims
+
+def is_participant(email, thread_id):
+    """True if `email` wrote any item of the thread (paginated Query on the thread GSI)."""
+    kwargs = {
+        "IndexName": CHAT_THREAD_INDEX,
+        "KeyConditionExpression": Key("thread_id").eq(thread_id),
+        "FilterExpression": Attr("email").eq(email),
+        "ProjectionExpression": "email"
+    }
+    while True:
+        response = chat_table.query(**kwargs)
+        if response.get("Items"):
+            return True
+        if "LastEvaluatedKey" not in response:
+            return False
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def authorize(token, thread_id):
+    """None if the token's holder may follow the thread, else the HTTP error response."""
+    claims = verify_token(token) if token else None
+    if not claims or not claims.get("email"):
+        return {"statusCode": 401, "body": "A valid token is required"}
+    # Tokens minted for one thread can't be replayed to join another
+    if claims.get("thread_id") not in (None, thread_id):
+        return {"statusCode": 403, "body": "Token is not valid for this thread"}
+    if claims.get("role") not in OPEN_ROLES and not is_participant(claims["email"], thread_id):
+        logging.warning(f"Rejected {claims['email']} joining thread {thread_id}")
+        return {"statusCode": 403, "body": "Not a participant of this thread"}
+    return None
+
+def subscribe(connection_id, thread_id):
+    """Add one thread -> connection row."""
+    now = int(time.time())
+    connections_table.put_item(Item={
+        "thread_id": thread_id,
+        "connection_id": connection_id,
+        "connected_at": now,
+        "expires_at": now + CONNECTION_TTL_SECONDS
+    })
+    logging.info(f"Connection {connection_id} subscribed to thread {thread_id}")
+
+def unsubscribe_all(connection_id):
+    """Remove every thread row for a connection, found through the GSI."""
+    kwargs = {
+        "IndexName": CONNECTION_INDEX,
+        "KeyConditionExpression": Key("connection_id").eq(connection_id),
+        "ProjectionExpression": "thread_id, connection_id"
+    }
+    removed = 0
+    with connections_table.batch_writer() as batch:
+        while True:
+            response = connections_table.query(**kwargs)
+            for item in response.get("Items", []):
+                batch.delete_item(Key={"thread_id": item["thread_id"], "connection_id": connection_id})
+                removed += 1
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    logging.info(f"Connection {connection_id} removed from {removed} thread(s)")
+
+def lambda_handler(event, context):
+    """API Gateway WebSocket routes: $connect, $disconnect and join."""
+    logging.getLogger().setLevel(logging.INFO)
+    request = event.get("requestContext", {})
+    route = request.get("routeKey")
+    connection_id = request.get("connectionId")
+
+    try:
+        if route == "$connect":
+            params = event.get("queryStringParameters") or {}
+            thread_id = params.get("thread_id")
+            if thread_id:
+                denied = authorize(params.get("token"), thread_id)
+                if denied:
+                    return denied
+                subscribe(connection_id, thread_id)
+        elif route == "$disconnect":
+            unsubscribe_all(connection_id)
+        elif route == "join":
+            body = json.loads(event.get("body") or "{}")
+            thread_id = body.get("thread_id")
+            if not thread_id:
+                return {"statusCode": 400, "body": "thread_id is required"}
+            denied = authorize(body.get("token"), thread_id)
+            if denied:
+                return denied
+            subscribe(connection_id, thread_id)
+        else:
+            return {"statusCode": 400, "body": f"Unsupported route: {route}"}
+    except Exception as e:
+        logging.error(f"Error handling {route} for {connection_id}: {str(e)}")
+        return {"statusCode": 500, "body": "Internal error"}
+
+    return {"statusCode": 200, "body": "OK"}
@@ -1,28 +1,31 @@
 import asyncio
 import streamlit as st
 import websockets
-import boto3
 import json
 import logging
 import jwt
 from jwt.exceptions import InvalidTokenError
-from botocore.exceptions import ClientError
+from utils.aws_backend import Key, get_aws_client, get_setting, get_table
+from utils.dynamo_stream import DynamoStreamConsumer
+from utils.ws_broadcaster import Broadcaster
+from utils.chat_delta import build_delta, build_snapshot, stream_messages
 import traceback
+from collections import OrderedDict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb',
-                          aws_access_key_id=st.secrets["AWS_ACCESS_KEY"],
-                          aws_secret_access_key=st.secrets["AWS_SECRET_ACCESS_KEY"],
-                          region_name=st.secrets["AWS_REGION"])
 # Secret key for JWT authentication
-JWT_SECRET = "your_jwt_secret_key"
+JWT_SECRET = get_setting("WS_JWT_SECRET", "your_jwt_secret_key")
 JWT_ALGORITHM = "HS256"
 
-# Mapping of thread IDs to connected WebSocket clients
-connected_clients = {}
+# Thread subscriptions; each client gets its own bounded send queue
+broadcaster = Broadcaster(max_queue=64, send_timeout=10.0)
+METRICS_INTERVAL = 60
+
+# Newest position published per thread (the next delta's base_seq)
+thread_seqs = OrderedDict()
+THREAD_SEQ_CACHE_SIZE = 1000
 
 # Enhanced error handling and logging for WebSocket server and DynamoDB Streams
 def log_error(context, error):
@@ -49,38 +52,78 @@ def authenticate_client(token):
     except InvalidTokenError:
         return None
 
-def process_dynamodb_stream(record):
-    """Process a single DynamoDB stream record."""
-    if record['eventName'] == 'INSERT' or record['eventName'] == 'MODIFY':
-        new_image = record['dynamodb']['NewImage']
-        chat_log = new_image.get('chat_log', {}).get('L', [])
-        thread_id = new_image.get('thread_id', {}).get('S', 'unknown')
-        return {
-            "thread_id": thread_id,
-            "chat_log": chat_log
-        }
-    return None
-
-async def dynamodb_stream_listener(websocket, thread_id):
-    """Listen to DynamoDB Streams with enhanced error handling."""
+def remember_seq(thread_id, seq):
+    """Keep the newest published position per thread (LRU)."""
+    thread_seqs[thread_id] = max(seq, thread_seqs.get(thread_id, ""))
+    thread_seqs.move_to_end(thread_id)
+    while len(thread_seqs) > THREAD_SEQ_CACHE_SIZE:
+        thread_seqs.popitem(last=False)
+
+def build_stream_frames(records):
+    """One chat_delta frame per thread from a batch of stream records (new message items)."""
+    frames = []
+    for thread_id, messages in stream_messages(records).items():
+        frame = build_delta(thread_id, messages, base_seq=thread_seqs.get(thread_id))
+        remember_seq(thread_id, frame["seq"])
+        frames.append(frame)
+    return frames
+
+def load_messages_since(thread_id, since):
+    """Messages of a thread after position `since`, from the thread index (the clients' source too)."""
+    condition = Key("thread_id").eq(thread_id)
+    if since:
+        condition = condition & Key("timestamp").gt(since)
+    kwargs = {"IndexName": get_setting("DYNAMODB_THREAD_INDEX"), "KeyConditionExpression": condition}
+    table, messages = get_table(), []
+    while True:
+        response = table.query(**kwargs)
+        messages.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return messages
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def broadcast_update(update):
+    """Queue one update for every client on its thread; slow clients only delay themselves."""
+    # Deltas are never coalesced: a dropped one makes the client resync
+    broadcaster.publish(update["thread_id"], json.dumps(update, default=str))
+
+async def handle_client_message(sender, thread_id, raw):
+    """Answer a client's resync request with the messages after its position."""
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError):
+        return
+    if message.get("type") != "resync" or message.get("thread_id") != thread_id:
+        return
+    since = str(message.get("since") or "")
     try:
-        response = dynamodb.describe_table(TableName="<DYNAMODB_TABLE>")
-        stream_arn = response['Table']['LatestStreamArn']
-
-        stream_response = dynamodb.get_records(StreamArn=stream_arn)
-        for record in stream_response['Records']:
-            update = process_dynamodb_stream(record)
-            if update and update["thread_id"] == thread_id:
-                for client in connected_clients.get(thread_id, []):
-                    await client.send(json.dumps(update))
-    except ClientError as e:
-        log_error("DynamoDB Stream ClientError", e)
+        messages = await asyncio.to_thread(load_messages_since, thread_id, since)
+        frame = build_snapshot(thread_id, messages, since)
     except Exception as e:
-        log_error("DynamoDB Stream Listener", e)
-
-async def websocket_handler(websocket, path):
-    """Handle WebSocket connections with enhanced error handling."""
+        log_error("Resync", e)
+        frame = {"type": "resync_unavailable", "thread_id": thread_id}
+    sender.enqueue(json.dumps(frame, default=str))
+
+async def dispatch_stream_records(records):
+    """Fan a batch of new stream records out to the subscribed clients."""
+    for update in build_stream_frames(records):
+        broadcast_update(update)
+
+async def log_broadcast_metrics():
+    while True:
+        await asyncio.sleep(METRICS_INTERVAL)
+        logging.info(f"WebSocket broadcast metrics: {broadcaster.metrics()}")
+
+def create_stream_consumer():
+    """One consumer for the whole server; its cost doesn't grow with viewers."""
+    table = get_aws_client("dynamodb").describe_table(TableName=get_setting("DYNAMODB_TABLE"))
+    stream_arn = table['Table']['LatestStreamArn']
+    return DynamoStreamConsumer(get_aws_client("dynamodbstreams"), stream_arn)
+
+async def websocket_handler(websocket, path=None):
+    """Register an authenticated client for its thread until it disconnects."""
     logging.info("New WebSocket connection established.")
+    thread_id = None
     try:
         # Receive authentication token from client
         token = await websocket.recv()
@@ -91,33 +134,34 @@ async def websocket_handler(websocket, path):
             return
 
         thread_id = user_data.get("thread_id")
-        if thread_id not in connected_clients:
-            connected_clients[thread_id] = []
-        connected_clients[thread_id].append(websocket)
+        sender = broadcaster.subscribe(thread_id, websocket)
 
         logging.info(f"Client connected to thread: {thread_id}")
 
-        while True:
-            await dynamodb_stream_listener(websocket, thread_id)
-            await asyncio.sleep(1)  # Polling interval
+        # Updates arrive through the shared stream consumer; the client only
+        # talks back to ask for a resync after a gap.
+        async for raw in websocket:
+            await handle_client_message(sender, thread_id, raw)
 
     except websockets.ConnectionClosed as e:
         log_error("WebSocket Connection", e)
     except Exception as e:
         log_error("WebSocket Handler", e)
     finally:
-        # Remove client from connected_clients
-        if thread_id in connected_clients:
-            connected_clients[thread_id].remove(websocket)
-            if not connected_clients[thread_id]:
-                del connected_clients[thread_id]
+        if thread_id is not None:
+            await broadcaster.unsubscribe(thread_id, websocket)
 
 # Start WebSocket server
 async def main():
     logging.info("Starting WebSocket server on ws://localhost:8765")
     st.success("WebSocket server started.")
+    consumer = create_stream_consumer()
     async with websockets.serve(websocket_handler, "localhost", 8765):
-        await asyncio.Future()  # Run forever
+        metrics_task = asyncio.create_task(log_broadcast_metrics())
+        try:
+            await consumer.run(dispatch_stream_records)
+        finally:
+            metrics_task.cancel()
 
 if __name__ == "__main__":
     asyncio.run(main())